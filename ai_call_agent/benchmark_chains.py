@@ -0,0 +1,93 @@
+"""
+Benchmark: construcția lanțurilor LangChain per cerere vs. reutilizare.
+
+Rulează offline: lanțurile sunt cele construite de RAGService și LLMService,
+cu LLM-ul înlocuit de un stub și embeddings stub (RAG_EMBEDDING_BACKEND=stub):
+
+    python -m ai_call_agent.benchmark_chains [--requests 200]
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+import tracemalloc
+
+# Fără rețea și fără cache-uri: se măsoară doar lanțurile
+os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+os.environ["RAG_EMBEDDING_BACKEND"] = "stub"
+os.environ["RAG_SEMANTIC_CACHE"] = "0"
+os.environ["ANSWER_CACHE_BACKEND"] = "none"
+os.environ.setdefault("RAG_INDEX_DIR", tempfile.mkdtemp())
+
+from langchain.chains import LLMChain
+from langchain_community.vectorstores import FAISS
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+from ai_call_agent.services.rag_service import RAGService
+from ai_call_agent.services.llm_service import LLMService
+
+
+async def measure(label: str, requests: int, run) -> None:
+    await run()  # warm-up
+    tracemalloc.start()
+    start = time.perf_counter()
+    for _ in range(requests):
+        await run()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    snapshot = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    allocated = sum(stat.size for stat in snapshot.statistics("filename"))
+    print(
+        f"{label:<38} {elapsed / requests * 1000:8.3f} ms/request"
+        f"   peak {peak / 1024:8.1f} KiB   retained {allocated / 1024:8.1f} KiB"
+    )
+
+
+async def main(requests: int) -> None:
+    llm = FakeListChatModel(responses=["Stub answer."])
+    rag_service = RAGService(auto_initialize=False)
+    rag_service.llm = llm
+    texts = [f"Hamburg programme brochure paragraph {i}" for i in range(500)]
+    vector_store = FAISS.from_texts(texts, rag_service.embeddings, normalize_L2=True)
+    question = "What documents do I need to apply?"
+
+    print(f"RetrievalQA ({requests} requests, stub LLM)")
+
+    async def qa_per_request():
+        chain = rag_service._build_qa_chain(vector_store)
+        await chain.ainvoke({"query": question})
+
+    # Ca în load_corpus: construit o dată per versiune de corpus
+    shared_qa = rag_service._build_qa_chain(vector_store)
+
+    async def qa_shared():
+        await shared_qa.ainvoke({"query": question})
+
+    await measure("  built per request (before)", requests, qa_per_request)
+    await measure("  built once, reused (after)", requests, qa_shared)
+
+    print(f"\nLLMChain ({requests} requests, stub LLM)")
+
+    llm_service = LLMService()
+    llm_service.chain.llm = llm
+
+    async def llm_per_request():
+        # Construcția de dinainte: un LLMChain verbose nou la fiecare mesaj
+        chain = LLMChain(llm=llm, prompt=llm_service.prompt, verbose=True)
+        await chain.arun(human_input=question, chat_history="")
+
+    shared_llm = llm_service.chain
+
+    async def llm_shared():
+        await shared_llm.arun(human_input=question, chat_history="")
+
+    await measure("  built per request, verbose (before)", requests, llm_per_request)
+    await measure("  built once, reused (after)", requests, llm_shared)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Chain construction benchmark")
+    parser.add_argument("--requests", type=int, default=200)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests))
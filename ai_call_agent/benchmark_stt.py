@@ -0,0 +1,106 @@
+"""
+Benchmark pentru motoarele STT: latență și real-time factor (RTF).
+
+RTF = timp de procesare / durata audio (sub 1.0 înseamnă mai rapid decât timpul real).
+Motoarele locale (whisper, vosk) rulează fără rețea:
+
+    python -m ai_call_agent.benchmark_stt --engine whisper sample1.wav sample2.wav
+    python -m ai_call_agent.benchmark_stt --engine vosk --concurrency 4
+    python -m ai_call_agent.benchmark_stt --engine whisper --vad --concurrency 4
+
+Cu --vad se compară transcrierea clipului întreg cu transcrierea doar a
+regiunilor de vorbire (tăcerea eliminată, frazele în paralel).
+"""
+import argparse
+import asyncio
+import io
+import time
+import wave
+import numpy as np
+from ai_call_agent.services.audio_decode import decode_wav
+from ai_call_agent.services.stt_engines import create_stt_engine
+from ai_call_agent.services.stt_service import STTWorkerPool, transcribe_utterances
+from ai_call_agent.services.vad import create_vad
+
+
+def synthetic_wav(seconds: float = 5.0, sample_rate: int = 16000, silence: float = 0.0) -> bytes:
+    """WAV sintetic (tonuri modulate + zgomot) când nu sunt date fișiere; `silence` secunde de liniște la capete."""
+    t = np.arange(int(seconds * sample_rate)) / sample_rate
+    signal = 0.3 * np.sin(2 * np.pi * 220 * t) * (1 + np.sin(2 * np.pi * 3 * t))
+    pad = np.zeros(int(silence * sample_rate))
+    signal = np.concatenate((pad, signal, pad))
+    signal += 0.002 * np.random.default_rng(0).standard_normal(len(signal))
+    samples = (np.clip(signal, -1, 1) * 32767).astype(np.int16)
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+        wav.writeframes(samples.tobytes())
+    return buffer.getvalue()
+
+
+def duration_seconds(audio_content: bytes) -> float:
+    samples, sample_rate = decode_wav(audio_content)
+    return len(samples) / sample_rate
+
+
+async def run(args: argparse.Namespace) -> None:
+    if args.files:
+        clips = []
+        for path in args.files:
+            with open(path, "rb") as f:
+                clips.append(f.read())
+    else:
+        clips = [synthetic_wav(silence=args.silence)]
+
+    load_start = time.perf_counter()
+    engine = create_stt_engine(args.engine, num_workers=args.concurrency)
+    print(f"Engine: {engine.name} (loaded in {time.perf_counter() - load_start:.2f}s)")
+
+    # Un apel de încălzire, neinclus în măsurători
+    engine.transcribe(clips[0])
+
+    pool = STTWorkerPool(max_workers=args.concurrency, max_queue=len(clips) * args.repeat * 8, timeout=600)
+    jobs = clips * args.repeat
+    audio_seconds = sum(duration_seconds(clip) for clip in jobs)
+
+    async def whole_clip(clip: bytes) -> None:
+        await pool.submit(engine.transcribe, clip)
+
+    async def speech_only(clip: bytes) -> None:
+        await transcribe_utterances(pool, engine, clip, vad=create_vad(args.vad_backend))
+
+    modes = [("whole clip", whole_clip)]
+    if args.vad:
+        modes.append((f"VAD ({args.vad_backend})", speech_only))
+
+    print(f"Clips: {len(jobs)}  audio: {audio_seconds:.1f}s  concurrency: {args.concurrency}")
+    for label, transcribe in modes:
+        latencies = []
+
+        async def timed(clip: bytes) -> None:
+            start = time.perf_counter()
+            await transcribe(clip)
+            latencies.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(timed(clip) for clip in jobs))
+        wall = time.perf_counter() - start
+
+        latencies.sort()
+        print(f"[{label}] wall time: {wall:.2f}s  aggregate RTF: {wall / audio_seconds:.3f}")
+        print(f"[{label}] latency p50: {latencies[len(latencies) // 2]:.3f}s  max: {latencies[-1]:.3f}s")
+    pool.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="STT engine benchmark")
+    parser.add_argument("files", nargs="*", help="16-bit PCM WAV files (default: synthetic 5s clip)")
+    parser.add_argument("--engine", default="whisper", choices=["google", "whisper", "vosk"])
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--vad", action="store_true", help="Also measure speech-only transcription")
+    parser.add_argument("--vad-backend", default="energy", choices=["energy", "webrtc"])
+    parser.add_argument("--silence", type=float, default=2.0, help="Leading/trailing silence of the synthetic clip")
+    asyncio.run(run(parser.parse_args()))
@@ -1,24 +1,32 @@
 from ai_call_agent.services.dialogflow_service import DialogflowService
+from ai_call_agent.services.intent_pipeline import IntentPipeline, create_intent_pipeline
 from typing import Dict, Any, Optional
 
 class CallHandler:
-    def __init__(self):
-        self.dialogflow_service = DialogflowService()
+    def __init__(
+        self,
+        dialogflow_service: Optional[DialogflowService] = None,
+        intent_pipeline: Optional[IntentPipeline] = None
+    ):
+        self.dialogflow_service = dialogflow_service or DialogflowService()
+        # Intențiile simple se rezolvă local; Dialogflow doar pentru restul
+        self.intent_pipeline = intent_pipeline or create_intent_pipeline(self.dialogflow_service)
     
-    async def handle_message(self, text: str, session_id: Optional[str] = None) -> Dict[str, Any]:
+    async def handle_message(self, text: str, session_id: Optional[str] = None, language: str = "en-US") -> Dict[str, Any]:
         """
         Handle incoming message and return response
         
         Args:
             text (str): The input text from the user
             session_id (Optional[str]): The session identifier
+            language (str): Dialogflow language code
             
         Returns:
-            Dict[str, Any]: The response containing text, intent, and confidence
+            Dict[str, Any]: The response containing text, intent, confidence and source
         """
         try:
-            # Get response from Dialogflow
-            df_response = self.dialogflow_service.get_response(text, session_id)
+            # Cuvinte-cheie / clasificator local / cache, apoi Dialogflow
+            df_response = await self.intent_pipeline.get_response(text, session_id, language)
             
             if "error" in df_response:
                 return {"error": df_response["error"]}
@@ -27,7 +35,8 @@ class CallHandler:
                 "session_id": session_id,
                 "text": df_response["text"],
                 "intent": df_response["intent"],
-                "confidence": df_response["confidence"]
+                "confidence": df_response["confidence"],
+                "source": df_response["source"]
             }
             
         except Exception as e:
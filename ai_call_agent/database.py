@@ -0,0 +1,123 @@
+"""
+Baza de date: engine async (asyncpg), modele și dependența de sesiune pentru FastAPI.
+
+DATABASE_URL suprascrie URL-ul Postgres construit din DB_*; pentru teste și
+benchmark merge și "sqlite+aiosqlite:///fisier.db".
+
+Pool (doar pentru Postgres): DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_POOL_TIMEOUT,
+DB_POOL_RECYCLE (secunde); conexiunile sunt verificate înainte de folosire (pre-ping).
+"""
+from typing import Dict, Any, AsyncIterator
+from datetime import datetime
+import os
+import uuid
+import logging
+from sqlalchemy import Column, String, DateTime, Boolean, Text, Integer, BigInteger, ForeignKey, Index
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import declarative_base
+
+logger = logging.getLogger(__name__)
+
+# Database configuration
+DB_USER = os.getenv("DB_USER", "postgres")
+DB_PASSWORD = os.getenv("DB_PASSWORD", "Secret1975")
+DB_NAME = "ai-call-agency"
+DB_HOST = os.getenv("DB_HOST", "localhost")
+DB_PORT = os.getenv("DB_PORT", "5432")
+
+SQLALCHEMY_DATABASE_URL = os.getenv(
+    "DATABASE_URL",
+    f"postgresql+asyncpg://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+)
+
+
+def create_db_engine(url: str = SQLALCHEMY_DATABASE_URL) -> AsyncEngine:
+    """
+    Engine async cu pool explicit.
+
+    SQLite își alege singur pool-ul (un fișier nu beneficiază de conexiuni
+    multiple), așa că setările de pool se aplică doar serverelor reale.
+    """
+    options: Dict[str, Any] = {"pool_pre_ping": True}
+    if not url.startswith("sqlite"):
+        options.update(
+            pool_size=int(os.getenv("DB_POOL_SIZE", "10")),
+            max_overflow=int(os.getenv("DB_MAX_OVERFLOW", "20")),
+            pool_timeout=float(os.getenv("DB_POOL_TIMEOUT", "10")),
+            pool_recycle=int(os.getenv("DB_POOL_RECYCLE", "1800")),
+        )
+    return create_async_engine(url, **options)
+
+
+engine = create_db_engine()
+# expire_on_commit=False: obiectele rămân citibile după commit, fără un nou SELECT
+SessionLocal = async_sessionmaker(engine, expire_on_commit=False, autoflush=False)
+Base = declarative_base()
+
+
+# Models
+class User(Base):
+    __tablename__ = "users"
+    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    name = Column(String, nullable=False)
+    email = Column(String, unique=True, nullable=True)
+    gdpr_accepted = Column(Boolean, default=False)
+    gdpr_accepted_date = Column(DateTime, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+
+class ChatSession(Base):
+    __tablename__ = "chat_sessions"
+    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    user_id = Column(String, nullable=True)
+    start_time = Column(DateTime, default=datetime.utcnow)
+    end_time = Column(DateTime, nullable=True)
+    # Sesiunile vechi; cele noi își scriu mesajele în chat_messages
+    transcript = Column(Text, default="")
+    voice_enabled = Column(Boolean, default=False)
+    video_enabled = Column(Boolean, default=False)
+
+    # Listarea sesiunilor unui utilizator, cele mai noi primele
+    __table_args__ = (Index("ix_chat_sessions_user_start", "user_id", "start_time"),)
+
+
+class ChatMessage(Base):
+    __tablename__ = "chat_messages"
+    # BIGSERIAL pe Postgres; SQLite face autoincrement doar pe INTEGER PRIMARY KEY
+    id = Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True, autoincrement=True)
+    session_id = Column(String, ForeignKey("chat_sessions.id", ondelete="CASCADE"), nullable=False)
+    seq = Column(Integer, nullable=False)
+    sender = Column(String, nullable=False)
+    name = Column(String, nullable=True)
+    content = Column(Text, nullable=False, default="")
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (Index("ix_chat_messages_session_seq", "session_id", "seq", unique=True),)
+
+
+def _create_all(conn) -> None:
+    Base.metadata.create_all(conn)
+    # create_all nu adaugă indecși noi pe tabelele care există deja
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(conn, checkfirst=True)
+
+
+async def init_db(db_engine: AsyncEngine = engine) -> None:
+    """Creează tabelele și indecșii care lipsesc."""
+    async with db_engine.begin() as conn:
+        await conn.run_sync(_create_all)
+
+
+# Dependency for database sessions
+async def get_db() -> AsyncIterator[AsyncSession]:
+    async with SessionLocal() as db:
+        yield db
+
+
+def get_pool_stats(db_engine: AsyncEngine = engine) -> Dict[str, Any]:
+    pool = db_engine.pool
+    stats = {"pool": type(pool).__name__, "status": pool.status()}
+    if hasattr(pool, "checkedout"):
+        stats.update(size=pool.size(), checked_out=pool.checkedout(), overflow=pool.overflow())
+    return stats
@@ -0,0 +1,65 @@
+"""
+CLI pentru gestionarea corpusului RAG.
+
+    python -m ai_call_agent.ingest list
+    python -m ai_call_agent.ingest sync
+    python -m ai_call_agent.ingest add path/to/brochure.pdf
+    python -m ai_call_agent.ingest delete brochure.pdf
+
+CLI-ul actualizează directorul de documente și indexul de pe disc. Serverul
+care rulează preia schimbările la următoarea verificare a directorului
+(RAG_WATCH_INTERVAL, implicit 30 s; indexul deja construit de CLI este doar
+încărcat, nu recalculat) sau imediat prin POST /api/admin/reindex.
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+from ai_call_agent.services.rag_service import RAGService
+from ai_call_agent.services.ingestion_service import IngestionService
+
+
+async def run(args: argparse.Namespace) -> int:
+    # Fără încărcarea automată a corpusului implicit: ar concura cu --docs-dir
+    rag_service = RAGService(auto_initialize=False)
+    ingestion = IngestionService(rag_service, docs_dir=args.docs_dir)
+
+    if args.command == "list":
+        result = ingestion.list_documents()
+    elif args.command == "sync":
+        result = await ingestion.sync()
+    elif args.command == "add":
+        with open(args.path, "rb") as f:
+            content = f.read()
+        result = await ingestion.add_document(os.path.basename(args.path), content)
+    elif args.command == "delete":
+        result = await ingestion.delete_document(args.name)
+    else:
+        return 2
+
+    print(json.dumps(result, indent=2))
+    return 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Manage the RAG document corpus")
+    parser.add_argument("--docs-dir", default=None, help="Documents directory (default: RAG_DOCS_DIR)")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser("list", help="List indexed documents")
+    subparsers.add_parser("sync", help="Index new/changed documents and drop removed ones")
+    add_parser = subparsers.add_parser("add", help="Add or replace a PDF document")
+    add_parser.add_argument("path")
+    delete_parser = subparsers.add_parser("delete", help="Remove a document from the corpus")
+    delete_parser.add_argument("name")
+
+    args = parser.parse_args()
+    try:
+        return asyncio.run(run(args))
+    except (ValueError, FileNotFoundError) as e:
+        print(f"Error: {str(e)}", file=sys.stderr)
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
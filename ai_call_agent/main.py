@@ -1,9 +1,9 @@
-from fastapi import FastAPI, Request, File, UploadFile, HTTPException, WebSocket, Depends
+from fastapi import FastAPI, Request, File, UploadFile, HTTPException, WebSocket, Depends, Header, Query
 from fastapi.middleware.cors import CORSMiddleware
 import logging
 import os
 from dotenv import load_dotenv
-from fastapi.responses import JSONResponse, FileResponse
+from fastapi.responses import JSONResponse, FileResponse, StreamingResponse
 from fastapi.websockets import WebSocket
 import uuid
 from pathlib import Path
@@ -12,8 +12,6 @@ import speech_recognition as sr
 import io
 import wave
 import numpy as np
-import subprocess
-import tempfile
 import starlette.websockets
 from random import choice
 import json
@@ -23,12 +21,35 @@ from pydantic import BaseModel
 from .call_handler import CallHandler
 from ai_call_agent.services.llm_service import LLMService
 from ai_call_agent.services.rag_service import RAGService
-from gtts import gTTS
+from ai_call_agent.services.ingestion_service import IngestionService
+from ai_call_agent.services.intent_matcher import get_intent_matcher
+from ai_call_agent.services.tts_cache import get_tts_cache
+from ai_call_agent.services.voice_service import VoiceService
+from ai_call_agent.services.speech_pipeline import SentenceSplitter, SpeechStreamer
+from ai_call_agent.services.demo_audio import create_demo_audio
+from ai_call_agent.phrases import TRANSLATIONS, AI_RESPONSES
+from ai_call_agent.services.stt_service import STTWorkerPool, STTPoolSaturated, transcribe_samples
+from ai_call_agent.services.audio_ingest import (
+    AudioTooLarge, NotWavError, create_buffer_pool, read_wav_upload, read_upload_bytes
+)
+from ai_call_agent.services.stt_engines import create_stt_engine
+from ai_call_agent.services.voice_stream import StreamingTranscriber, OpusFrameDecoder
+from ai_call_agent.services.vad import create_vad
+from ai_call_agent.services.audio_decode import (
+    TARGET_SAMPLE_RATE, UnsupportedAudioFormat, decode_audio, normalize_samples
+)
+from starlette.concurrency import run_in_threadpool
 from typing import Dict, Any, Optional
-from sqlalchemy import create_engine, Column, String, DateTime, Boolean, Text
-from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker, Session
-from datetime import datetime
+from sqlalchemy import select, update, delete
+from sqlalchemy.ext.asyncio import AsyncSession
+from ai_call_agent.database import (
+    engine, SessionLocal, User, ChatSession, ChatMessage, init_db, get_db, get_pool_stats
+)
+from ai_call_agent.services.transcript_store import (
+    create_transcript_writer, fetch_messages, list_sessions, stream_transcript
+)
+from datetime import datetime, timedelta
+import secrets
 import jwt
 import sounddevice as sd
 import asyncio
@@ -66,49 +87,12 @@ app.add_middleware(
 AUDIO_DIR = Path("static/audio")
 AUDIO_DIR.mkdir(parents=True, exist_ok=True)
 
-# Adăugăm dicționar pentru traduceri
-TRANSLATIONS = {
-    "en": {
-        "greeting": "Hello! I'm the AI Call Agent. How can I help you today?",
-        "info_request": "I'd like to know more about your services.",
-        "service_info": "Of course! We offer complete AI voice assistance services for call centers...",
-        "error_msg": "Could not connect to AI Call Agent. Please try again later."
-    },
-    "de": {
-        "greeting": "Hallo! Ich bin der KI-Call-Agent. Wie kann ich Ihnen heute helfen?",
-        "info_request": "Ich möchte mehr über Ihre Dienstleistungen erfahren.",
-        "service_info": "Natürlich! Wir bieten komplette KI-Sprachassistenzdienste für Call-Center...",
-        "error_msg": "Verbindung zum KI-Call-Agent nicht möglich. Bitte versuchen Sie es später erneut."
-    }
-}
-
-# Răspunsuri predefinite pentru agent
-AI_RESPONSES = {
-    "greeting": [
-        "Hello! How can I help you today?",
-        "Hi there! What can I do for you?",
-        "Good day! How may I assist you?"
-    ],
-    "acknowledgment": [
-        "I understand. Let me help you with that.",
-        "I see what you mean.",
-        "Got it, here's what I can tell you."
-    ],
-    "information": [
-        "We offer comprehensive AI solutions for businesses.",
-        "Our services include voice recognition and natural language processing.",
-        "We can help automate your customer service operations."
-    ]
-}
-
 def generate_ai_response(transcription: str) -> str:
     """Generează un răspuns contextual bazat pe transcrierea primită."""
-    transcription = transcription.lower()
+    intent = get_intent_matcher().match(transcription).get("demo_intent")
     
-    if any(word in transcription for word in ['hello', 'hi', 'hey']):
-        return choice(AI_RESPONSES["greeting"])
-    elif any(word in transcription for word in ['what', 'how', 'tell']):
-        return choice(AI_RESPONSES["information"])
+    if intent:
+        return choice(AI_RESPONSES[intent["value"]])
     else:
         return choice(AI_RESPONSES["acknowledgment"])
 
@@ -127,7 +111,9 @@ async def handle_demo_call(request: Request):
             "ai_response": texts["greeting"],
             "user_response": texts["info_request"],
             "ai_follow_up": texts["service_info"],
-            "language": language
+            "language": language,
+            # Variante opus/mp3 pre-generate; lipsesc până la prima generare
+            "audio": demo_audio.audio_for(language)
         })
         
     except Exception as e:
@@ -137,27 +123,98 @@ async def handle_demo_call(request: Request):
             "message": str(e)
         }, status_code=500)
 
+# Pool dedicat pentru speech-to-text (apeluri blocante)
+stt_pool = STTWorkerPool.from_env()
+# Motorul STT (STT_ENGINE=google|whisper|vosk), încărcat o singură dată per worker
+stt_engine = create_stt_engine(num_workers=stt_pool.max_workers)
+# VAD_BACKEND=energy|webrtc; taie tăcerea înainte de transcriere
+stt_vad_backend = os.getenv("VAD_BACKEND", "energy")
+stt_max_utterance = float(os.getenv("STT_MAX_UTTERANCE_SECONDS", "15"))
+# Buffere PCM refolosite: memoria pentru upload-uri nu crește cu lungimea clipurilor
+audio_max_seconds = float(os.getenv("AUDIO_MAX_SECONDS", "120"))
+audio_buffers = create_buffer_pool(stt_pool.max_workers + stt_pool.max_queue)
+# Antetele multipart și câmpurile formularului, peste dimensiunea audio
+AUDIO_UPLOAD_OVERHEAD = 64 * 1024
+
+@app.middleware("http")
+async def limit_voice_upload(request: Request, call_next):
+    # Starlette citește (și scrie pe disc) tot corpul multipart înainte să ajungă
+    # în handler, deci limita trebuie aplicată aici, după Content-Length. Cererile
+    # chunked fără Content-Length sunt limitate doar după citire, în handler.
+    if request.url.path == "/process-voice":
+        length = request.headers.get("content-length", "")
+        if length.isdigit() and int(length) > audio_buffers.buffer_bytes + AUDIO_UPLOAD_OVERHEAD:
+            logger.warning(f"Voice upload rejected: {length} bytes")
+            return JSONResponse({
+                "status": "error",
+                "message": f"Audio file too large (max {audio_buffers.buffer_bytes // (1024 * 1024)} MB)"
+            }, status_code=413)
+    return await call_next(request)
+
+@app.get("/demo-audio/{name:path}")
+async def get_demo_audio(name: str, request: Request):
+    return demo_audio.response(name, request)
+
 @app.post("/process-voice")
 async def process_voice(audio: UploadFile = File(...)):
     try:
         logger.info("Received voice processing request")
-        audio_content = await audio.read()
-        logger.info(f"Received audio size: {len(audio_content)} bytes")
-
-        with io.BytesIO(audio_content) as audio_bytes:
-            recognizer = sr.Recognizer()
-            with sr.AudioFile(audio_bytes) as source:
-                logger.info("Reading audio file...")
-                audio_data = recognizer.record(source)
-                logger.info("Transcribing audio...")
-                transcription = recognizer.recognize_google(audio_data)
-                logger.info(f"Transcription result: {transcription}")
+
+        # Doar regiunile cu vorbire, transcrise în paralel pe pool-ul STT
+        async with audio_buffers.acquire() as buffer:
+            try:
+                samples, sample_rate = await read_wav_upload(audio.file, buffer, audio_max_seconds)
+                logger.info(f"Received audio: {len(samples) / sample_rate:.1f}s at {sample_rate} Hz")
+                samples = normalize_samples(samples, sample_rate)
+            except NotWavError:
+                # webm/opus, ogg, flac etc.: decodare și resampling în proces, fără ffmpeg
+                await audio.seek(0)
+                audio_content = await read_upload_bytes(audio.file, audio_buffers.buffer_bytes)
+                logger.info(f"Received {audio.content_type} audio: {len(audio_content)} bytes")
+                samples = await run_in_threadpool(decode_audio, audio_content)
+            if len(samples) > audio_max_seconds * TARGET_SAMPLE_RATE:
+                raise AudioTooLarge(f"Audio too long (max {audio_max_seconds:.0f}s)")
+
+            result = await transcribe_samples(
+                stt_pool,
+                stt_engine,
+                samples,
+                TARGET_SAMPLE_RATE,
+                vad=create_vad(stt_vad_backend),
+                max_utterance_s=stt_max_utterance
+            )
+        transcription = result["text"]
+        logger.info(f"Transcription result ({result['segments']} segments): {transcription}")
 
         return JSONResponse({
             "status": "success",
             "transcription": transcription,
             "response": f"I understand you said: {transcription}"
         })
+    except AudioTooLarge as e:
+        logger.warning(f"Voice upload rejected: {str(e)}")
+        return JSONResponse({
+            "status": "error",
+            "message": str(e)
+        }, status_code=413)
+    except UnsupportedAudioFormat as e:
+        logger.warning(f"Voice upload rejected: {str(e)}")
+        return JSONResponse({
+            "status": "error",
+            "message": str(e)
+        }, status_code=415)
+    except STTPoolSaturated as e:
+        logger.warning(f"Voice processing rejected: {str(e)}")
+        return JSONResponse({
+            "status": "error",
+            "message": str(e)
+        }, status_code=429, headers={"Retry-After": "1"})
+    except asyncio.TimeoutError:
+        logger.error("Voice processing timed out")
+        return JSONResponse({
+            "status": "error",
+            "message": "Speech recognition timed out"
+        }, status_code=504)
     except Exception as e:
         logger.error(f"Error processing voice: {str(e)}")
         return JSONResponse({
@@ -171,18 +228,26 @@ async def health_check():
         "status": "healthy",
         "services": {
             "speech_recognition": True
-        }
+        },
+        "stt_engine": stt_engine.name,
+        "stt_pool": stt_pool.get_stats()
     })
 
 # Adăugăm servirea fișierelor statice
 app.mount("/static", StaticFiles(directory="static"), name="static")
 
 # Initialize call handler
-call_handler = CallHandler()
+call_handler = CallHandler(dialogflow)
 
 # Initialize LLM service
 llm_service = LLMService()
 
+# Sinteză vocală (ElevenLabs, cu cache pe disc)
+voice_service = VoiceService(os.getenv("ELEVENLABS_API_KEY"))
+tts_concurrency = int(os.getenv("TTS_STREAM_CONCURRENCY", "3"))
+# Audio pre-generat pentru scriptul fix din /demo-call
+demo_audio = create_demo_audio(voice_service)
+
 # Initialize RAG service
 try:
     logger.info("Initializing RAG service...")
@@ -192,6 +257,9 @@ except Exception as e:
     logger.error(f"Failed to initialize RAG service: {str(e)}")
     raise
 
+# Initialize document ingestion
+ingestion_service = IngestionService(rag_service)
+
 class Message(BaseModel):
     text: str
     session_id: str | None = None
@@ -224,6 +292,43 @@ async def chat(request: Request):
         logger.error(f"Chat error: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/api/chat/stream")
+async def chat_stream(request: Request):
+    """Server-Sent Events: text deltas as the model generates them, then a final "done" event."""
+    try:
+        body = await request.json()
+    except json.JSONDecodeError:
+        logger.error("Invalid JSON")
+        raise HTTPException(status_code=400, detail="Invalid JSON")
+    
+    message = body.get("message")
+    if not message:
+        raise HTTPException(status_code=400, detail="Message is required")
+    
+    logger.info(f"Received streaming message: {message}")
+    
+    async def event_stream():
+        try:
+            async for event in rag_service.stream_response(message):
+                if event["type"] == "delta":
+                    payload = {"type": "text", "delta": event["text"]}
+                else:
+                    payload = {
+                        "type": "done",
+                        "response": event["text"],
+                        "source": event.get("source", "unknown")
+                    }
+                yield f"data: {json.dumps(payload)}\n\n"
+        except Exception as e:
+            logger.error(f"Chat stream error: {str(e)}")
+            yield f"data: {json.dumps({'type': 'error', 'message': str(e)})}\n\n"
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @app.post("/api/voice")
 async def voice_chat(request: Request):
     try:
@@ -236,64 +341,94 @@ async def voice_chat(request: Request):
         logger.error(f"Voice chat error: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
-# Database configuration
-DB_USER = os.getenv("DB_USER", "postgres")
-DB_PASSWORD = os.getenv("DB_PASSWORD", "Secret1975")
-DB_NAME = "ai-call-agency"
-DB_HOST = os.getenv("DB_HOST", "localhost")
-DB_PORT = os.getenv("DB_PORT", "5432")
-
-SQLALCHEMY_DATABASE_URL = f"postgresql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
-
-# Initialize SQLAlchemy
-engine = create_engine(SQLALCHEMY_DATABASE_URL)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-Base = declarative_base()
-
-# Models
-class User(Base):
-    __tablename__ = "users"
-    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
-    name = Column(String, nullable=False)
-    email = Column(String, unique=True, nullable=True)
-    gdpr_accepted = Column(Boolean, default=False)
-    gdpr_accepted_date = Column(DateTime, nullable=True)
-    created_at = Column(DateTime, default=datetime.utcnow)
-
-class ChatSession(Base):
-    __tablename__ = "chat_sessions"
-    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
-    user_id = Column(String, nullable=True)
-    start_time = Column(DateTime, default=datetime.utcnow)
-    end_time = Column(DateTime, nullable=True)
-    transcript = Column(Text, default="")
-    voice_enabled = Column(Boolean, default=False)
-    video_enabled = Column(Boolean, default=False)
-
-Base.metadata.create_all(bind=engine)
-
-# Dependency for database sessions
-def get_db():
-    db = SessionLocal()
+# Admin API pentru corpusul RAG
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN")
+
+def verify_admin(x_admin_token: Optional[str] = Header(None)):
+    if not ADMIN_TOKEN or x_admin_token != ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Admin token required")
+
+@app.get("/api/admin/documents", dependencies=[Depends(verify_admin)])
+async def list_documents():
+    return {
+        "version": rag_service.corpus_version,
+        "documents": ingestion_service.list_documents()
+    }
+
+@app.post("/api/admin/documents", dependencies=[Depends(verify_admin)])
+async def upload_document(document: UploadFile = File(...)):
+    try:
+        content = await document.read()
+        return await ingestion_service.add_document(document.filename, content)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Document ingestion error: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.delete("/api/admin/documents/{filename}", dependencies=[Depends(verify_admin)])
+async def delete_document(filename: str):
     try:
-        yield db
-    finally:
-        db.close()
+        return await ingestion_service.delete_document(filename)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        logger.error(f"Document deletion error: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/api/admin/metrics", dependencies=[Depends(verify_admin)])
+async def get_metrics():
+    return {
+        "rag": rag_service.get_metrics(),
+        "stt_pool": stt_pool.get_stats(),
+        "tts_cache": get_tts_cache().get_stats(),
+        "tts": voice_service.router.get_stats(),
+        "dialogflow": dialogflow.get_stats(),
+        "intent_pipeline": call_handler.intent_pipeline.get_stats(),
+        "db_pool": get_pool_stats(),
+        "transcripts": transcript_writer.get_stats(),
+        "llm_answer_cache": llm_service.answer_cache.get_stats() if llm_service.answer_cache else None
+    }
+
+@app.post("/api/admin/reindex", dependencies=[Depends(verify_admin)])
+async def reindex_documents():
+    try:
+        return await ingestion_service.sync()
+    except Exception as e:
+        logger.error(f"Reindex error: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
 
 # GDPR consent model
 class GDPRConsent(BaseModel):
     user_name: str
     consent: bool
 
+# Fără JWT_SECRET_KEY, token-urile sunt valide doar până la repornire
+JWT_SECRET_KEY = os.getenv("JWT_SECRET_KEY") or secrets.token_urlsafe(32)
+JWT_EXPIRE_HOURS = float(os.getenv("JWT_EXPIRE_HOURS", "24"))
+
+def generate_user_id() -> str:
+    return str(uuid.uuid4())
+
+def create_access_token(user_id: str) -> str:
+    now = datetime.utcnow()
+    payload = {"sub": user_id, "iat": now, "exp": now + timedelta(hours=JWT_EXPIRE_HOURS)}
+    return jwt.encode(payload, JWT_SECRET_KEY, algorithm="HS256")
+
 # Store active connections
 active_connections: Dict[str, Dict[str, Any]] = {}
 
+# Mesajele se scriu în loturi în chat_messages, nu la final ca un singur JSON
+transcript_writer = create_transcript_writer(SessionLocal)
+
 @app.post("/api/gdpr-consent")
-async def submit_gdpr_consent(consent: GDPRConsent, db: Session = Depends(get_db)):
+async def submit_gdpr_consent(consent: GDPRConsent, db: AsyncSession = Depends(get_db)):
     if not consent.consent:
         raise HTTPException(status_code=400, detail="GDPR consent is required")
     
-    user_id = generate_user_id()  # Implement user ID generation
+    user_id = generate_user_id()
     user = User(
         id=user_id,
         name=consent.user_name,
@@ -301,26 +436,25 @@ async def submit_gdpr_consent(consent: GDPRConsent, db: Session = Depends(get_db
         gdpr_accepted_date=datetime.utcnow()
     )
     db.add(user)
-    db.commit()
+    await db.commit()
     
-    token = create_access_token(user_id)  # Implement JWT token creation
+    token = create_access_token(user_id)
     return {"token": token, "user_id": user_id}
 
 @app.websocket("/ws")
 async def websocket_endpoint(websocket: WebSocket):
     await websocket.accept()
     
-    # Create new session
-    db = SessionLocal()
-    session = ChatSession()
-    db.add(session)
-    db.commit()
+    # Create new session; conexiunea revine în pool după commit
+    async with SessionLocal() as db:
+        session = ChatSession()
+        db.add(session)
+        await db.commit()
     
     client_id = session.id
     active_connections[client_id] = {
         "websocket": websocket,
-        "session": session,
-        "transcript": []
+        "session": session
     }
     
     try:
@@ -330,51 +464,254 @@ async def websocket_endpoint(websocket: WebSocket):
             
             if "message" in data:
                 # Save user message to transcript
-                message = {
-                    "sender": "user",
-                    "content": data["message"],
-                    "timestamp": datetime.utcnow().isoformat()
-                }
-                active_connections[client_id]["transcript"].append(message)
+                transcript_writer.append(client_id, "user", data["message"])
                 
-                # Get AI response
-                response = await rag_service.get_response(data["message"])
+                # Stream AI response token by token
+                response_text = ""
+                async for event in rag_service.stream_response(data["message"]):
+                    if event["type"] == "delta":
+                        await websocket.send_json({
+                            "type": "text",
+                            "sender": "ai",
+                            "name": "George",
+                            "delta": event["text"]
+                        })
+                    else:
+                        response_text = event["text"]
                 
                 # Save AI response to transcript
+                row = transcript_writer.append(client_id, "ai", response_text, name="George")
                 ai_message = {
                     "sender": "ai",
                     "name": "George",
-                    "content": response["text"],
-                    "timestamp": datetime.utcnow().isoformat()
+                    "content": response_text,
+                    "timestamp": row["created_at"].isoformat()
                 }
-                active_connections[client_id]["transcript"].append(ai_message)
                 
-                # Send response to client
-                await websocket.send_json(ai_message)
+                # Final frame with the complete message
+                await websocket.send_json({"type": "done", **ai_message})
                 
     except Exception as e:
         logger.error(f"WebSocket error: {str(e)}")
     finally:
-        # Save transcript and close session
+        # Close session; mesajele rămase în buffer se scriu la următorul flush
+        transcript_writer.end_session(client_id)
         session.end_time = datetime.utcnow()
-        session.transcript = json.dumps(active_connections[client_id]["transcript"])
-        db.commit()
-        db.close()
+        async with SessionLocal() as db:
+            await db.execute(
+                update(ChatSession).where(ChatSession.id == client_id).values(end_time=session.end_time)
+            )
+            await db.commit()
         
         del active_connections[client_id]
         await websocket.close()
 
+@app.websocket("/ws/call/{user_id}")
+async def voice_call_endpoint(websocket: WebSocket, user_id: str):
+    """
+    Apel vocal în timp real.
+
+    Clientul trimite opțional {"type": "start", "format": "pcm16"|"opus", "sample_rate": 16000},
+    apoi cadre binare de 20 ms (PCM int16 mono sau pachete Opus) și {"type": "stop"} la final.
+    Serverul trimite transcrieri parțiale/finale și răspunsul AI (delta + done).
+    """
+    await websocket.accept()
+
+    async with SessionLocal() as db:
+        session = ChatSession(user_id=user_id, voice_enabled=True)
+        db.add(session)
+        await db.commit()
+
+    client_id = session.id
+    active_connections[client_id] = {
+        "websocket": websocket,
+        "session": session
+    }
+
+    utterances: asyncio.Queue = asyncio.Queue()
+
+    async def on_event(event: Dict[str, Any]) -> None:
+        if event["type"] == "transcript":
+            if not event["content"]:
+                return
+            await websocket.send_json({**event, "sender": "user"})
+            if event["final"]:
+                await utterances.put(event["content"])
+        else:
+            await websocket.send_json(event)
+
+    async def answer_utterances() -> None:
+        # Răspunsurile se generează pe rând, în ordinea frazelor
+        while True:
+            text = await utterances.get()
+            transcript_writer.append(client_id, "user", text)
+            response_text = ""
+            # Fiecare propoziție completă intră la sinteză cât timp LLM-ul continuă
+            splitter = SentenceSplitter()
+            speech = SpeechStreamer(
+                voice_service.synthesize_url,
+                websocket.send_json,
+                max_concurrency=tts_concurrency
+            )
+            try:
+                async for event in rag_service.stream_response(text):
+                    if event["type"] == "delta":
+                        await websocket.send_json({
+                            "type": "text",
+                            "sender": "ai",
+                            "name": "George",
+                            "delta": event["text"]
+                        })
+                        for sentence in splitter.feed(event["text"]):
+                            speech.add(sentence)
+                    else:
+                        response_text = event["text"]
+                for sentence in splitter.flush():
+                    speech.add(sentence)
+            except BaseException:
+                await speech.cancel()
+                raise
+            row = transcript_writer.append(client_id, "ai", response_text, name="George")
+            ai_message = {
+                "sender": "ai",
+                "name": "George",
+                "content": response_text,
+                "timestamp": row["created_at"].isoformat()
+            }
+            await websocket.send_json({"type": "done", **ai_message})
+            await speech.finish()
+
+    sample_rate = 16000
+    frame_ms = 20
+    decoder = None
+    # False după un "start" cu un format pe care serverul nu îl poate decoda
+    accept_audio = True
+    transcriber = StreamingTranscriber(
+        stt_engine,
+        stt_pool,
+        on_event,
+        sample_rate=sample_rate,
+        frame_ms=frame_ms,
+        # Parțialele dublează apelurile STT; implicit doar pentru motoarele locale
+        partials=os.getenv("STT_PARTIALS", str(stt_engine.name != "google")).lower() == "true"
+    )
+    responder = asyncio.create_task(answer_utterances())
+
+    try:
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                break
+            if message.get("bytes") is not None:
+                if not accept_audio:
+                    continue
+                frame = message["bytes"]
+                if decoder is not None:
+                    try:
+                        frame = decoder.decode(frame)
+                    except Exception as e:
+                        # Un pachet corupt nu închide apelul
+                        await websocket.send_json({"type": "error", "code": 400, "message": f"Invalid Opus packet: {str(e)}"})
+                        continue
+                transcriber.feed(frame)
+            elif message.get("text"):
+                data = json.loads(message["text"])
+                if data.get("type") == "start":
+                    sample_rate = int(data.get("sample_rate", sample_rate))
+                    frame_ms = int(data.get("frame_ms", frame_ms))
+                    transcriber.configure(sample_rate, frame_ms)
+                    decoder = None
+                    accept_audio = True
+                    if data.get("format") == "opus":
+                        try:
+                            decoder = OpusFrameDecoder(sample_rate, frame_ms)
+                        except Exception as e:
+                            # opuslib sau libopus lipsesc: refuzăm formatul acum, nu la primul cadru
+                            logger.warning(f"Opus decoder unavailable: {str(e)}")
+                            accept_audio = False
+                            await websocket.send_json({
+                                "type": "error",
+                                "code": 415,
+                                "message": "Opus audio is not supported by this server; send pcm16"
+                            })
+                elif data.get("type") == "stop":
+                    await transcriber.flush()
+
+    except Exception as e:
+        logger.error(f"Voice WebSocket error: {str(e)}")
+    finally:
+        await transcriber.close()
+        responder.cancel()
+        try:
+            await responder
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            logger.error(f"Voice responder error: {str(e)}")
+
+        transcript_writer.end_session(client_id)
+        session.end_time = datetime.utcnow()
+        async with SessionLocal() as db:
+            await db.execute(
+                update(ChatSession).where(ChatSession.id == client_id).values(end_time=session.end_time)
+            )
+            await db.commit()
+
+        del active_connections[client_id]
+
 @app.get("/api/sessions/{user_id}")
-async def get_user_sessions(user_id: str, db: Session = Depends(get_db)):
-    sessions = db.query(ChatSession).filter(ChatSession.user_id == user_id).all()
-    return sessions
+async def get_user_sessions(
+    user_id: str,
+    cursor: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(get_db)
+):
+    """Sesiunile utilizatorului, fără transcriere; `cursor` = `next_cursor` din pagina anterioară."""
+    try:
+        return await list_sessions(db, user_id, cursor, limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@app.get("/api/sessions/{session_id}/transcript")
+async def get_session_transcript(session_id: str, db: AsyncSession = Depends(get_db)):
+    """Transcrierea unei sesiuni ca NDJSON, trimisă pe măsură ce este citită."""
+    if await db.scalar(select(ChatSession.id).where(ChatSession.id == session_id)) is None:
+        raise HTTPException(status_code=404, detail="Session not found")
+    return StreamingResponse(
+        stream_transcript(SessionLocal, session_id),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": f'attachment; filename="session-{session_id}.ndjson"'}
+    )
+
+@app.get("/api/sessions/{session_id}/messages")
+async def get_session_messages(
+    session_id: str,
+    after: int = -1,
+    limit: int = Query(100, ge=1, le=500),
+    db: AsyncSession = Depends(get_db)
+):
+    """Mesajele unei sesiuni, pagină cu pagină: `after` = ultimul `seq` primit."""
+    messages = await fetch_messages(db, session_id, after, limit)
+    # O pagină goală poate fi și o sesiune inexistentă; ca la /transcript
+    if not messages and await db.scalar(select(ChatSession.id).where(ChatSession.id == session_id)) is None:
+        raise HTTPException(status_code=404, detail="Session not found")
+    return {
+        "messages": messages,
+        "next_after": messages[-1]["seq"] if len(messages) == limit else None
+    }
 
 @app.delete("/api/sessions/{session_id}")
-async def delete_session(session_id: str, db: Session = Depends(get_db)):
-    session = db.query(ChatSession).filter(ChatSession.id == session_id).first()
+async def delete_session(session_id: str, db: AsyncSession = Depends(get_db)):
+    # O sesiune deschisă ar continua să adauge mesaje după ștergere
+    if session_id in active_connections:
+        raise HTTPException(status_code=409, detail="Session is still active")
+    session = await db.get(ChatSession, session_id)
     if session:
-        db.delete(session)
-        db.commit()
+        await transcript_writer.discard(session_id)
+        # Explicit: SQLite nu aplică ON DELETE CASCADE fără PRAGMA foreign_keys
+        await db.execute(delete(ChatMessage).where(ChatMessage.session_id == session_id))
+        await db.delete(session)
+        await db.commit()
         return {"message": "Session deleted"}
     raise HTTPException(status_code=404, detail="Session not found")
 
@@ -382,10 +719,30 @@ async def delete_session(session_id: str, db: Session = Depends(get_db)):
 async def startup_event():
     try:
         # Create database tables
-        Base.metadata.create_all(bind=engine)
+        await init_db()
         logger.info("Database tables created successfully")
     except Exception as e:
         logger.error(f"Error creating database tables: {str(e)}")
+    transcript_writer.start()
+    
+    # Sincronizare periodică a directorului de documente: așa ajung în indexul live
+    # documentele adăugate cu CLI-ul (ingest.py). RAG_WATCH_INTERVAL=0 o dezactivează.
+    watch_interval = float(os.getenv("RAG_WATCH_INTERVAL", "30"))
+    if watch_interval > 0:
+        ingestion_service.start_watching(watch_interval)
+
+    # Audio pentru demo: din manifest dacă există, altfel generat în fundal
+    demo_audio.start_rendering(TRANSLATIONS)
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    ingestion_service.stop_watching()
+    await demo_audio.stop_rendering()
+    stt_pool.shutdown()
+    await voice_service.aclose()
+    await dialogflow.close()
+    await transcript_writer.stop()
+    await engine.dispose()
 
 if __name__ == "__main__":
     import uvicorn
@@ -0,0 +1,40 @@
+"""
+Texte fixe ale agentului (demo și răspunsuri predefinite).
+
+Sunt importate de main.py și pre-sintetizate de `python -m ai_call_agent.prewarm_tts`.
+"""
+
+# Adăugăm dicționar pentru traduceri
+TRANSLATIONS = {
+    "en": {
+        "greeting": "Hello! I'm the AI Call Agent. How can I help you today?",
+        "info_request": "I'd like to know more about your services.",
+        "service_info": "Of course! We offer complete AI voice assistance services for call centers...",
+        "error_msg": "Could not connect to AI Call Agent. Please try again later."
+    },
+    "de": {
+        "greeting": "Hallo! Ich bin der KI-Call-Agent. Wie kann ich Ihnen heute helfen?",
+        "info_request": "Ich möchte mehr über Ihre Dienstleistungen erfahren.",
+        "service_info": "Natürlich! Wir bieten komplette KI-Sprachassistenzdienste für Call-Center...",
+        "error_msg": "Verbindung zum KI-Call-Agent nicht möglich. Bitte versuchen Sie es später erneut."
+    }
+}
+
+# Răspunsuri predefinite pentru agent
+AI_RESPONSES = {
+    "greeting": [
+        "Hello! How can I help you today?",
+        "Hi there! What can I do for you?",
+        "Good day! How may I assist you?"
+    ],
+    "acknowledgment": [
+        "I understand. Let me help you with that.",
+        "I see what you mean.",
+        "Got it, here's what I can tell you."
+    ],
+    "information": [
+        "We offer comprehensive AI solutions for businesses.",
+        "Our services include voice recognition and natural language processing.",
+        "We can help automate your customer service operations."
+    ]
+}
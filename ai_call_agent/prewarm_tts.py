@@ -0,0 +1,102 @@
+"""
+Pre-sintetizează toate frazele fixe în cache-ul TTS.
+
+Apelul vocal sintetizează răspunsurile propoziție cu propoziție (SentenceSplitter),
+deci cache-ul este încălzit cu aceleași propoziții, nu cu textele întregi. Sursele:
+phrases.py, răspunsurile AIService, răspunsurile standard din intents.json
+(INTENTS_FILE) și local_responses.json (NLU_RESPONSES_PATH).
+
+    python -m ai_call_agent.prewarm_tts
+    python -m ai_call_agent.prewarm_tts --voice Rachel
+
+Generează și variantele opus/mp3 pentru /demo-call (static/audio/demo).
+
+Concurența este limitată de providerul TTS (TTS_CONCURRENCY).
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+from dotenv import load_dotenv
+from ai_call_agent.phrases import TRANSLATIONS, AI_RESPONSES
+from ai_call_agent.services.ai_service import AIService
+from ai_call_agent.services.voice_service import VoiceService
+from ai_call_agent.services.demo_audio import create_demo_audio
+from ai_call_agent.services.intent_matcher import DEFAULT_INTENTS_FILE
+from ai_call_agent.services.intent_pipeline import DEFAULT_RESPONSES_PATH
+from ai_call_agent.services.speech_pipeline import SentenceSplitter
+
+
+def load_json(path: str) -> dict:
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def canned_texts():
+    """Toate răspunsurile fixe, întregi."""
+    texts = []
+    for translations in TRANSLATIONS.values():
+        texts.extend(translations.values())
+    for variants in AI_RESPONSES.values():
+        texts.extend(variants)
+    texts.extend(AIService().default_responses.values())
+    # Doar standard_response are ca valoare un răspuns; celelalte grupuri au etichete
+    intents = load_json(os.getenv("INTENTS_FILE", DEFAULT_INTENTS_FILE))
+    texts.extend(entry["value"] for entry in intents.get("groups", {}).get("standard_response", []))
+    for responses in load_json(os.getenv("NLU_RESPONSES_PATH", str(DEFAULT_RESPONSES_PATH))).values():
+        texts.extend(responses.values())
+    return texts
+
+
+def split_sentences(text: str):
+    """Propozițiile exact cum le trimite la sinteză apelul vocal."""
+    splitter = SentenceSplitter()
+    return splitter.feed(text) + splitter.flush()
+
+
+def canned_phrases():
+    """Propozițiile tuturor textelor fixe, fără duplicate, în ordine stabilă."""
+    return list(dict.fromkeys(sentence for text in canned_texts() for sentence in split_sentences(text)))
+
+
+async def run(args: argparse.Namespace) -> int:
+    voice_service = VoiceService(os.getenv("ELEVENLABS_API_KEY"))
+    phrases = canned_phrases()
+
+    results = await asyncio.gather(
+        *(voice_service.synthesize_file(text, args.voice) for text in phrases),
+        return_exceptions=True
+    )
+    failed = 0
+    for text, result in zip(phrases, results):
+        if isinstance(result, Exception):
+            failed += 1
+            print(f"Error: {text[:40]!r}: {str(result)}", file=sys.stderr)
+    demo = await create_demo_audio(voice_service).render(TRANSLATIONS)
+    await voice_service.aclose()
+
+    print(json.dumps({
+        "phrases": len(phrases),
+        "failed": failed,
+        "demo_languages": sorted(demo),
+        "cache": voice_service.cache.get_stats(),
+        "tts": voice_service.router.get_stats()
+    }, indent=2))
+    return 1 if failed else 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Pre-render canned phrases into the TTS cache")
+    parser.add_argument("--voice", default="Rachel")
+    args = parser.parse_args()
+
+    load_dotenv()
+    return asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
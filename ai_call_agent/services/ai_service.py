@@ -1,5 +1,7 @@
 from elevenlabs import generate
 from ..models import AIResponse
+from .intent_matcher import get_intent_matcher
+from .tts_cache import get_tts_cache
 
 
 class AIService:
@@ -37,20 +39,14 @@ class AIService:
         """
         Generează un răspuns de bază bazat pe cuvinte cheie
         """
-        text = text.lower()
+        intent = get_intent_matcher().match(text).get("basic_intent")
         
         # Logică simplă de răspuns
-        if any(word in text for word in ["bună", "salut", "hey"]):
+        if intent:
             return AIResponse(
-                text=self.default_responses["greeting"],
+                text=self.default_responses[intent["value"]],
                 confidence=0.9,
-                intent="greeting"
-            )
-        elif any(word in text for word in ["la revedere", "pa", "bye"]):
-            return AIResponse(
-                text=self.default_responses["farewell"],
-                confidence=0.9,
-                intent="farewell"
+                intent=intent["value"]
             )
         else:
             # Aici putem adăuga logică mai complexă pentru alte tipuri de întrebări
@@ -65,12 +61,14 @@ class AIService:
         Generează răspunsul vocal folosind ElevenLabs
         """
         try:
-            audio = generate(
+            cache = get_tts_cache()
+            key = cache.make_key(text, "Rachel", "eleven_multilingual_v2")
+            path = cache.get_or_create(key, lambda: generate(
                 text=text,
                 voice="Rachel",
                 model="eleven_multilingual_v2"
-            )
-            return audio
+            ))
+            return path.read_bytes()
         except Exception as e:
             raise Exception(f"Eroare la generarea vocii: {str(e)}")
 
@@ -0,0 +1,198 @@
+from typing import Dict, Any, Optional, Tuple
+from collections import OrderedDict
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import asyncio
+import logging
+import threading
+from .text_utils import normalize_query
+
+logger = logging.getLogger(__name__)
+
+
+class MemoryCacheBackend:
+    """Backend în memorie; folosit în teste și ca înlocuitor pentru Redis."""
+
+    def __init__(self):
+        self._data: Dict[str, Tuple[str, float]] = {}
+
+    async def get(self, key: str) -> Optional[str]:
+        item = self._data.get(key)
+        if item is None:
+            return None
+        value, expires = item
+        if expires < time.time():
+            del self._data[key]
+            return None
+        return value
+
+    async def set(self, key: str, value: str, ttl: float) -> None:
+        self._data[key] = (value, time.time() + ttl)
+
+    async def clear(self) -> None:
+        self._data.clear()
+
+
+class SQLiteCacheBackend:
+    """Backend SQLite partajat între workerii uvicorn de pe aceeași mașină."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS answer_cache (key TEXT PRIMARY KEY, value TEXT NOT NULL, expires REAL NOT NULL)"
+        )
+
+    def _get(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM answer_cache WHERE key = ? AND expires >= ?", (key, time.time())
+            ).fetchone()
+        return row[0] if row else None
+
+    def _set(self, key: str, value: str, ttl: float) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO answer_cache (key, value, expires) VALUES (?, ?, ?)",
+                (key, value, time.time() + ttl)
+            )
+
+    def _clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM answer_cache")
+
+    async def get(self, key: str) -> Optional[str]:
+        return await asyncio.to_thread(self._get, key)
+
+    async def set(self, key: str, value: str, ttl: float) -> None:
+        await asyncio.to_thread(self._set, key, value, ttl)
+
+    async def clear(self) -> None:
+        await asyncio.to_thread(self._clear)
+
+
+class RedisCacheBackend:
+    """Backend Redis (sau compatibil: KeyDB, Valkey) prin redis.asyncio."""
+
+    def __init__(self, url: str, prefix: str = "answer-cache:"):
+        import redis.asyncio as redis
+        self.client = redis.from_url(url, decode_responses=True)
+        self.prefix = prefix
+
+    async def get(self, key: str) -> Optional[str]:
+        return await self.client.get(self.prefix + key)
+
+    async def set(self, key: str, value: str, ttl: float) -> None:
+        await self.client.set(self.prefix + key, value, ex=max(1, int(ttl)))
+
+    async def clear(self) -> None:
+        async for key in self.client.scan_iter(match=f"{self.prefix}*"):
+            await self.client.delete(key)
+
+
+class AnswerCache:
+    """
+    Two-level exact-match answer cache.
+
+    Keys are built from the normalized query (lowercase, no diacritics) plus the
+    corpus and prompt versions, so a reindex or a prompt change never serves a
+    stale answer. Lookups hit an in-process LRU first and then the shared
+    backend; errors from the shared backend are logged and treated as misses.
+    """
+
+    def __init__(self, backend=None, local_size: int = 512, ttl: float = 3600.0):
+        self.backend = backend
+        self.local_size = local_size
+        self.ttl = ttl
+        self._local: "OrderedDict[str, Tuple[Dict[str, Any], float]]" = OrderedDict()
+        self.stats = {"local_hits": 0, "shared_hits": 0, "misses": 0, "errors": 0}
+
+    @staticmethod
+    def make_key(namespace: str, query: str, *versions: Optional[str]) -> str:
+        payload = "\x1f".join([namespace, normalize_query(query), *(v or "" for v in versions)])
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _store_local(self, key: str, value: Dict[str, Any], expires: float) -> None:
+        self._local[key] = (value, expires)
+        self._local.move_to_end(key)
+        while len(self._local) > self.local_size:
+            self._local.popitem(last=False)
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        item = self._local.get(key)
+        if item is not None:
+            value, expires = item
+            if expires >= time.time():
+                self._local.move_to_end(key)
+                self.stats["local_hits"] += 1
+                return value
+            del self._local[key]
+
+        if self.backend is not None:
+            try:
+                raw = await self.backend.get(key)
+            except Exception as e:
+                logger.warning(f"Answer cache backend error: {str(e)}")
+                self.stats["errors"] += 1
+                raw = None
+            if raw is not None:
+                value = json.loads(raw)
+                self._store_local(key, value, time.time() + self.ttl)
+                self.stats["shared_hits"] += 1
+                return value
+
+        self.stats["misses"] += 1
+        return None
+
+    async def set(self, key: str, value: Dict[str, Any]) -> None:
+        self._store_local(key, value, time.time() + self.ttl)
+        if self.backend is not None:
+            try:
+                await self.backend.set(key, json.dumps(value), self.ttl)
+            except Exception as e:
+                logger.warning(f"Answer cache backend error: {str(e)}")
+                self.stats["errors"] += 1
+
+    async def clear(self) -> None:
+        self._local.clear()
+        if self.backend is not None:
+            await self.backend.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        hits = self.stats["local_hits"] + self.stats["shared_hits"]
+        lookups = hits + self.stats["misses"]
+        return {
+            **self.stats,
+            "local_entries": len(self._local),
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+def create_answer_cache() -> Optional[AnswerCache]:
+    """
+    Creează cache-ul din variabilele de mediu.
+
+    ANSWER_CACHE_BACKEND: "memory" (default), "sqlite", "redis" or "none"
+    ANSWER_CACHE_URL: SQLite file path or Redis URL
+    """
+    backend_name = os.getenv("ANSWER_CACHE_BACKEND", "memory")
+    if backend_name == "none":
+        return None
+    if backend_name == "memory":
+        backend = None
+    elif backend_name == "sqlite":
+        backend = SQLiteCacheBackend(os.getenv("ANSWER_CACHE_URL", "ai_call_agent/data/answer_cache.sqlite3"))
+    elif backend_name == "redis":
+        backend = RedisCacheBackend(os.getenv("ANSWER_CACHE_URL", "redis://localhost:6379/0"))
+    else:
+        raise ValueError(f"Unknown answer cache backend: {backend_name}")
+    return AnswerCache(
+        backend,
+        local_size=int(os.getenv("ANSWER_CACHE_LOCAL_SIZE", "512")),
+        ttl=float(os.getenv("ANSWER_CACHE_TTL", "3600"))
+    )
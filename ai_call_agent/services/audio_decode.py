@@ -0,0 +1,190 @@
+from typing import Tuple
+from functools import lru_cache
+from math import gcd
+import io
+import wave
+import logging
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+TARGET_SAMPLE_RATE = 16000
+
+
+class UnsupportedAudioFormat(ValueError):
+    """Formatul audio nu poate fi decodat în proces."""
+
+
+def sniff_format(head: bytes) -> str:
+    """Recunoaște containerul după primii octeți: wav, webm, ogg, flac, mp3 sau unknown."""
+    if head[:4] == b"RIFF" and head[8:12] == b"WAVE":
+        return "wav"
+    if head[:4] == b"\x1a\x45\xdf\xa3":
+        return "webm"
+    if head[:4] == b"OggS":
+        return "ogg"
+    if head[:4] == b"fLaC":
+        return "flac"
+    if head[:3] == b"ID3" or head[:2] in (b"\xff\xfb", b"\xff\xf3", b"\xff\xf2"):
+        return "mp3"
+    return "unknown"
+
+
+class Resampler:
+    """
+    Polyphase windowed-sinc resampler for a fixed rational rate ratio.
+
+    The ratio is reduced to up/down. One Kaiser-windowed sinc filter per output
+    phase is precomputed, with its cutoff at the lower Nyquist frequency. Each
+    output block is then a single gather plus a row-wise dot product, so there
+    are no Python-level loops over samples. Blocks bound temporary memory.
+    """
+
+    def __init__(self, in_rate: int, out_rate: int, half_taps: int = 16, beta: float = 8.0, block: int = 16384):
+        divisor = gcd(in_rate, out_rate)
+        self.up = out_rate // divisor
+        self.down = in_rate // divisor
+        self.in_rate = in_rate
+        self.out_rate = out_rate
+        self.block = block
+
+        cutoff = min(1.0, out_rate / in_rate)
+        scale = max(1.0, in_rate / out_rate)
+        self.half_width = int(np.ceil(half_taps * scale))
+        offsets = np.arange(-self.half_width + 1, self.half_width + 1)
+        # Faza p: poziția fracționară a eșantionului de ieșire între două de intrare
+        fractions = (np.arange(self.up) * self.down % self.up) / self.up
+        distance = offsets[None, :] - fractions[:, None]
+        window = np.kaiser(2 * self.half_width + 1, beta)
+        window = np.interp(distance, np.arange(-self.half_width, self.half_width + 1), window)
+        bank = cutoff * np.sinc(cutoff * distance) * window
+        self.bank = (bank / bank.sum(axis=1, keepdims=True)).astype(np.float32)
+        self.offsets = offsets
+
+    def __call__(self, audio: np.ndarray) -> np.ndarray:
+        if self.up == self.down:
+            return audio.astype(np.float32, copy=False)
+        n_in = len(audio)
+        n_out = n_in * self.up // self.down
+        padded = np.pad(audio.astype(np.float32, copy=False), (self.half_width, self.half_width + 1))
+        out = np.empty(n_out, dtype=np.float32)
+        for start in range(0, n_out, self.block):
+            n = np.arange(start, min(start + self.block, n_out))
+            base = n * self.down // self.up
+            phase = n % self.up
+            taps = padded[base[:, None] + self.offsets[None, :] + self.half_width]
+            out[start:start + len(n)] = np.einsum("ij,ij->i", taps, self.bank[phase])
+        return out
+
+
+@lru_cache(maxsize=16)
+def get_resampler(in_rate: int, out_rate: int) -> Resampler:
+    return Resampler(in_rate, out_rate)
+
+
+def resample(audio: np.ndarray, in_rate: int, out_rate: int = TARGET_SAMPLE_RATE) -> np.ndarray:
+    """Float32 mono la `out_rate` (bancul de filtre este refolosit per pereche de rate)."""
+    if in_rate == out_rate or not len(audio):
+        return audio.astype(np.float32, copy=False)
+    return get_resampler(in_rate, out_rate)(audio)
+
+
+def to_int16(audio: np.ndarray) -> np.ndarray:
+    return (np.clip(audio, -1.0, 1.0) * 32767.0).astype(np.int16)
+
+
+def decode_wav(data: bytes) -> Tuple[np.ndarray, int]:
+    """WAV PCM (8/16/32 biți) în float32 mono [-1, 1]; întoarce (audio, sample_rate)."""
+    try:
+        with wave.open(io.BytesIO(data), "rb") as wav:
+            channels = wav.getnchannels()
+            sample_width = wav.getsampwidth()
+            sample_rate = wav.getframerate()
+            frames = wav.readframes(wav.getnframes())
+    except (wave.Error, EOFError) as e:
+        # ex. WAV float (format 3): modulul wave citește doar PCM
+        raise UnsupportedAudioFormat(f"Unsupported WAV file: {str(e)}")
+    if not channels or not sample_rate:
+        raise UnsupportedAudioFormat(f"Invalid WAV header ({channels} channels, {sample_rate} Hz)")
+    if sample_width == 2:
+        audio = np.frombuffer(frames, dtype=np.int16).astype(np.float32) / 32768.0
+    elif sample_width == 4:
+        audio = np.frombuffer(frames, dtype=np.int32).astype(np.float32) / 2147483648.0
+    elif sample_width == 1:
+        audio = (np.frombuffer(frames, dtype=np.uint8).astype(np.float32) - 128.0) / 128.0
+    else:
+        raise UnsupportedAudioFormat(f"Unsupported WAV sample width: {sample_width * 8} bits")
+    return audio.reshape(-1, channels).mean(axis=1), sample_rate
+
+
+def _decode_av(data: bytes) -> Tuple[np.ndarray, int]:
+    """webm/ogg/mp3 prin PyAV (libav în proces, fără ffmpeg extern sau fișiere temporare)."""
+    try:
+        import av
+        import av.error
+    except ImportError:
+        raise UnsupportedAudioFormat("Compressed audio requires the 'av' package")
+
+    chunks = []
+    sample_rate = None
+    try:
+        with av.open(io.BytesIO(data), mode="r") as container:
+            if not container.streams.audio:
+                raise UnsupportedAudioFormat("File has no audio stream")
+            stream = container.streams.audio[0]
+            for frame in container.decode(stream):
+                sample_rate = frame.sample_rate
+                samples = frame.to_ndarray().astype(np.float32)
+                if frame.format.name in ("s16", "s16p"):
+                    samples /= 32768.0
+                elif frame.format.name in ("s32", "s32p"):
+                    samples /= 2147483648.0
+                if frame.format.is_planar:
+                    chunks.append(samples.mean(axis=0))
+                else:
+                    chunks.append(samples.reshape(-1, len(frame.layout.channels)).mean(axis=1))
+    except av.error.FFmpegError as e:
+        # Fișier corupt sau trunchiat (ex. InvalidDataError): e o problemă a upload-ului, nu a serverului
+        raise UnsupportedAudioFormat(f"Cannot decode audio: {str(e)}")
+    if sample_rate is None:
+        return np.zeros(0, dtype=np.float32), TARGET_SAMPLE_RATE
+    return np.concatenate(chunks), sample_rate
+
+
+def _decode_soundfile(data: bytes) -> Tuple[np.ndarray, int]:
+    try:
+        import soundfile
+    except ImportError:
+        return _decode_av(data)
+    try:
+        audio, sample_rate = soundfile.read(io.BytesIO(data), dtype="float32", always_2d=True)
+    except RuntimeError as e:
+        # LibsndfileError (RuntimeError în versiunile vechi): FLAC corupt
+        raise UnsupportedAudioFormat(f"Cannot decode audio: {str(e)}")
+    return audio.mean(axis=1), sample_rate
+
+
+def decode_audio(data: bytes, target_rate: int = TARGET_SAMPLE_RATE) -> np.ndarray:
+    """
+    Decodează orice format suportat în PCM mono int16 la `target_rate`.
+
+    Raises:
+        UnsupportedAudioFormat: When the container is unknown or its decoder is not installed
+    """
+    kind = sniff_format(data[:12])
+    if kind == "wav":
+        audio, sample_rate = decode_wav(data)
+    elif kind == "flac":
+        audio, sample_rate = _decode_soundfile(data)
+    elif kind in ("webm", "ogg", "mp3"):
+        audio, sample_rate = _decode_av(data)
+    else:
+        raise UnsupportedAudioFormat("Unrecognized audio format")
+    return to_int16(resample(audio, sample_rate, target_rate))
+
+
+def normalize_samples(samples: np.ndarray, sample_rate: int, target_rate: int = TARGET_SAMPLE_RATE) -> np.ndarray:
+    """PCM int16 mono la `target_rate`; fără copie dacă rata este deja cea corectă."""
+    if sample_rate == target_rate:
+        return samples
+    return to_int16(resample(samples.astype(np.float32) / 32768.0, sample_rate, target_rate))
@@ -0,0 +1,156 @@
+from typing import Tuple, Optional, AsyncIterator
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+import os
+import struct
+import asyncio
+import logging
+import numpy as np
+from starlette.concurrency import run_in_threadpool
+from .audio_decode import UnsupportedAudioFormat
+
+logger = logging.getLogger(__name__)
+
+
+class AudioTooLarge(Exception):
+    """Fișierul depășește dimensiunea sau durata maximă acceptată."""
+
+
+class NotWavError(ValueError):
+    """Upload-ul nu este un WAV PCM."""
+
+
+@dataclass
+class WavFormat:
+    channels: int
+    sample_rate: int
+    bits_per_sample: int
+    data_size: Optional[int]
+
+    @property
+    def bytes_per_second(self) -> int:
+        return self.channels * self.sample_rate * self.bits_per_sample // 8
+
+
+class PCMBufferPool:
+    """
+    Reusable fixed-size byte buffers for decoded uploads.
+
+    Each request borrows one buffer of `buffer_bytes` for as long as its audio is
+    in use, so resident memory for uploads is capped at `count * buffer_bytes`
+    no matter how long the clips are or how many arrive at once.
+    """
+
+    def __init__(self, buffer_bytes: int, count: int):
+        self.buffer_bytes = buffer_bytes
+        self.count = count
+        self._free: asyncio.Queue = asyncio.Queue()
+        self._allocated = 0
+
+    @asynccontextmanager
+    async def acquire(self) -> AsyncIterator[memoryview]:
+        if self._free.empty() and self._allocated < self.count:
+            # Alocare leneșă: bufferele apar doar la nevoie
+            self._allocated += 1
+            buffer = bytearray(self.buffer_bytes)
+        else:
+            buffer = await self._free.get()
+        try:
+            yield memoryview(buffer)
+        finally:
+            self._free.put_nowait(buffer)
+
+
+async def _read_exact(file, view: memoryview) -> int:
+    """Citește direct în `view` (fără copii intermediare); întoarce numărul de octeți citiți."""
+    total = 0
+    while total < len(view):
+        n = await run_in_threadpool(file.readinto, view[total:])
+        if not n:
+            break
+        total += n
+    return total
+
+
+async def read_wav_header(file) -> WavFormat:
+    """Parcurge chunk-urile RIFF până la `data`, fără să citească eșantioanele."""
+    header = bytearray(12)
+    if await _read_exact(file, memoryview(header)) < 12 or header[:4] != b"RIFF" or header[8:12] != b"WAVE":
+        raise NotWavError("Not a RIFF/WAVE file")
+
+    fmt = None
+    chunk_header = bytearray(8)
+    while True:
+        if await _read_exact(file, memoryview(chunk_header)) < 8:
+            raise NotWavError("WAV file has no data chunk")
+        chunk_id, chunk_size = bytes(chunk_header[:4]), struct.unpack("<I", chunk_header[4:])[0]
+        if chunk_id == b"data":
+            if fmt is None:
+                raise NotWavError("WAV data chunk before fmt chunk")
+            # 0 / 0xFFFFFFFF = dimensiune necunoscută (înregistrări în flux)
+            fmt.data_size = chunk_size if 0 < chunk_size < 0xFFFFFFFF else None
+            return fmt
+        body = bytearray(chunk_size + (chunk_size & 1))
+        await _read_exact(file, memoryview(body))
+        if chunk_id == b"fmt ":
+            if chunk_size < 16:
+                raise UnsupportedAudioFormat("Truncated WAV fmt chunk")
+            audio_format, channels, sample_rate, _, _, bits = struct.unpack("<HHIIHH", body[:16])
+            if not channels or not sample_rate:
+                raise UnsupportedAudioFormat(f"Invalid WAV header ({channels} channels, {sample_rate} Hz)")
+            # 1 = PCM, 0xFFFE = WAVE_FORMAT_EXTENSIBLE; float (3), ADPCM etc. nu pot fi decodate
+            if audio_format not in (1, 0xFFFE):
+                raise UnsupportedAudioFormat(f"Unsupported WAV encoding (format {audio_format})")
+            if bits != 16:
+                # PCM pe 8/32 biți trece prin decode_audio
+                raise NotWavError(f"Unsupported WAV sample width ({bits} bits)")
+            fmt = WavFormat(channels, sample_rate, bits, None)
+
+
+async def read_wav_upload(
+    file,
+    buffer: memoryview,
+    max_seconds: float
+) -> Tuple[np.ndarray, int]:
+    """
+    Stream a WAV upload straight into a borrowed buffer.
+
+    The header is parsed first, so oversized clips are rejected before any PCM
+    is read. Samples land in `buffer` via readinto and are returned as an int16
+    view over it (mono clips are not copied at all).
+
+    Raises:
+        NotWavError: When the upload is not 16-bit PCM WAV
+        UnsupportedAudioFormat: When it is a WAV that cannot be decoded (float, zero channels)
+        AudioTooLarge: When the clip exceeds `max_seconds` or the buffer size
+    """
+    fmt = await read_wav_header(file)
+    limit = min(len(buffer), int(max_seconds * fmt.bytes_per_second))
+    if fmt.data_size is not None and fmt.data_size > limit:
+        raise AudioTooLarge(
+            f"Audio too long: {fmt.data_size / fmt.bytes_per_second:.1f}s (max {limit / fmt.bytes_per_second:.1f}s)"
+        )
+
+    size = fmt.data_size or limit
+    read = await _read_exact(file, buffer[:size])
+    if fmt.data_size is None and read == limit and await run_in_threadpool(file.read, 1):
+        raise AudioTooLarge(f"Audio too long (max {limit / fmt.bytes_per_second:.1f}s)")
+
+    frame_bytes = fmt.channels * 2
+    samples = np.frombuffer(buffer[:read - read % frame_bytes], dtype=np.int16)
+    if fmt.channels > 1:
+        samples = samples.reshape(-1, fmt.channels).mean(axis=1).astype(np.int16)
+    return samples, fmt.sample_rate
+
+
+async def read_upload_bytes(file, max_bytes: int) -> bytes:
+    """Citește un upload non-WAV întreg, dar refuză înainte să depășească `max_bytes`."""
+    content = await run_in_threadpool(file.read, max_bytes + 1)
+    if len(content) > max_bytes:
+        raise AudioTooLarge(f"Audio file too large (max {max_bytes // (1024 * 1024)} MB)")
+    return content
+
+
+def create_buffer_pool(count: int) -> PCMBufferPool:
+    """Pool de buffere dimensionat prin AUDIO_MAX_BYTES (default 10 MB)."""
+    return PCMBufferPool(int(os.getenv("AUDIO_MAX_BYTES", str(10 * 1024 * 1024))), count)
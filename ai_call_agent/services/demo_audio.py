@@ -0,0 +1,206 @@
+from typing import Dict, Any, List, Optional, Tuple
+from pathlib import Path
+import io
+import os
+import json
+import asyncio
+import hashlib
+import logging
+from starlette.requests import Request
+from starlette.responses import Response
+
+logger = logging.getLogger(__name__)
+
+# (format, kbps): opus pentru browsere moderne, mp3 ca variantă universală
+VARIANTS = [("opus", 24), ("opus", 48), ("mp3", 64), ("mp3", 128)]
+MEDIA_TYPES = {"opus": "audio/ogg", "mp3": "audio/mpeg", "wav": "audio/wav"}
+DEMO_PHRASES = ("greeting", "info_request", "service_info")
+
+
+def transcode(data: bytes, fmt: str, kbps: int) -> bytes:
+    """Re-encodează audio (mp3/wav) în opus/ogg sau mp3 mono, în proces, cu PyAV."""
+    import av
+
+    output = io.BytesIO()
+    with av.open(io.BytesIO(data)) as source, av.open(output, "w", format="ogg" if fmt == "opus" else "mp3") as target:
+        # libopus acceptă doar 48 kHz
+        rate = 48000 if fmt == "opus" else 44100
+        stream = target.add_stream("libopus" if fmt == "opus" else "libmp3lame", rate=rate)
+        stream.bit_rate = kbps * 1000
+        stream.layout = "mono"
+        resampler = av.AudioResampler(format=stream.codec_context.format, layout="mono", rate=rate)
+        for frame in source.decode(audio=0):
+            for resampled in resampler.resample(frame):
+                target.mux(stream.encode(resampled))
+        for resampled in resampler.resample(None):
+            target.mux(stream.encode(resampled))
+        target.mux(stream.encode(None))
+    return output.getvalue()
+
+
+class DemoAudio:
+    """
+    Pre-rendered audio for the static /demo-call script.
+
+    Every phrase is synthesized once through VoiceService, which reuses the TTS
+    cache. It is then transcoded into VARIANTS and written under `directory`,
+    with a manifest keyed by the text hash so unchanged phrases are skipped on
+    the next run. The files are held in memory and served with strong ETags and
+    byte-range support, so a demo request costs no synthesis and no disk I/O.
+    """
+
+    def __init__(self, voice_service, directory: str = "static/audio/demo", url_prefix: str = "/demo-audio"):
+        self.voice_service = voice_service
+        self.directory = Path(directory)
+        self.url_prefix = url_prefix
+        self.manifest_path = self.directory / "manifest.json"
+        self.manifest: Dict[str, Dict[str, Any]] = {}
+        self._files: Dict[str, Tuple[bytes, str, str]] = {}
+        self._render_task: Optional[asyncio.Task] = None
+
+    def _load_manifest(self) -> Dict[str, Any]:
+        try:
+            return json.loads(self.manifest_path.read_text())
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def _variants(self, source: bytes, source_extension: str) -> List[Tuple[str, int, bytes]]:
+        try:
+            return [(fmt, kbps, transcode(source, fmt, kbps)) for fmt, kbps in VARIANTS]
+        except ImportError:
+            logger.warning("PyAV not installed; serving demo audio without transcoded variants")
+            return [(source_extension, 0, source)]
+
+    def _is_current(self, entry: Optional[Dict[str, Any]], text_hash: str) -> bool:
+        return bool(entry) and entry["text_hash"] == text_hash and all(
+            (self.directory / v["file"]).exists() for v in entry["variants"]
+        )
+
+    def _write_variants(self, language: str, phrase: str, text_hash: str, source_path: Path) -> Dict[str, Any]:
+        """Transcodează sursa și scrie variantele pe disc (rulează într-un thread)."""
+        entry = {"text_hash": text_hash, "variants": []}
+        for fmt, kbps, audio in self._variants(source_path.read_bytes(), source_path.suffix[1:]):
+            suffix = "ogg" if fmt == "opus" else fmt
+            name = f"{language}/{phrase}-{kbps}k.{suffix}" if kbps else f"{language}/{phrase}.{suffix}"
+            path = self.directory / name
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_bytes(audio)
+            entry["variants"].append({"file": name, "format": fmt, "kbps": kbps})
+        return entry
+
+    def _save_manifest(self, manifest: Dict[str, Any]) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.manifest_path.write_text(json.dumps(manifest, indent=2))
+        self._load_files(manifest)
+
+    async def render(self, translations: Dict[str, Dict[str, str]]) -> Dict[str, Any]:
+        """Generează (sau reîncarcă) variantele audio pentru toate limbile."""
+        # Tot I/O-ul pe disc rulează în thread-uri; pe event loop rămâne doar sinteza (async)
+        previous = await asyncio.to_thread(self._load_manifest)
+        manifest = {}
+        for language, texts in translations.items():
+            for phrase in DEMO_PHRASES:
+                text = texts[phrase]
+                text_hash = hashlib.sha256(text.encode("utf-8")).hexdigest()[:16]
+                entry = previous.get(language, {}).get(phrase)
+                if not await asyncio.to_thread(self._is_current, entry, text_hash):
+                    source_path = await self.voice_service.synthesize_file(text)
+                    entry = await asyncio.to_thread(self._write_variants, language, phrase, text_hash, source_path)
+                manifest.setdefault(language, {})[phrase] = entry
+
+        await asyncio.to_thread(self._save_manifest, manifest)
+        logger.info(f"Demo audio ready: {len(self._files)} files")
+        return manifest
+
+    def start_rendering(self, translations: Dict[str, Dict[str, str]]) -> None:
+        """Pornește `render` în fundal; referința e păstrată pentru stop_rendering."""
+        if self._render_task and not self._render_task.done():
+            return
+        self._render_task = asyncio.create_task(self._render_logged(translations))
+
+    async def stop_rendering(self) -> None:
+        if self._render_task:
+            self._render_task.cancel()
+            try:
+                await self._render_task
+            except asyncio.CancelledError:
+                pass
+            self._render_task = None
+
+    async def _render_logged(self, translations: Dict[str, Dict[str, str]]) -> None:
+        try:
+            await self.render(translations)
+        except Exception as e:
+            logger.error(f"Error rendering demo audio: {str(e)}")
+
+    def _load_files(self, manifest: Dict[str, Any]) -> None:
+        files = {}
+        for phrases in manifest.values():
+            for entry in phrases.values():
+                for variant in entry["variants"]:
+                    data = (self.directory / variant["file"]).read_bytes()
+                    etag = '"' + hashlib.sha256(data).hexdigest()[:32] + '"'
+                    variant["etag"] = etag
+                    variant["size"] = len(data)
+                    variant["url"] = f"{self.url_prefix}/{variant['file']}"
+                    files[variant["file"]] = (data, etag, MEDIA_TYPES.get(variant["format"], "application/octet-stream"))
+        self._files = files
+        self.manifest = manifest
+
+    def audio_for(self, language: str) -> Optional[Dict[str, List[Dict[str, Any]]]]:
+        """Variantele pentru fiecare frază a demo-ului, sau None dacă nu sunt încă generate."""
+        phrases = self.manifest.get(language)
+        if not phrases:
+            return None
+        return {
+            phrase: [{k: v[k] for k in ("url", "format", "kbps", "size")} for v in entry["variants"]]
+            for phrase, entry in phrases.items()
+        }
+
+    def response(self, name: str, request: Request) -> Response:
+        """Răspuns HTTP cu ETag, 304 pentru If-None-Match și 206 pentru Range."""
+        if name not in self._files:
+            return Response(status_code=404)
+        data, etag, media_type = self._files[name]
+        headers = {
+            "ETag": etag,
+            "Accept-Ranges": "bytes",
+            "Cache-Control": "public, max-age=86400",
+        }
+        if etag in [tag.strip() for tag in request.headers.get("if-none-match", "").split(",")]:
+            return Response(status_code=304, headers=headers)
+
+        range_header = request.headers.get("range")
+        if_range = request.headers.get("if-range")
+        if range_header and (if_range is None or if_range == etag):
+            byte_range = parse_range(range_header, len(data))
+            if byte_range is None:
+                return Response(status_code=416, headers={**headers, "Content-Range": f"bytes */{len(data)}"})
+            start, end = byte_range
+            headers["Content-Range"] = f"bytes {start}-{end}/{len(data)}"
+            return Response(data[start:end + 1], status_code=206, media_type=media_type, headers=headers)
+        return Response(data, media_type=media_type, headers=headers)
+
+
+def parse_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+    """Un singur interval `bytes=start-end` / `start-` / `-suffix`; None dacă e invalid."""
+    unit, _, spec = header.partition("=")
+    if unit.strip() != "bytes" or "," in spec:
+        return None
+    start, _, end = spec.strip().partition("-")
+    try:
+        if start:
+            first = int(start)
+            last = min(int(end), size - 1) if end else size - 1
+        else:
+            first = max(0, size - int(end))
+            last = size - 1
+    except ValueError:
+        return None
+    if first > last or first >= size:
+        return None
+    return first, last
+
+
+def create_demo_audio(voice_service) -> DemoAudio:
+    return DemoAudio(voice_service, directory=os.getenv("DEMO_AUDIO_DIR", "static/audio/demo"))
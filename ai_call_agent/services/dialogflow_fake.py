@@ -0,0 +1,64 @@
+from typing import Dict, Optional
+import asyncio
+import grpc
+from google.cloud.dialogflowcx import DetectIntentRequest, DetectIntentResponse, QueryResult, ResponseMessage, Intent
+
+SERVICE_NAME = "google.cloud.dialogflow.cx.v3.Sessions"
+
+
+class FakeSessionsServer:
+    """
+    Local gRPC stand-in for the Dialogflow CX Sessions service (DetectIntent only).
+
+    Replies come from `intents` (text -> intent name) after `delay` seconds. The
+    first `fail_first` calls fail with UNAVAILABLE, to exercise retries. Point
+    DialogflowService at it with DIALOGFLOW_ENDPOINT=127.0.0.1:<port>.
+    """
+
+    def __init__(self, intents: Optional[Dict[str, str]] = None, delay: float = 0.0, fail_first: int = 0):
+        self.intents = intents or {}
+        self.delay = delay
+        self.fail_first = fail_first
+        self.calls = 0
+        self.active = 0
+        self.max_active = 0
+        self.server = None
+        self.port = None
+
+    async def _detect_intent(self, request: DetectIntentRequest, context) -> DetectIntentResponse:
+        self.calls += 1
+        if self.fail_first > 0:
+            self.fail_first -= 1
+            await context.abort(grpc.StatusCode.UNAVAILABLE, "temporarily unavailable")
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            self.active -= 1
+        text = request.query_input.text.text
+        intent = self.intents.get(text.lower(), "Default Fallback Intent")
+        return DetectIntentResponse(query_result=QueryResult(
+            text=text,
+            language_code=request.query_input.language_code,
+            intent=Intent(display_name=intent),
+            intent_detection_confidence=0.9 if intent in self.intents.values() else 0.3,
+            response_messages=[ResponseMessage(text=ResponseMessage.Text(text=[f"[{intent}] {text}"]))]
+        ))
+
+    async def start(self) -> str:
+        self.server = grpc.aio.server()
+        handler = grpc.method_handlers_generic_handler(SERVICE_NAME, {
+            "DetectIntent": grpc.unary_unary_rpc_method_handler(
+                self._detect_intent,
+                request_deserializer=DetectIntentRequest.deserialize,
+                response_serializer=DetectIntentResponse.serialize
+            )
+        })
+        self.server.add_generic_rpc_handlers((handler,))
+        self.port = self.server.add_insecure_port("127.0.0.1:0")
+        await self.server.start()
+        return f"127.0.0.1:{self.port}"
+
+    async def stop(self) -> None:
+        await self.server.stop(grace=None)
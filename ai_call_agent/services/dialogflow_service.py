@@ -1,7 +1,10 @@
-from google.cloud.dialogflowcx import SessionsClient
+from google.cloud.dialogflowcx import SessionsClient, SessionsAsyncClient
 from google.cloud.dialogflowcx import TextInput, QueryInput
-from typing import Dict, Any
+from google.api_core import exceptions as core_exceptions
+from typing import Dict, Any, List, Optional
 import os
+import time
+import asyncio
 from dotenv import load_dotenv
 import logging
 import uuid
@@ -10,6 +13,12 @@ logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 class DialogflowService:
+    TRANSIENT_ERRORS = (
+        core_exceptions.ServiceUnavailable,
+        core_exceptions.DeadlineExceeded,
+        core_exceptions.ResourceExhausted,
+    )
+
     def __init__(self):
         load_dotenv()
         self.project_id = os.getenv("GOOGLE_CLOUD_PROJECT")
@@ -24,9 +33,28 @@ class DialogflowService:
         if not all([self.project_id, self.agent_id]):
             raise ValueError("Missing required Dialogflow CX configuration")
         
+        # DIALOGFLOW_ENDPOINT: server local (ex. FakeSessionsServer în teste), fără TLS
+        self.endpoint_override = os.getenv("DIALOGFLOW_ENDPOINT")
+
         # Initialize the client
-        client_options = {"api_endpoint": f"{self.location}-dialogflow.googleapis.com"}
-        self.session_client = SessionsClient(client_options=client_options)
+        if self.endpoint_override:
+            import grpc
+            from google.cloud.dialogflowcx_v3.services.sessions.transports import SessionsGrpcTransport
+            self.session_client = SessionsClient(
+                transport=SessionsGrpcTransport(channel=grpc.insecure_channel(self.endpoint_override))
+            )
+        else:
+            client_options = {"api_endpoint": f"{self.location}-dialogflow.googleapis.com"}
+            self.session_client = SessionsClient(client_options=client_options)
+
+        # Varianta async: canale gRPC partajate, deadline și buget de reîncercări
+        self.channels = int(os.getenv("DIALOGFLOW_CHANNELS", "2"))
+        self.deadline = float(os.getenv("DIALOGFLOW_DEADLINE", "5"))
+        self.max_attempts = int(os.getenv("DIALOGFLOW_MAX_ATTEMPTS", "3"))
+        self.retry_budget = RetryBudget(float(os.getenv("DIALOGFLOW_RETRY_RATIO", "0.1")))
+        self._async_clients: List[SessionsAsyncClient] = []
+        self._next_client = -1
+        self.stats = {"requests": 0, "retries": 0, "errors": 0, "total_seconds": 0.0}
     
     def get_response(self, text: str, session_id: str) -> Dict[str, Any]:
         """
@@ -55,11 +83,7 @@ class DialogflowService:
             )
             logger.info("Received response from Dialogflow")
             
-            return {
-                "text": response.query_result.response_messages[0].text.text[0],
-                "intent": response.query_result.intent.display_name,
-                "confidence": response.query_result.intent_detection_confidence
-            }
+            return self._format_response(response)
             
         except Exception as e:
             logger.error(f"Error in Dialogflow service: {str(e)}")
@@ -89,33 +113,154 @@ class DialogflowService:
                 request={"session": session_path, "query_input": query_input}
             )
             
-            # Procesarea răspunsului
-            result = response.query_result
-            
-            return {
-                "query_text": result.query_text,
-                "intent": result.intent.display_name,
-                "confidence": result.intent_detection_confidence,
-                "parameters": dict(result.parameters),
-                "response_messages": [
-                    {
-                        "text": result.fulfillment_text,
-                        "type": "text"
-                    }
-                ],
-                "sentiment": {
-                    "score": result.sentiment_analysis_result.score,
-                    "magnitude": result.sentiment_analysis_result.magnitude
-                } if result.sentiment_analysis_result else None
-            }
+            return self._format_intent(response)
             
         except Exception as e:
             logger.error(f"Error detecting intent: {str(e)}")
-            return {
-                "error": str(e),
-                "text": "I apologize, but I'm having trouble understanding. Could you please rephrase that?",
-                "response_messages": [{
-                    "text": "I apologize, but I'm having trouble understanding. Could you please rephrase that?",
+            return self._intent_error(e)
+
+    @staticmethod
+    def _format_response(response) -> Dict[str, Any]:
+        return {
+            "text": response.query_result.response_messages[0].text.text[0],
+            "intent": response.query_result.intent.display_name,
+            "confidence": response.query_result.intent_detection_confidence
+        }
+
+    @staticmethod
+    def _format_intent(response) -> Dict[str, Any]:
+        # Procesarea răspunsului
+        result = response.query_result
+        
+        return {
+            "query_text": result.query_text,
+            "intent": result.intent.display_name,
+            "confidence": result.intent_detection_confidence,
+            "parameters": dict(result.parameters),
+            "response_messages": [
+                {
+                    "text": result.fulfillment_text,
                     "type": "text"
-                }]
-            } 
\ No newline at end of file
+                }
+            ],
+            "sentiment": {
+                "score": result.sentiment_analysis_result.score,
+                "magnitude": result.sentiment_analysis_result.magnitude
+            } if result.sentiment_analysis_result else None
+        }
+
+    @staticmethod
+    def _intent_error(e: Exception) -> Dict[str, Any]:
+        return {
+            "error": str(e),
+            "text": "I apologize, but I'm having trouble understanding. Could you please rephrase that?",
+            "response_messages": [{
+                "text": "I apologize, but I'm having trouble understanding. Could you please rephrase that?",
+                "type": "text"
+            }]
+        }
+
+    # --- Varianta async: nu blochează event loop-ul ---
+
+    def _async_client(self) -> SessionsAsyncClient:
+        """Clienții async (câte un canal gRPC fiecare) se creează leneș, pe loop-ul curent, și se folosesc round-robin."""
+        if not self._async_clients:
+            self._async_clients = [self._create_async_client() for _ in range(self.channels)]
+        self._next_client = (self._next_client + 1) % len(self._async_clients)
+        return self._async_clients[self._next_client]
+
+    def _create_async_client(self) -> SessionsAsyncClient:
+        if self.endpoint_override:
+            import grpc
+            from google.cloud.dialogflowcx_v3.services.sessions.transports import SessionsGrpcAsyncIOTransport
+            transport = SessionsGrpcAsyncIOTransport(channel=grpc.aio.insecure_channel(self.endpoint_override))
+            return SessionsAsyncClient(transport=transport)
+        return SessionsAsyncClient(client_options={"api_endpoint": f"{self.location}-dialogflow.googleapis.com"})
+
+    async def _detect_intent_async(self, session_id: str, text: str, language_code: str):
+        """
+        detect_intent with a per-attempt deadline and retries.
+
+        Only transient gRPC errors are retried, with exponential backoff, and
+        only while the shared retry budget allows it. During an outage this
+        stops retries from multiplying the load on the service.
+        """
+        session_path = SessionsClient.session_path(self.project_id, self.location, self.agent_id, session_id)
+        query_input = QueryInput(text=TextInput(text=text), language_code=language_code)
+        self.retry_budget.record_request()
+        delay = 0.1
+        for attempt in range(self.max_attempts):
+            start = time.monotonic()
+            try:
+                response = await self._async_client().detect_intent(
+                    request={"session": session_path, "query_input": query_input},
+                    timeout=self.deadline,
+                    retry=None
+                )
+                self.stats["requests"] += 1
+                self.stats["total_seconds"] += time.monotonic() - start
+                return response
+            except self.TRANSIENT_ERRORS:
+                if attempt + 1 >= self.max_attempts or not self.retry_budget.try_spend():
+                    self.stats["errors"] += 1
+                    raise
+                self.stats["retries"] += 1
+                await asyncio.sleep(delay)
+                delay *= 2
+            except Exception:
+                self.stats["errors"] += 1
+                raise
+
+    async def get_response_async(self, text: str, session_id: str, language_code: str = "en-US") -> Dict[str, Any]:
+        """Ca get_response, fără a bloca event loop-ul."""
+        try:
+            response = await self._detect_intent_async(session_id, text, language_code)
+            return self._format_response(response)
+        except Exception as e:
+            logger.error(f"Error in Dialogflow service: {str(e)}")
+            return {"error": str(e)}
+
+    async def detect_intent_async(self, session_id: str, text: str, language_code: str = "en") -> Dict[Any, Any]:
+        """Ca detect_intent, fără a bloca event loop-ul."""
+        try:
+            response = await self._detect_intent_async(session_id, text, language_code)
+            return self._format_intent(response)
+        except Exception as e:
+            logger.error(f"Error detecting intent: {str(e)}")
+            return self._intent_error(e)
+
+    def get_stats(self) -> Dict[str, Any]:
+        requests = self.stats["requests"]
+        return {
+            **self.stats,
+            "total_seconds": round(self.stats["total_seconds"], 3),
+            "avg_seconds": round(self.stats["total_seconds"] / requests, 3) if requests else 0.0,
+            "retry_tokens": round(self.retry_budget.tokens, 2),
+            "channels": self.channels
+        }
+
+    async def close(self) -> None:
+        for client in self._async_clients:
+            await client.transport.close()
+        self._async_clients = []
+
+
+class RetryBudget:
+    """
+    Token bucket pentru reîncercări: fiecare cerere adaugă `ratio` jetoane, fiecare
+    reîncercare consumă unul, deci reîncercările rămân sub ~ratio din trafic.
+    """
+
+    def __init__(self, ratio: float = 0.1, max_tokens: float = 10.0):
+        self.ratio = ratio
+        self.max_tokens = max_tokens
+        self.tokens = max_tokens
+
+    def record_request(self) -> None:
+        self.tokens = min(self.max_tokens, self.tokens + self.ratio)
+
+    def try_spend(self) -> bool:
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        return False
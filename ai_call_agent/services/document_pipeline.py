@@ -0,0 +1,100 @@
+from typing import Dict, Any, List, Tuple, Iterator, AsyncIterator, Optional
+import os
+import asyncio
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+from langchain_community.document_loaders import UnstructuredPDFLoader
+
+logger = logging.getLogger(__name__)
+
+Chunk = Tuple[str, Dict[str, Any]]
+
+
+def extract_chunks(file_path: str, chunk_size: int, chunk_overlap: int) -> List[Chunk]:
+    """
+    Parsează un PDF și îl împarte în chunk-uri, întorcând tot documentul odată.
+
+    Rulează într-un proces worker, deci trebuie să rămână o funcție de nivel modul.
+    Splitter-ul primește câte o pagină, astfel încât niciun chunk nu trece peste
+    granița dintre pagini, dar Unstructured partiționează tot fișierul înainte de
+    prima pagină, iar chunk-urile (și vectorii lor) se salvează per document,
+    deci memoria crește cu documentul, nu cu pagina.
+    """
+    splitter = RecursiveCharacterTextSplitter(
+        chunk_size=chunk_size,
+        chunk_overlap=chunk_overlap,
+        length_function=len
+    )
+    chunks = []
+    # mode="paged": un Document per pagină (implicit "single" dă tot fișierul odată)
+    for page in UnstructuredPDFLoader(file_path, mode="paged").lazy_load():
+        for doc in splitter.split_documents([page]):
+            chunks.append((doc.page_content, doc.metadata))
+    return chunks
+
+
+def iter_batches(items: List[Any], batch_size: int) -> Iterator[List[Any]]:
+    for start in range(0, len(items), batch_size):
+        yield items[start:start + batch_size]
+
+
+class DocumentPipeline:
+    """
+    Parallel extraction stage: PDFs are parsed and chunked in a process pool and
+    yielded one whole document at a time, as soon as each one finishes. At most
+    `max_pending` documents are in flight. Memory therefore grows with the size
+    of the largest documents, but not with the number of documents in the corpus.
+    """
+
+    def __init__(
+        self,
+        chunk_size: int,
+        chunk_overlap: int,
+        max_workers: Optional[int] = None,
+        max_pending: Optional[int] = None
+    ):
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+        self.max_workers = max_workers or int(os.getenv("RAG_INGEST_WORKERS", "0")) or os.cpu_count() or 1
+        self.max_pending = max_pending or self.max_workers * 2
+
+    async def iter_documents(self, paths: List[str]) -> AsyncIterator[Tuple[str, List[Chunk]]]:
+        """Yield (path, chunks) for each document, in completion order."""
+        if not paths:
+            return
+        loop = asyncio.get_running_loop()
+        # Nu pornim mai multe procese decât documente
+        workers = min(self.max_workers, len(paths))
+        pool = ProcessPoolExecutor(max_workers=workers)
+        pending: Dict[asyncio.Future, str] = {}
+        try:
+            queue = iter(paths)
+
+            def submit_next() -> bool:
+                path = next(queue, None)
+                if path is None:
+                    return False
+                future = loop.run_in_executor(
+                    pool, extract_chunks, path, self.chunk_size, self.chunk_overlap
+                )
+                pending[future] = path
+                return True
+
+            while len(pending) < self.max_pending and submit_next():
+                pass
+
+            while pending:
+                done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for future in done:
+                    path = pending.pop(future)
+                    chunks = future.result()
+                    logger.info(f"Extracted {len(chunks)} chunks from {os.path.basename(path)}")
+                    submit_next()
+                    yield path, chunks
+        finally:
+            # Fără `with`: shutdown(wait=True) ar bloca event loop-ul dacă
+            # generatorul este anulat sau consumatorul aruncă o excepție
+            for future in pending:
+                future.cancel()
+            pool.shutdown(wait=False, cancel_futures=True)
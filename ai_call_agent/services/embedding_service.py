@@ -0,0 +1,255 @@
+from typing import Dict, List, Optional, Callable
+import os
+import time
+import random
+import asyncio
+import logging
+from langchain_core.embeddings import Embeddings, DeterministicFakeEmbedding
+from langchain_openai import OpenAIEmbeddings
+from .document_pipeline import iter_batches
+
+logger = logging.getLogger(__name__)
+
+
+class LocalEmbeddings(Embeddings):
+    """
+    CPU embedding backend built on sentence-transformers.
+
+    Modelul este încărcat o singură dată per proces; apelurile async rulează
+    într-un executor ca să nu blocheze event loop-ul.
+    """
+
+    def __init__(self, model_name: str = "sentence-transformers/all-MiniLM-L6-v2"):
+        from sentence_transformers import SentenceTransformer
+        self.model = model_name
+        self._model = SentenceTransformer(model_name, device="cpu")
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self._model.encode(texts, normalize_embeddings=True).tolist()
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embed_documents([text])[0]
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        return await asyncio.get_running_loop().run_in_executor(None, self.embed_documents, texts)
+
+    async def aembed_query(self, text: str) -> List[float]:
+        return (await self.aembed_documents([text]))[0]
+
+
+def create_embeddings(api_key: Optional[str] = None, backend: Optional[str] = None) -> Embeddings:
+    """
+    Creează backend-ul de embedding selectat prin RAG_EMBEDDING_BACKEND.
+
+    Args:
+        api_key (Optional[str]): OpenAI API key, used by the "openai" backend
+        backend (Optional[str]): "openai" (default), "local" or "stub"
+
+    Returns:
+        Embeddings: A LangChain-compatible embedding model
+    """
+    backend = backend or os.getenv("RAG_EMBEDDING_BACKEND", "openai")
+    if backend == "openai":
+        return OpenAIEmbeddings(
+            api_key=api_key,
+            chunk_size=1000,  # Process more text at once
+            max_retries=0     # Retries are handled by EmbeddingScheduler
+        )
+    if backend == "local":
+        return LocalEmbeddings(os.getenv("RAG_LOCAL_EMBEDDING_MODEL", "sentence-transformers/all-MiniLM-L6-v2"))
+    if backend == "stub":
+        # Vectori deterministici, pentru teste fără rețea
+        return DeterministicFakeEmbedding(size=int(os.getenv("RAG_STUB_EMBEDDING_SIZE", "64")))
+    raise ValueError(f"Unknown embedding backend: {backend}")
+
+
+def embedding_model_name(embeddings: Embeddings) -> str:
+    """Numele modelului, folosit în amprenta setărilor indexului."""
+    if isinstance(embeddings, DeterministicFakeEmbedding):
+        return f"stub-{embeddings.size}"
+    return getattr(embeddings, "model", type(embeddings).__name__)
+
+
+def estimate_tokens(text: str) -> int:
+    # Aproximare grosieră: ~4 caractere per token
+    return max(1, len(text) // 4)
+
+
+def is_rate_limit_error(error: Exception) -> bool:
+    if getattr(error, "status_code", None) == 429:
+        return True
+    return type(error).__name__ == "RateLimitError" or "429" in str(error)
+
+
+def retry_after(error: Exception) -> Optional[float]:
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    try:
+        value = headers.get("retry-after")
+        return float(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+class RateBudget:
+    """Token bucket pentru bugetele per minut (tokens și requests)."""
+
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.available = float(per_minute)
+        self.updated = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.available = min(self.capacity, self.available + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float) -> float:
+        self._refill()
+        amount = min(amount, self.capacity)
+        if self.available >= amount:
+            return 0.0
+        return (amount - self.available) / self.rate
+
+    def consume(self, amount: float) -> None:
+        self._refill()
+        self.available -= min(amount, self.capacity)
+
+
+class EmbeddingScheduler:
+    """
+    Runs embedding batches concurrently under token/request-per-minute budgets.
+
+    Concurrency adapts to the provider: every rate-limit error halves the number
+    of batches in flight, and it grows back by one after a run of successes.
+    Completed batches can be checkpointed so an interrupted ingestion resumes
+    without paying for them again.
+    """
+
+    def __init__(
+        self,
+        embeddings: Embeddings,
+        max_concurrency: int = 4,
+        tokens_per_minute: int = 1_000_000,
+        requests_per_minute: int = 3_000,
+        max_retries: int = 6,
+        base_delay: float = 1.0,
+        max_delay: float = 60.0
+    ):
+        self.embeddings = embeddings
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.tokens = RateBudget(tokens_per_minute)
+        self.requests = RateBudget(requests_per_minute)
+        self._limit = max_concurrency
+        self._in_flight = 0
+        self._successes = 0
+        self._condition = asyncio.Condition()
+        self._budget_lock = asyncio.Lock()
+        self.stats = {"batches": 0, "retries": 0, "rate_limited": 0, "resumed": 0}
+
+    @classmethod
+    def from_env(cls, embeddings: Embeddings) -> "EmbeddingScheduler":
+        return cls(
+            embeddings,
+            max_concurrency=int(os.getenv("RAG_EMBED_CONCURRENCY", "4")),
+            tokens_per_minute=int(os.getenv("RAG_EMBED_TPM", "1000000")),
+            requests_per_minute=int(os.getenv("RAG_EMBED_RPM", "3000")),
+            max_retries=int(os.getenv("RAG_EMBED_MAX_RETRIES", "6"))
+        )
+
+    async def _acquire_slot(self) -> None:
+        async with self._condition:
+            await self._condition.wait_for(lambda: self._in_flight < self._limit)
+            self._in_flight += 1
+
+    async def _release_slot(self, succeeded: bool, rate_limited: bool) -> None:
+        async with self._condition:
+            self._in_flight -= 1
+            if rate_limited:
+                self._limit = max(1, self._limit // 2)
+                self._successes = 0
+            elif succeeded:
+                self._successes += 1
+                if self._successes >= self._limit * 2 and self._limit < self.max_concurrency:
+                    self._limit += 1
+                    self._successes = 0
+            self._condition.notify_all()
+
+    async def _acquire_budget(self, tokens: int) -> None:
+        # Un singur apelant consumă bugetul la un moment dat, în ordinea sosirii
+        async with self._budget_lock:
+            while True:
+                delay = max(self.tokens.wait_time(tokens), self.requests.wait_time(1))
+                if delay <= 0:
+                    break
+                await asyncio.sleep(delay)
+            self.tokens.consume(tokens)
+            self.requests.consume(1)
+
+    async def _embed_batch(self, batch: List[str]) -> List[List[float]]:
+        tokens = sum(estimate_tokens(text) for text in batch)
+        attempt = 0
+        while True:
+            await self._acquire_slot()
+            succeeded = rate_limited = False
+            try:
+                await self._acquire_budget(tokens)
+                vectors = await self.embeddings.aembed_documents(batch)
+                succeeded = True
+                self.stats["batches"] += 1
+                return vectors
+            except Exception as e:
+                rate_limited = is_rate_limit_error(e)
+                if attempt >= self.max_retries:
+                    logger.error(f"Embedding batch failed after {attempt} retries: {str(e)}")
+                    raise
+                attempt += 1
+                self.stats["retries"] += 1
+                if rate_limited:
+                    self.stats["rate_limited"] += 1
+                delay = retry_after(e) or min(self.max_delay, self.base_delay * 2 ** (attempt - 1))
+                delay *= random.uniform(0.8, 1.2)
+                logger.warning(f"Embedding batch retry {attempt}/{self.max_retries} in {delay:.1f}s: {str(e)}")
+            finally:
+                await self._release_slot(succeeded, rate_limited)
+            await asyncio.sleep(delay)
+
+    async def embed_documents(
+        self,
+        texts: List[str],
+        batch_size: int = 256,
+        completed: Optional[Dict[int, List[List[float]]]] = None,
+        on_batch: Optional[Callable[[int, List[List[float]]], None]] = None
+    ) -> List[List[float]]:
+        """
+        Embed texts in concurrent batches, preserving order.
+
+        Args:
+            texts (List[str]): Texts to embed
+            batch_size (int): Number of texts per request
+            completed (Optional[Dict[int, List[List[float]]]]): Batches already embedded, by index
+            on_batch (Optional[Callable]): Called with (index, vectors) after each batch finishes
+
+        Returns:
+            List[List[float]]: One vector per input text
+        """
+        completed = completed or {}
+        batches = list(iter_batches(texts, batch_size))
+        results: List[Optional[List[List[float]]]] = [None] * len(batches)
+
+        async def run(index: int, batch: List[str]) -> None:
+            if index in completed and len(completed[index]) == len(batch):
+                self.stats["resumed"] += 1
+                results[index] = list(completed[index])
+                return
+            vectors = await self._embed_batch(batch)
+            results[index] = vectors
+            if on_batch:
+                on_batch(index, vectors)
+
+        await asyncio.gather(*(run(i, batch) for i, batch in enumerate(batches)))
+        return [vector for batch in results for vector in batch]
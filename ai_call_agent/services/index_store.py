@@ -0,0 +1,237 @@
+from typing import Dict, Any, List, Optional
+import os
+import json
+import hashlib
+import logging
+import pickle
+import shutil
+import time
+from pathlib import Path
+import numpy as np
+import faiss
+from langchain_community.vectorstores import FAISS
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_FILE = "manifest.json"
+# Un `.tmp` neatins de atâta timp a rămas de la un proces oprit în timpul scrierii
+STALE_TMP_SECONDS = 3600
+
+
+def file_hash(file_path: str, block_size: int = 1 << 20) -> str:
+    """Calculează hash-ul SHA-256 al conținutului unui fișier."""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def settings_fingerprint(settings: Dict[str, Any]) -> str:
+    """Hash stabil pentru setările de splitting/embedding."""
+    payload = json.dumps(settings, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+class IndexStore:
+    """
+    Persistent on-disk store for the RAG corpus.
+
+    Layout:
+        <root>/manifest.json                 - documents, settings and corpus version
+        <root>/chunks/<key>.json             - chunk texts and metadata of one document
+        <root>/chunks/<key>.npy              - chunk embeddings (float32)
+        <root>/faiss/<version>/index.faiss   - merged FAISS index for a corpus version
+        <root>/faiss/<version>/index.pkl
+        <root>/partial/<key>-b<n>/<i>.npy    - embedded batches of an interrupted ingestion
+
+    A chunk key is derived from the document content hash and the settings
+    fingerprint, so changing the splitter or embedding model re-embeds everything
+    while an unchanged document is never sent to the embedding API again.
+    """
+
+    def __init__(self, root: str, settings: Dict[str, Any]):
+        self.root = Path(root)
+        self.settings = settings
+        self.fingerprint = settings_fingerprint(settings)
+        self.chunks_dir = self.root / "chunks"
+        self.faiss_dir = self.root / "faiss"
+        self.partial_dir = self.root / "partial"
+        self.chunks_dir.mkdir(parents=True, exist_ok=True)
+        self.faiss_dir.mkdir(parents=True, exist_ok=True)
+
+    def chunk_key(self, doc_hash: str) -> str:
+        return f"{doc_hash[:32]}-{self.fingerprint}"
+
+    def corpus_version(self, documents: Dict[str, str]) -> str:
+        """Versiunea corpusului: hash peste setări și hash-urile documentelor."""
+        digest = hashlib.sha256(self.fingerprint.encode("utf-8"))
+        for name in sorted(documents):
+            digest.update(f"{name}:{documents[name]}".encode("utf-8"))
+        return digest.hexdigest()[:16]
+
+    # Manifest
+
+    def load_manifest(self) -> Dict[str, Any]:
+        manifest_path = self.root / MANIFEST_FILE
+        if not manifest_path.exists():
+            return {"fingerprint": None, "version": None, "documents": {}}
+        try:
+            return json.loads(manifest_path.read_text())
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable index manifest: {str(e)}")
+            return {"fingerprint": None, "version": None, "documents": {}}
+
+    def save_manifest(self, version: str, documents: Dict[str, str]) -> None:
+        manifest = {
+            "fingerprint": self.fingerprint,
+            "settings": self.settings,
+            "version": version,
+            "documents": documents,
+        }
+        tmp_path = self.root / f"{MANIFEST_FILE}.tmp"
+        tmp_path.write_text(json.dumps(manifest, indent=2, sort_keys=True))
+        os.replace(tmp_path, self.root / MANIFEST_FILE)
+
+    # Chunks
+
+    def has_chunks(self, doc_hash: str) -> bool:
+        key = self.chunk_key(doc_hash)
+        return (self.chunks_dir / f"{key}.json").exists() and (self.chunks_dir / f"{key}.npy").exists()
+
+    def save_chunks(
+        self,
+        doc_hash: str,
+        texts: List[str],
+        metadatas: List[Dict[str, Any]],
+        vectors: List[List[float]]
+    ) -> None:
+        key = self.chunk_key(doc_hash)
+        array = np.asarray(vectors, dtype=np.float32)
+        # Scriem întâi fișierele temporare, apoi le redenumim atomic
+        with open(self.chunks_dir / f"{key}.npy.tmp", "wb") as f:
+            np.save(f, array)
+        (self.chunks_dir / f"{key}.json.tmp").write_text(
+            json.dumps({"texts": texts, "metadatas": metadatas})
+        )
+        os.replace(self.chunks_dir / f"{key}.npy.tmp", self.chunks_dir / f"{key}.npy")
+        os.replace(self.chunks_dir / f"{key}.json.tmp", self.chunks_dir / f"{key}.json")
+
+    def load_chunks(self, doc_hash: str) -> Dict[str, Any]:
+        """Încarcă textele și vectorii unui document; vectorii sunt memory-mapped."""
+        key = self.chunk_key(doc_hash)
+        payload = json.loads((self.chunks_dir / f"{key}.json").read_text())
+        payload["vectors"] = np.load(self.chunks_dir / f"{key}.npy", mmap_mode="r")
+        return payload
+
+    def delete_chunks(self, doc_hash: str) -> None:
+        key = self.chunk_key(doc_hash)
+        for suffix in (".json", ".npy"):
+            path = self.chunks_dir / f"{key}{suffix}"
+            if path.exists():
+                path.unlink()
+
+    # Checkpoint-uri pentru embedding întrerupt
+
+    def _partial_path(self, doc_hash: str, batch_size: int) -> Path:
+        return self.partial_dir / f"{self.chunk_key(doc_hash)}-b{batch_size}"
+
+    def load_partial(self, doc_hash: str, batch_size: int) -> Dict[int, np.ndarray]:
+        path = self._partial_path(doc_hash, batch_size)
+        if not path.exists():
+            return {}
+        completed = {}
+        for batch_file in path.glob("*.npy"):
+            completed[int(batch_file.stem)] = np.load(batch_file)
+        return completed
+
+    def save_partial(self, doc_hash: str, batch_size: int, index: int, vectors: List[List[float]]) -> None:
+        path = self._partial_path(doc_hash, batch_size)
+        path.mkdir(parents=True, exist_ok=True)
+        with open(path / f"{index}.npy.tmp", "wb") as f:
+            np.save(f, np.asarray(vectors, dtype=np.float32))
+        os.replace(path / f"{index}.npy.tmp", path / f"{index}.npy")
+
+    def clear_partial(self, doc_hash: str, batch_size: int) -> None:
+        shutil.rmtree(self._partial_path(doc_hash, batch_size), ignore_errors=True)
+
+    # FAISS index
+
+    def has_index(self, version: str) -> bool:
+        return (self.faiss_dir / version / "index.faiss").exists()
+
+    def build_index(self, documents: Dict[str, str], embeddings) -> Optional[FAISS]:
+        """Construiește indexul FAISS din vectorii salvați, fără apeluri de embedding."""
+        text_embeddings = []
+        metadatas = []
+        for name in sorted(documents):
+            payload = self.load_chunks(documents[name])
+            for text, metadata, vector in zip(payload["texts"], payload["metadatas"], payload["vectors"]):
+                text_embeddings.append((text, vector))
+                metadatas.append(metadata)
+        if not text_embeddings:
+            return None
+        return FAISS.from_embeddings(
+            text_embeddings,
+            embeddings,
+            metadatas=metadatas,
+            normalize_L2=True
+        )
+
+    def save_index(self, version: str, vector_store: FAISS) -> None:
+        target = self.faiss_dir / version
+        tmp_target = self.faiss_dir / f"{version}.tmp"
+        if tmp_target.exists():
+            shutil.rmtree(tmp_target)
+        vector_store.save_local(str(tmp_target))
+        if target.exists():
+            shutil.rmtree(target)
+        os.replace(tmp_target, target)
+
+    def load_index(self, version: str, embeddings) -> FAISS:
+        """Încarcă indexul FAISS memory-mapped (fără a citi tot fișierul în RAM)."""
+        target = self.faiss_dir / version
+        index = faiss.read_index(
+            str(target / "index.faiss"),
+            faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY
+        )
+        # index.pkl este scris de noi prin save_local, deci e de încredere
+        with open(target / "index.pkl", "rb") as f:
+            docstore, index_to_docstore_id = pickle.load(f)
+        return FAISS(
+            embedding_function=embeddings,
+            index=index,
+            docstore=docstore,
+            index_to_docstore_id=index_to_docstore_id,
+            normalize_L2=True
+        )
+
+    def prune(self, keep_version: str, documents: Dict[str, str]) -> None:
+        """
+        Șterge versiunile de index și chunk-urile mai vechi decât `keep_version`.
+
+        Alte procese (un alt worker, CLI-ul de ingestie) pot scrie în același
+        director: tot ce e mai nou decât versiunea păstrată rămâne, iar fișierele
+        `.tmp` se șterg doar după STALE_TMP_SECONDS fără modificări.
+        """
+        now = time.time()
+        keep = self.faiss_dir / keep_version
+        cutoff = keep.stat().st_mtime if keep.exists() else now
+
+        def is_stale(path: Path) -> bool:
+            try:
+                mtime = path.stat().st_mtime
+            except FileNotFoundError:
+                return False
+            if path.name.endswith(".tmp"):
+                return now - mtime > STALE_TMP_SECONDS
+            return mtime < cutoff
+
+        for path in self.faiss_dir.iterdir():
+            if path.is_dir() and path.name != keep_version and is_stale(path):
+                shutil.rmtree(path, ignore_errors=True)
+        live_keys = {self.chunk_key(doc_hash) for doc_hash in documents.values()}
+        for path in self.chunks_dir.iterdir():
+            key = path.name.split(".", 1)[0]
+            if key not in live_keys and is_stale(path):
+                path.unlink(missing_ok=True)
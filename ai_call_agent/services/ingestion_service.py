@@ -0,0 +1,131 @@
+from typing import Dict, Any, List, Optional, Tuple
+import os
+import asyncio
+import logging
+from .index_store import file_hash
+
+logger = logging.getLogger(__name__)
+
+
+class IngestionService:
+    """
+    Incremental ingestion for the RAG corpus.
+
+    Documents are added, replaced or removed in the documents directory and only
+    the changed files are parsed and embedded. The new index is built next to the
+    live one and swapped in by RAGService.load_corpus, so queries keep being
+    answered from the previous corpus version until the swap.
+    """
+
+    def __init__(self, rag_service, docs_dir: Optional[str] = None):
+        self.rag_service = rag_service
+        self.docs_dir = docs_dir or rag_service.docs_dir
+        # filename -> (mtime_ns, size, hash), evită re-hash-ul fișierelor neschimbate
+        self._stat_cache: Dict[str, Tuple[int, int, str]] = {}
+        self._watch_task: Optional[asyncio.Task] = None
+
+    @staticmethod
+    def validate_filename(filename: str) -> str:
+        name = os.path.basename(filename or "")
+        if not name or name != filename or not name.lower().endswith(".pdf"):
+            raise ValueError(f"Invalid document name: {filename!r}")
+        return name
+
+    def _hash(self, filename: str) -> str:
+        file_path = os.path.join(self.docs_dir, filename)
+        stat = os.stat(file_path)
+        cached = self._stat_cache.get(filename)
+        if cached and cached[0] == stat.st_mtime_ns and cached[1] == stat.st_size:
+            return cached[2]
+        doc_hash = file_hash(file_path)
+        self._stat_cache[filename] = (stat.st_mtime_ns, stat.st_size, doc_hash)
+        return doc_hash
+
+    def scan(self) -> Dict[str, str]:
+        """Returnează documentele curente din director, cu hash-ul fiecăruia."""
+        if not os.path.isdir(self.docs_dir):
+            raise FileNotFoundError(f"Directory not found: {self.docs_dir}")
+        pdf_files = sorted(f for f in os.listdir(self.docs_dir) if f.lower().endswith(".pdf"))
+        for filename in list(self._stat_cache):
+            if filename not in pdf_files:
+                del self._stat_cache[filename]
+        return {filename: self._hash(filename) for filename in pdf_files}
+
+    def list_documents(self) -> List[Dict[str, Any]]:
+        manifest = self.rag_service.index_store.load_manifest()
+        return [
+            {"name": name, "hash": doc_hash}
+            for name, doc_hash in sorted(manifest.get("documents", {}).items())
+        ]
+
+    async def sync(self) -> Dict[str, Any]:
+        """
+        Aduce indexul live în concordanță cu directorul de documente.
+
+        Returns:
+            Dict[str, Any]: Added, updated and removed documents plus the new version
+        """
+        loop = asyncio.get_running_loop()
+        documents = await loop.run_in_executor(None, self.scan)
+        previous = self.rag_service.index_store.load_manifest().get("documents", {})
+
+        changes = {
+            "added": sorted(name for name in documents if name not in previous),
+            "updated": sorted(
+                name for name in documents
+                if name in previous and previous[name] != documents[name]
+            ),
+            "removed": sorted(name for name in previous if name not in documents),
+        }
+
+        version = await self.rag_service.load_corpus(documents, self.docs_dir)
+        logger.info(f"Corpus sync complete: {changes} -> version {version}")
+        return {**changes, "version": version}
+
+    async def add_document(self, filename: str, content: bytes) -> Dict[str, Any]:
+        """Adaugă sau înlocuiește un document și actualizează indexul."""
+        name = self.validate_filename(filename)
+        os.makedirs(self.docs_dir, exist_ok=True)
+        target = os.path.join(self.docs_dir, name)
+        tmp_target = f"{target}.part"
+
+        def write():
+            with open(tmp_target, "wb") as f:
+                f.write(content)
+            os.replace(tmp_target, target)
+
+        await asyncio.get_running_loop().run_in_executor(None, write)
+        return await self.sync()
+
+    async def delete_document(self, filename: str) -> Dict[str, Any]:
+        """Șterge un document; vectorii lui dispar din indexul live la swap."""
+        name = self.validate_filename(filename)
+        target = os.path.join(self.docs_dir, name)
+        if not os.path.exists(target):
+            raise FileNotFoundError(f"Document not found: {name}")
+        os.remove(target)
+        return await self.sync()
+
+    def start_watching(self, interval: float = 30.0) -> None:
+        """Pornește o sarcină care sincronizează periodic directorul de documente."""
+        if self._watch_task and not self._watch_task.done():
+            return
+        self._watch_task = asyncio.create_task(self._watch(interval))
+
+    def stop_watching(self) -> None:
+        if self._watch_task:
+            self._watch_task.cancel()
+            self._watch_task = None
+
+    async def _watch(self, interval: float) -> None:
+        while True:
+            try:
+                await asyncio.sleep(interval)
+                loop = asyncio.get_running_loop()
+                documents = await loop.run_in_executor(None, self.scan)
+                if self.rag_service.index_store.corpus_version(documents) != self.rag_service.corpus_version:
+                    await self.sync()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Error watching documents directory: {str(e)}")
@@ -0,0 +1,155 @@
+from typing import Dict, Any, List, Optional, Tuple, Iterator
+from collections import deque
+import os
+import json
+import time
+import logging
+import threading
+from .text_utils import strip_diacritics
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_INTENTS_FILE = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "intents.json")
+
+
+def normalize_for_matching(text: str) -> str:
+    """Litere mici, fără diacritice; lungimea textului rămâne comparabilă cu originalul."""
+    return strip_diacritics(text).lower()
+
+
+class AhoCorasick:
+    """
+    Aho-Corasick automaton over a set of patterns.
+
+    A single pass over the text reports every occurrence of every pattern, so
+    matching cost is O(len(text) + matches) regardless of how many patterns
+    are compiled.
+    """
+
+    def __init__(self, patterns: List[Tuple[str, Any]]):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[List[Tuple[int, Any]]] = [[]]
+
+        for pattern, payload in patterns:
+            if not pattern:
+                continue
+            state = 0
+            for char in pattern:
+                next_state = self._goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto[state][char] = next_state
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append([])
+                state = next_state
+            self._output[state].append((len(pattern), payload))
+
+        # Legăturile de eșec, în ordinea BFS
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[next_state] = self._goto[fail].get(char, 0)
+                self._output[next_state] = self._output[next_state] + self._output[self._fail[next_state]]
+
+    def iter_matches(self, text: str) -> Iterator[Tuple[int, int, Any]]:
+        """Yield (start, end, payload) for every pattern occurrence in text."""
+        state = 0
+        for index, char in enumerate(text):
+            while state and char not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(char, 0)
+            for length, payload in self._output[state]:
+                yield index - length + 1, index + 1, payload
+
+
+class IntentMatcher:
+    """
+    Data-driven keyword router loaded from a JSON intent table.
+
+    The table maps group names (e.g. "standard_response", "stats") to ordered
+    entries with `patterns`, an optional `value` and an optional `whole_word`
+    flag. All groups are compiled into one automaton; `match` returns, per
+    group, the entry that appears first in the table among those found in the
+    text. Matching ignores case and diacritics. The file is re-read when its
+    modification time changes, at most once every `reload_interval` seconds.
+    """
+
+    def __init__(self, path: Optional[str] = None, reload_interval: float = 5.0):
+        self.path = path or os.getenv("INTENTS_FILE", DEFAULT_INTENTS_FILE)
+        self.reload_interval = reload_interval
+        self._lock = threading.Lock()
+        self._mtime = None
+        self._checked = 0.0
+        self._automaton = None
+        self.reload()
+
+    def reload(self) -> None:
+        with open(self.path, encoding="utf-8") as f:
+            table = json.load(f)
+        patterns = []
+        for group, entries in table.get("groups", {}).items():
+            for priority, entry in enumerate(entries):
+                payload = (group, priority, entry.get("value"), entry.get("whole_word", False))
+                for pattern in entry.get("patterns", []):
+                    patterns.append((normalize_for_matching(pattern), payload))
+        automaton = AhoCorasick(patterns)
+        with self._lock:
+            self._automaton = automaton
+            self._mtime = os.path.getmtime(self.path)
+        logger.info(f"Loaded {len(patterns)} intent patterns from {self.path}")
+
+    def maybe_reload(self) -> None:
+        now = time.monotonic()
+        if now - self._checked < self.reload_interval:
+            return
+        self._checked = now
+        try:
+            if os.path.getmtime(self.path) != self._mtime:
+                self.reload()
+        except (OSError, ValueError) as e:
+            # Păstrăm tabelul vechi dacă fișierul nou e invalid
+            logger.error(f"Failed to reload intents from {self.path}: {str(e)}")
+
+    def match(self, text: str) -> Dict[str, Dict[str, Any]]:
+        """
+        Potrivește textul cu toate grupurile într-o singură trecere.
+
+        Returns:
+            Dict[str, Dict[str, Any]]: group -> {"value", "pattern"} of the best entry
+        """
+        self.maybe_reload()
+        normalized = normalize_for_matching(text)
+        best: Dict[str, Tuple[int, Any, str]] = {}
+        for start, end, (group, priority, value, whole_word) in self._automaton.iter_matches(normalized):
+            if whole_word and not self._is_whole_word(normalized, start, end):
+                continue
+            if group not in best or priority < best[group][0]:
+                best[group] = (priority, value, normalized[start:end])
+        return {
+            group: {"value": value, "pattern": pattern}
+            for group, (_, value, pattern) in best.items()
+        }
+
+    @staticmethod
+    def _is_whole_word(text: str, start: int, end: int) -> bool:
+        before = text[start - 1] if start > 0 else " "
+        after = text[end] if end < len(text) else " "
+        return not before.isalnum() and not after.isalnum()
+
+
+_default_matcher: Optional[IntentMatcher] = None
+
+
+def get_intent_matcher() -> IntentMatcher:
+    """Instanța partajată, compilată o singură dată per proces."""
+    global _default_matcher
+    if _default_matcher is None:
+        _default_matcher = IntentMatcher()
+    return _default_matcher
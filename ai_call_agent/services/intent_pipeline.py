@@ -0,0 +1,231 @@
+from typing import Dict, Any, List, Optional, Tuple, Iterable
+from pathlib import Path
+import os
+import json
+import time
+import zlib
+import logging
+import numpy as np
+from .intent_matcher import IntentMatcher, get_intent_matcher
+from .answer_cache import AnswerCache, create_answer_cache
+from .text_utils import normalize_query
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MODEL_PATH = Path(__file__).resolve().parent.parent / "data" / "nlu_model.npz"
+DEFAULT_RESPONSES_PATH = Path(__file__).resolve().parent.parent / "data" / "local_responses.json"
+
+
+def text_features(text: str, dim: int) -> np.ndarray:
+    """Trigrame-pentagrame de caractere, hash-uite într-un vector de dimensiune fixă."""
+    padded = f" {normalize_query(text)} "
+    vector = np.zeros(dim, dtype=np.float32)
+    for n in (3, 4, 5):
+        for i in range(len(padded) - n + 1):
+            vector[zlib.crc32(padded[i:i + n].encode("utf-8")) % dim] += 1.0
+    return vector
+
+
+class LocalIntentClassifier:
+    """
+    Small TF-IDF nearest-centroid intent classifier.
+
+    Trained from Dialogflow training phrases. Hashed character n-grams keep it
+    robust to typos and missing diacritics without storing a vocabulary.
+    `classify` returns the best intent, its cosine similarity to that intent's
+    centroid, and the margin over the runner-up.
+    """
+
+    def __init__(self, labels: List[str], centroids: np.ndarray, idf: np.ndarray):
+        self.labels = labels
+        self.centroids = centroids
+        self.idf = idf
+        self.dim = len(idf)
+
+    @staticmethod
+    def _normalize(matrix: np.ndarray) -> np.ndarray:
+        norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+        return matrix / np.maximum(norms, 1e-9)
+
+    @classmethod
+    def train(cls, examples: Dict[str, List[str]], dim: int = 2 ** 15) -> "LocalIntentClassifier":
+        labels = sorted(label for label, phrases in examples.items() if phrases)
+        rows, owners = [], []
+        for index, label in enumerate(labels):
+            for phrase in examples[label]:
+                rows.append(text_features(phrase, dim))
+                owners.append(index)
+        counts = np.stack(rows)
+        document_frequency = np.count_nonzero(counts, axis=0)
+        idf = (np.log((1 + len(rows)) / (1 + document_frequency)) + 1).astype(np.float32)
+        weighted = cls._normalize(np.log1p(counts) * idf)
+        owners = np.array(owners)
+        centroids = np.stack([weighted[owners == i].mean(axis=0) for i in range(len(labels))])
+        return cls(labels, cls._normalize(centroids).astype(np.float32), idf)
+
+    def classify(self, text: str) -> Tuple[Optional[str], float, float]:
+        vector = self._normalize(np.log1p(text_features(text, self.dim)) * self.idf)
+        scores = self.centroids @ vector
+        order = np.argsort(scores)[::-1]
+        if not len(order) or scores[order[0]] <= 0:
+            return None, 0.0, 0.0
+        runner_up = float(scores[order[1]]) if len(order) > 1 else 0.0
+        return self.labels[order[0]], float(scores[order[0]]), float(scores[order[0]]) - runner_up
+
+    def save(self, path: str) -> None:
+        np.savez_compressed(path, labels=np.array(self.labels), centroids=self.centroids, idf=self.idf)
+
+    @classmethod
+    def load(cls, path: str) -> "LocalIntentClassifier":
+        data = np.load(path)
+        return cls([str(label) for label in data["labels"]], data["centroids"], data["idf"])
+
+
+def load_training_phrases(source: str, language: str = "en") -> Dict[str, List[str]]:
+    """
+    Frazele de antrenament dintr-un export de agent Dialogflow CX
+    (intents/<intent>/trainingPhrases/<language>.json) sau dintr-un JSON simplu
+    {intent: [fraze]}.
+    """
+    path = Path(source)
+    if path.is_file():
+        return json.loads(path.read_text(encoding="utf-8"))
+
+    examples: Dict[str, List[str]] = {}
+    for phrases_file in path.glob(f"intents/*/trainingPhrases/{language}.json"):
+        intent_dir = phrases_file.parent.parent
+        try:
+            intent_name = json.loads((intent_dir / f"{intent_dir.name}.json").read_text(encoding="utf-8"))["displayName"]
+        except (FileNotFoundError, KeyError):
+            intent_name = intent_dir.name
+        phrases = json.loads(phrases_file.read_text(encoding="utf-8")).get("trainingPhrases", [])
+        examples[intent_name] = ["".join(part["text"] for part in phrase["parts"]) for phrase in phrases]
+    return examples
+
+
+class IntentPipeline:
+    """
+    Tiered intent resolution in front of Dialogflow.
+
+    1. Keyword automaton (the `basic_intent` group of the intent matcher).
+    2. Local classifier, trusted above `min_confidence` with a clear margin.
+    3. Per-language cache of earlier confident Dialogflow results.
+    4. Dialogflow itself.
+
+    Keywords are only trusted for short utterances. Tiers 1-2 answer only
+    intents that have a configured local response for the language;
+    everything else falls through.
+
+    The cache is shared across sessions, while Dialogflow CX answers depend on
+    each session's flow and page. Only `cacheable_intents` (context-free
+    FAQ-style intents) are stored; with none configured the cache tier is off.
+
+    Dialogflow latency is tracked so the time saved by local answers can be
+    estimated.
+    """
+
+    def __init__(
+        self,
+        dialogflow,
+        matcher: Optional[IntentMatcher] = None,
+        classifier: Optional[LocalIntentClassifier] = None,
+        responses: Optional[Dict[str, Dict[str, str]]] = None,
+        cache: Optional[AnswerCache] = None,
+        min_confidence: float = 0.6,
+        min_margin: float = 0.1,
+        cache_min_confidence: float = 0.7,
+        keyword_max_words: int = 4,
+        cacheable_intents: Optional[Iterable[str]] = None
+    ):
+        self.dialogflow = dialogflow
+        self.matcher = matcher
+        self.classifier = classifier
+        self.responses = responses or {}
+        self.cache = cache
+        self.min_confidence = min_confidence
+        self.min_margin = min_margin
+        self.cache_min_confidence = cache_min_confidence
+        self.keyword_max_words = keyword_max_words
+        self.cacheable_intents = frozenset(cacheable_intents or ())
+        self.stats = {"keywords": 0, "classifier": 0, "cache": 0, "dialogflow": 0, "dialogflow_seconds": 0.0}
+
+    def _local_response(self, intent: str, language: str) -> Optional[str]:
+        return self.responses.get(language.split("-")[0].lower(), {}).get(intent)
+
+    def _answer(self, source: str, intent: str, text: str, confidence: float, session_id: str) -> Dict[str, Any]:
+        self.stats[source] += 1
+        return {"session_id": session_id, "text": text, "intent": intent, "confidence": confidence, "source": source}
+
+    async def get_response(self, text: str, session_id: str, language: str = "en-US") -> Dict[str, Any]:
+        # Cuvintele-cheie decid doar replici scurte ("salut", "pa"); în fraze
+        # lungi un "bună" nu spune nimic despre intenție
+        if self.matcher is not None and len(text.split()) <= self.keyword_max_words:
+            match = self.matcher.match(text).get("basic_intent")
+            response = match and self._local_response(match["value"], language)
+            if response:
+                return self._answer("keywords", match["value"], response, 0.95, session_id)
+
+        if self.classifier is not None:
+            intent, confidence, margin = self.classifier.classify(text)
+            response = intent and self._local_response(intent, language)
+            if response and confidence >= self.min_confidence and margin >= self.min_margin:
+                return self._answer("classifier", intent, response, round(confidence, 3), session_id)
+
+        # În cache ajung doar intențiile din cacheable_intents, deci orice rezultat
+        # găsit aici nu depinde de pagina/fluxul sesiunii
+        cache_key = AnswerCache.make_key("dialogflow", text, language) if self.cache and self.cacheable_intents else None
+        if cache_key:
+            cached = await self.cache.get(cache_key)
+            if cached:
+                return self._answer("cache", cached["intent"], cached["text"], cached["confidence"], session_id)
+
+        start = time.monotonic()
+        result = await self.dialogflow.get_response_async(text, session_id, language)
+        self.stats["dialogflow"] += 1
+        self.stats["dialogflow_seconds"] += time.monotonic() - start
+        if "error" in result:
+            return result
+        if cache_key and result["intent"] in self.cacheable_intents and result["confidence"] >= self.cache_min_confidence:
+            await self.cache.set(cache_key, result)
+        return {"session_id": session_id, **result, "source": "dialogflow"}
+
+    def get_stats(self) -> Dict[str, Any]:
+        offloaded = self.stats["keywords"] + self.stats["classifier"] + self.stats["cache"]
+        total = offloaded + self.stats["dialogflow"]
+        avg_latency = self.stats["dialogflow_seconds"] / self.stats["dialogflow"] if self.stats["dialogflow"] else 0.0
+        return {
+            **self.stats,
+            "dialogflow_seconds": round(self.stats["dialogflow_seconds"], 3),
+            "offload_ratio": round(offloaded / total, 3) if total else 0.0,
+            "avg_dialogflow_seconds": round(avg_latency, 3),
+            "estimated_seconds_saved": round(offloaded * avg_latency, 3),
+        }
+
+
+def create_intent_pipeline(dialogflow, cache: Optional[AnswerCache] = None) -> IntentPipeline:
+    """
+    Pipeline-ul din env: NLU_MODEL_PATH (clasificator, opțional), NLU_RESPONSES_PATH
+    (răspunsuri locale per limbă), NLU_MIN_CONFIDENCE, NLU_CACHEABLE_INTENTS (intențiile
+    Dialogflow fără context, separate prin virgulă). Fără `cache`, se creează unul din ANSWER_CACHE_*.
+    """
+    model_path = os.getenv("NLU_MODEL_PATH", str(DEFAULT_MODEL_PATH))
+    classifier = None
+    if os.path.exists(model_path):
+        classifier = LocalIntentClassifier.load(model_path)
+        logger.info(f"Loaded local NLU model with {len(classifier.labels)} intents")
+
+    responses_path = os.getenv("NLU_RESPONSES_PATH", str(DEFAULT_RESPONSES_PATH))
+    responses = {}
+    if os.path.exists(responses_path):
+        with open(responses_path, encoding="utf-8") as f:
+            responses = json.load(f)
+
+    return IntentPipeline(
+        dialogflow,
+        matcher=get_intent_matcher(),
+        classifier=classifier,
+        responses=responses,
+        cache=cache if cache is not None else create_answer_cache(),
+        min_confidence=float(os.getenv("NLU_MIN_CONFIDENCE", "0.6")),
+        cacheable_intents=[name.strip() for name in os.getenv("NLU_CACHEABLE_INTENTS", "").split(",") if name.strip()]
+    )
@@ -1,10 +1,12 @@
-from typing import Dict, Any
+from typing import Dict, Any, AsyncIterator
 import os
 from dotenv import load_dotenv
 import logging
+import hashlib
 from langchain import LLMChain, PromptTemplate
 from langchain.chat_models import ChatOpenAI
 from langchain.memory import ConversationBufferMemory
+from .answer_cache import AnswerCache, create_answer_cache
 
 logger = logging.getLogger(__name__)
 
@@ -33,9 +35,21 @@ class LLMService:
             template=template
         )
         
+        # Chain built once and shared by all sessions; history is passed per call
+        self.chain = LLMChain(
+            llm=self.llm,
+            prompt=self.prompt
+        )
+        
         # Initialize conversation memory
         self.memories: Dict[str, ConversationBufferMemory] = {}
         
+        # Cache de răspunsuri; cheia include istoricul conversației
+        self.prompt_version = hashlib.sha256(
+            f"{self.llm.model_name}\x1f{template}".encode("utf-8")
+        ).hexdigest()[:12]
+        self.answer_cache = create_answer_cache()
+        
     def get_memory(self, session_id: str) -> ConversationBufferMemory:
         if session_id not in self.memories:
             self.memories[session_id] = ConversationBufferMemory(
@@ -49,16 +63,29 @@ class LLMService:
             # Get memory for this session
             memory = self.get_memory(session_id)
             
-            # Create chain
-            chain = LLMChain(
-                llm=self.llm,
-                prompt=self.prompt,
-                memory=memory,
-                verbose=True
+            cache_key = None
+            if self.answer_cache:
+                history = "\x1e".join(message.content for message in memory.chat_memory.messages)
+                history_digest = hashlib.sha256(history.encode("utf-8")).hexdigest()
+                cache_key = AnswerCache.make_key("llm", text, history_digest, self.prompt_version)
+                cached = await self.answer_cache.get(cache_key)
+                if cached:
+                    memory.save_context({"human_input": text}, {"text": cached["text"]})
+                    return {
+                        "text": cached["text"],
+                        "session_id": session_id,
+                        "cached": True
+                    }
+            
+            # Get response from the shared chain; memory is per session
+            response = await self.chain.arun(
+                human_input=text,
+                chat_history=memory.load_memory_variables({})["chat_history"]
             )
+            memory.save_context({"human_input": text}, {"text": response})
             
-            # Get response
-            response = await chain.arun(human_input=text)
+            if cache_key:
+                await self.answer_cache.set(cache_key, {"text": response})
             
             return {
                 "text": response,
@@ -67,4 +94,45 @@ class LLMService:
             
         except Exception as e:
             logger.error(f"Error in LLM service: {str(e)}")
-            return {"error": str(e)} 
\ No newline at end of file
+            return {"error": str(e)} 
+
+    async def stream_response(self, text: str, session_id: str) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Streaming variant of get_response: yields {"type": "delta", "text"} events
+        and a final {"type": "done", "text", "session_id"} event.
+        """
+        try:
+            memory = self.get_memory(session_id)
+            
+            cache_key = None
+            if self.answer_cache:
+                history = "\x1e".join(message.content for message in memory.chat_memory.messages)
+                history_digest = hashlib.sha256(history.encode("utf-8")).hexdigest()
+                cache_key = AnswerCache.make_key("llm", text, history_digest, self.prompt_version)
+                cached = await self.answer_cache.get(cache_key)
+                if cached:
+                    memory.save_context({"human_input": text}, {"text": cached["text"]})
+                    yield {"type": "delta", "text": cached["text"]}
+                    yield {"type": "done", "text": cached["text"], "session_id": session_id, "cached": True}
+                    return
+            
+            prompt = self.prompt.format(
+                chat_history=memory.load_memory_variables({})["chat_history"],
+                human_input=text
+            )
+            chunks = []
+            async for chunk in self.llm.astream(prompt):
+                if chunk.content:
+                    chunks.append(chunk.content)
+                    yield {"type": "delta", "text": chunk.content}
+            
+            response = "".join(chunks)
+            memory.save_context({"human_input": text}, {"text": response})
+            if cache_key:
+                await self.answer_cache.set(cache_key, {"text": response})
+            
+            yield {"type": "done", "text": response, "session_id": session_id}
+            
+        except Exception as e:
+            logger.error(f"Error in LLM service: {str(e)}")
+            yield {"type": "error", "error": str(e)}
@@ -1,24 +1,41 @@
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional, AsyncIterator
 import os
 from dotenv import load_dotenv
 import logging
-from langchain_openai import OpenAIEmbeddings
 from langchain_openai import ChatOpenAI
 from langchain_community.vectorstores import FAISS
 from langchain_core.prompts import PromptTemplate
-from langchain_text_splitters import RecursiveCharacterTextSplitter
-from langchain_community.document_loaders import DirectoryLoader, TextLoader, UnstructuredPDFLoader
+from langchain_community.document_loaders import DirectoryLoader, TextLoader
 from langchain.chains import RetrievalQA
 import asyncio
-from functools import lru_cache
+import hashlib
 import time
+from .index_store import IndexStore, file_hash
+from .document_pipeline import DocumentPipeline
+from .embedding_service import EmbeddingScheduler, create_embeddings, embedding_model_name
+from .semantic_cache import SemanticCache
+from .text_utils import normalize_query
+from .answer_cache import AnswerCache, create_answer_cache
+from .intent_matcher import get_intent_matcher
 
 # Set up logging
 logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 
 class RAGService:
-    def __init__(self):
+    CHUNK_SIZE = 300      # Smaller chunks
+    CHUNK_OVERLAP = 30    # Less overlap
+    EMBED_BATCH_SIZE = int(os.getenv("RAG_EMBED_BATCH_SIZE", "256"))
+    OPENAI_ERROR_TEXT = "Sorry, I cannot access this information at the moment."
+    CACHEABLE_SOURCES = ("RAG", "OpenAI", "OpenAI (Direct)")
+    STREAM_HOLDBACK_CHARS = 40  # RAG tokens checked for fallback phrases before streaming
+
+    def __init__(self, auto_initialize: bool = True):
+        """
+        Args:
+            auto_initialize (bool): Start loading the default corpus in the background;
+                the ingestion CLI turns it off and loads its own docs_dir
+        """
         try:
             logger.debug("Loading environment variables...")
             load_dotenv()
@@ -27,12 +44,9 @@ class RAGService:
             if not self.api_key:
                 raise ValueError("OPENAI_API_KEY not found in environment variables")
             
-            logger.debug("Initializing OpenAI embeddings...")
-            self.embeddings = OpenAIEmbeddings(
-                api_key=self.api_key,
-                chunk_size=1000,  # Process more text at once
-                max_retries=1     # Reduce wait time for retries
-            )
+            logger.debug("Initializing embeddings...")
+            self.embeddings = create_embeddings(self.api_key)
+            self.embedding_scheduler = EmbeddingScheduler.from_env(self.embeddings)
             
             logger.debug("Initializing ChatOpenAI...")
             self.llm = ChatOpenAI(
@@ -44,6 +58,35 @@ class RAGService:
             )
             
             self.vector_store = None
+            self.qa_chain = None
+            self.corpus_version = None
+            self.corpus_lock = asyncio.Lock()
+            self.docs_dir = os.getenv("RAG_DOCS_DIR", "ai_call_agent/data/docs")
+            
+            # Semantic answer cache (RAG_SEMANTIC_CACHE=0 to disable)
+            self.semantic_cache = None
+            if os.getenv("RAG_SEMANTIC_CACHE", "1") == "1":
+                self.semantic_cache = SemanticCache(
+                    threshold=float(os.getenv("RAG_SEMANTIC_CACHE_THRESHOLD", "0.95")),
+                    max_entries=int(os.getenv("RAG_SEMANTIC_CACHE_SIZE", "1000")),
+                    ttl=float(os.getenv("RAG_SEMANTIC_CACHE_TTL", "3600"))
+                )
+            # O pană a serviciului de embedding nu trebuie să întârzie răspunsul
+            self.semantic_cache_timeout = float(os.getenv("RAG_SEMANTIC_CACHE_TIMEOUT", "1.0"))
+            
+            # Parsing/chunking in a process pool, streamed into embedding batches
+            self.document_pipeline = DocumentPipeline(self.CHUNK_SIZE, self.CHUNK_OVERLAP)
+            
+            # Persistent index keyed by document hash + splitter/embedding settings
+            self.index_store = IndexStore(
+                os.getenv("RAG_INDEX_DIR", "ai_call_agent/data/index"),
+                {
+                    "loader": "UnstructuredPDFLoader:paged",
+                    "chunk_size": self.CHUNK_SIZE,
+                    "chunk_overlap": self.CHUNK_OVERLAP,
+                    "embedding_model": embedding_model_name(self.embeddings),
+                }
+            )
             
             # RAG prompt template
             self.rag_template = """Answer concisely based on context. If unsure, say "UNKNOWN".
@@ -66,8 +109,54 @@ class RAGService:
                 template=self.openai_template,
             )
             
+            # Direct OpenAI prompt (used by get_openai_response)
+            self.direct_template = """You are an AI assistant providing accurate and consistent information.
+            
+            Response Rules:
+            1. Always respond in the same language as the question
+            2. Use reliable sources (World Population Review, UN)
+            3. Include the year for statistics
+            4. Structure responses clearly
+            5. If uncertain, explicitly state lack of exact information
+            
+            Global Statistics Reference:
+            - Global Population: 8.1 billion (2024, World Population Review)
+            - Countries: 195 (UN: 193 members + 2 observers)
+            
+            Question: {query}
+            
+            Provide a clear, structured response.
+            """
+            
+            # Schimbarea prompturilor sau a modelului invalidează cache-ul de răspunsuri
+            self.prompt_version = hashlib.sha256(
+                "\x1f".join([
+                    self.llm.model_name, self.rag_template, self.openai_template, self.direct_template
+                ]).encode("utf-8")
+            ).hexdigest()[:12]
+            self.answer_cache = create_answer_cache()
+            
+            self.intent_matcher = get_intent_matcher()
+            
+            # Hedged RAG + direct execution: "always", "uncertain" (default) or "never".
+            # Applies to get_response (/api/chat) only; stream_response keeps the
+            # sequential fallback, see _stream_generate
+            self.hedge_policy = os.getenv("RAG_HEDGE_POLICY", "uncertain")
+            if self.hedge_policy not in ("always", "uncertain", "never"):
+                raise ValueError(f"Invalid RAG_HEDGE_POLICY: {self.hedge_policy}")
+            self.hedge_min_relevance = float(os.getenv("RAG_HEDGE_MIN_RELEVANCE", "0.75"))
+            self.hedge_stats = {
+                "hedged": 0,
+                "rag_wins": 0,
+                "direct_wins": 0,
+                "both_failed": 0,
+                "sequential": 0,
+                "sequential_fallbacks": 0,
+            }
+            
             # Pre-initialize vector store
-            asyncio.create_task(self.initialize_vector_store())
+            if auto_initialize:
+                asyncio.create_task(self.initialize_vector_store())
             
             logger.info("RAG Service initialized successfully")
             
@@ -75,12 +164,12 @@ class RAGService:
             logger.error(f"Error in RAG Service initialization: {str(e)}")
             raise
 
-    @lru_cache(maxsize=1)  # Cache the vector store
-    async def initialize_vector_store(self, docs_dir: str = "ai_call_agent/data/docs"):
+    async def initialize_vector_store(self, docs_dir: Optional[str] = None):
         try:
             if self.vector_store:
                 return
                 
+            docs_dir = docs_dir or self.docs_dir
             start_time = time.time()
             logger.info("Starting vector store initialization...")
             
@@ -90,36 +179,19 @@ class RAGService:
                 raise FileNotFoundError(f"Directory not found: {docs_dir}")
             
             logger.debug("Looking for PDF files...")
-            pdf_files = [f for f in os.listdir(docs_dir) if f.endswith('.pdf')]
+            pdf_files = sorted(f for f in os.listdir(docs_dir) if f.lower().endswith('.pdf'))
             logger.info(f"Found PDF files: {pdf_files}")
             
             if not pdf_files:
                 raise FileNotFoundError("No PDF files found in documents directory")
             
-            documents = []
+            loop = asyncio.get_running_loop()
+            documents = {}
             for filename in pdf_files:
                 file_path = os.path.join(docs_dir, filename)
-                logger.debug(f"Loading PDF: {file_path}")
-                loader = UnstructuredPDFLoader(file_path)
-                doc_pages = loader.load()
-                logger.info(f"Loaded {len(doc_pages)} pages from {filename}")
-                documents.extend(doc_pages)
-            
-            logger.debug("Splitting documents...")
-            text_splitter = RecursiveCharacterTextSplitter(
-                chunk_size=300,     # Smaller chunks
-                chunk_overlap=30,    # Less overlap
-                length_function=len  # Simple length function
-            )
-            texts = text_splitter.split_documents(documents)
-            logger.info(f"Split into {len(texts)} chunks")
-            
-            logger.debug("Creating vector store...")
-            self.vector_store = FAISS.from_documents(
-                texts, 
-                self.embeddings,
-                normalize_L2=True  # Optimization for search
-            )
+                documents[filename] = await loop.run_in_executor(None, file_hash, file_path)
+            
+            await self.load_corpus(documents, docs_dir)
             
             end_time = time.time()
             logger.info(f"Vector store initialized in {end_time - start_time:.2f} seconds")
@@ -128,77 +200,431 @@ class RAGService:
             logger.error(f"Error in initialize_vector_store: {str(e)}")
             raise
 
+    async def load_corpus(self, documents: Dict[str, str], docs_dir: Optional[str] = None) -> str:
+        """
+        Load or build the index for a set of documents and swap it in.
+        
+        Args:
+            documents (Dict[str, str]): Mapping of PDF file name to content hash
+            docs_dir (Optional[str]): Directory containing the PDF files
+            
+        Returns:
+            str: The corpus version now being served
+        """
+        docs_dir = docs_dir or self.docs_dir
+        async with self.corpus_lock:
+            version = self.index_store.corpus_version(documents)
+            if version == self.corpus_version and self.vector_store:
+                return version
+            
+            loop = asyncio.get_running_loop()
+            if self.index_store.has_index(version):
+                # Indexul pentru această versiune există deja pe disc
+                vector_store = await loop.run_in_executor(
+                    None, self.index_store.load_index, version, self.embeddings
+                )
+                logger.info(f"Loaded vector store {version} from disk")
+            else:
+                # Re-embed doar documentele noi sau modificate
+                missing = {}
+                for filename, doc_hash in documents.items():
+                    if self.index_store.has_chunks(doc_hash):
+                        logger.debug(f"Reusing cached embeddings for {filename}")
+                        continue
+                    missing[os.path.join(docs_dir, filename)] = doc_hash
+                await self._embed_documents(missing)
+                
+                logger.debug("Creating vector store...")
+                vector_store = await loop.run_in_executor(
+                    None, self.index_store.build_index, documents, self.embeddings
+                )
+                if vector_store is not None:
+                    await loop.run_in_executor(None, self.index_store.save_index, version, vector_store)
+            
+            self.index_store.save_manifest(version, documents)
+            
+            # Swap atomic: cererile în curs păstrează referința la indexul vechi
+            self.qa_chain = self._build_qa_chain(vector_store) if vector_store is not None else None
+            self.vector_store = vector_store
+            self.corpus_version = version
+            if self.semantic_cache:
+                self.semantic_cache.invalidate()
+            
+            self.index_store.prune(version, documents)
+            logger.info(f"Serving corpus version {version} ({len(documents)} documents)")
+            return version
+
+    def _build_qa_chain(self, vector_store: FAISS) -> RetrievalQA:
+        """Construiește lanțul RetrievalQA o singură dată per versiune de corpus."""
+        return RetrievalQA.from_chain_type(
+            llm=self.llm,
+            chain_type="stuff",
+            retriever=vector_store.as_retriever(
+                search_kwargs={"k": 2}
+            ),
+            chain_type_kwargs={
+                "prompt": self.QA_CHAIN_PROMPT
+            },
+            return_source_documents=True
+        )
+
+    async def _embed_documents(self, paths: Dict[str, str]) -> None:
+        """Parsează în paralel PDF-urile și face embedding pe loturi, pe măsură ce sosesc."""
+        async for file_path, chunks in self.document_pipeline.iter_documents(list(paths)):
+            doc_hash = paths[file_path]
+            contents = [text for text, _ in chunks]
+            # Loturile deja calculate (de o rulare întreruptă) nu se mai plătesc
+            vectors = await self.embedding_scheduler.embed_documents(
+                contents,
+                batch_size=self.EMBED_BATCH_SIZE,
+                completed=self.index_store.load_partial(doc_hash, self.EMBED_BATCH_SIZE),
+                on_batch=lambda index, batch_vectors, doc_hash=doc_hash: self.index_store.save_partial(
+                    doc_hash, self.EMBED_BATCH_SIZE, index, batch_vectors
+                )
+            )
+            self.index_store.save_chunks(
+                doc_hash,
+                contents,
+                [metadata for _, metadata in chunks],
+                vectors
+            )
+            self.index_store.clear_partial(doc_hash, self.EMBED_BATCH_SIZE)
+
     async def get_openai_response(self, query: str) -> str:
         """Get direct response from OpenAI"""
         try:
             # English prompt for all responses
-            prompt = f"""You are an AI assistant providing accurate and consistent information.
-            
-            Response Rules:
-            1. Always respond in the same language as the question
-            2. Use reliable sources (World Population Review, UN)
-            3. Include the year for statistics
-            4. Structure responses clearly
-            5. If uncertain, explicitly state lack of exact information
-            
-            Global Statistics Reference:
-            - Global Population: 8.1 billion (2024, World Population Review)
-            - Countries: 195 (UN: 193 members + 2 observers)
-            
-            Question: {query}
-            
-            Provide a clear, structured response.
-            """
+            prompt = self.direct_template.format(query=query)
             
             response = await self.llm.apredict(prompt)
             return response
         except Exception as e:
             logger.error(f"OpenAI error: {str(e)}")
-            return "Sorry, I cannot access this information at the moment."
+            return self.OPENAI_ERROR_TEXT
 
     async def get_response(self, query: str) -> Dict[str, Any]:
+        """Răspunde la întrebare, trecând întâi prin cache-ul exact și cel semantic."""
+        start_time = time.time()
+        corpus_version = self.corpus_version
+        
+        # Răspunsurile standard nu au nevoie de cache și nici de embedding
+        local = self._local_response(query)
+        if local:
+            return {**local, "time": f"{time.time() - start_time:.2f}s"}
+        
+        cache_key = None
+        if self.answer_cache:
+            cache_key = AnswerCache.make_key("rag", query, corpus_version, self.prompt_version)
+            cached = await self.answer_cache.get(cache_key)
+            if cached:
+                return {
+                    **cached,
+                    "cached": True,
+                    "time": f"{time.time() - start_time:.2f}s"
+                }
+        
+        response = await self._get_semantic_response(query, corpus_version)
+        
+        if cache_key and self._is_cacheable(response):
+            await self.answer_cache.set(cache_key, {"text": response["text"], "source": response["source"]})
+        return response
+
+    def _is_cacheable(self, response: Dict[str, Any]) -> bool:
+        return (
+            not response.get("cached")
+            and response.get("source") in self.CACHEABLE_SOURCES
+            and response["text"] != self.OPENAI_ERROR_TEXT
+        )
+
+    def _local_response(self, query: str) -> Optional[Dict[str, Any]]:
+        """Răspunsul din tabela de intenții, fără niciun apel de rețea."""
+        routes = self.intent_matcher.match(query)
+        if "standard_response" in routes:
+            return {"text": routes["standard_response"]["value"], "source": "Standard Response"}
+        return None
+
+    async def _embed_for_cache(self, normalized: str) -> Optional[List[float]]:
+        """Embedding-ul pentru cache-ul semantic; None dacă serviciul e lent sau indisponibil."""
+        try:
+            return await asyncio.wait_for(
+                self.embeddings.aembed_query(normalized), self.semantic_cache_timeout
+            )
+        except Exception as e:
+            logger.warning(f"Semantic cache lookup skipped: {str(e) or type(e).__name__}")
+            return None
+
+    async def _get_semantic_response(self, query: str, corpus_version: Optional[str]) -> Dict[str, Any]:
+        if self.semantic_cache is None:
+            return await self._generate_response(query)
+        
+        start_time = time.time()
+        normalized = normalize_query(query)
+        embedding = await self._embed_for_cache(normalized)
+        if embedding is None:
+            return await self._generate_response(query)
+        
+        cached = self.semantic_cache.lookup(embedding, corpus_version)
+        if cached:
+            return {
+                **cached,
+                "cached": True,
+                "time": f"{time.time() - start_time:.2f}s"
+            }
+        
+        response = await self._generate_response(query)
+        if self._is_cacheable(response):
+            self.semantic_cache.store(
+                normalized,
+                embedding,
+                {"text": response["text"], "source": response["source"]},
+                corpus_version
+            )
+        return response
+
+    async def stream_response(self, query: str) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Streaming variant of get_response.
+        
+        Yields {"type": "delta", "text": ...} events as tokens arrive, then one
+        {"type": "done", "text", "source", "time"} event with the full answer.
+        Cached and standard answers arrive as a single delta. If the LLM stream
+        broke after tokens were sent, the done event has "error": True and the
+        truncated answer is not cached.
+        """
+        start_time = time.time()
+        corpus_version = self.corpus_version
+        
+        local = self._local_response(query)
+        if local:
+            yield {"type": "delta", "text": local["text"]}
+            yield {"type": "done", **local, "time": f"{time.time() - start_time:.2f}s"}
+            return
+        
+        cache_key = None
+        if self.answer_cache:
+            cache_key = AnswerCache.make_key("rag", query, corpus_version, self.prompt_version)
+            cached = await self.answer_cache.get(cache_key)
+            if cached:
+                yield {"type": "delta", "text": cached["text"]}
+                yield {"type": "done", **cached, "cached": True, "time": f"{time.time() - start_time:.2f}s"}
+                return
+        
+        embedding = None
+        normalized = normalize_query(query)
+        if self.semantic_cache:
+            embedding = await self._embed_for_cache(normalized)
+            cached = self.semantic_cache.lookup(embedding, corpus_version) if embedding is not None else None
+            if cached:
+                yield {"type": "delta", "text": cached["text"]}
+                yield {"type": "done", **cached, "cached": True, "time": f"{time.time() - start_time:.2f}s"}
+                return
+        
+        chunks = []
+        source = None
+        error = False
+        async for event in self._stream_generate(query):
+            if event["type"] == "delta":
+                chunks.append(event["text"])
+                yield event
+            else:
+                source = event["source"]
+                error = event.get("error", False)
+        
+        response = {"text": "".join(chunks), "source": source}
+        if not error and self._is_cacheable(response):
+            if cache_key:
+                await self.answer_cache.set(cache_key, dict(response))
+            if embedding is not None:
+                self.semantic_cache.store(normalized, embedding, dict(response), corpus_version)
+        yield {
+            "type": "done",
+            **response,
+            **({"error": True} if error else {}),
+            "time": f"{time.time() - start_time:.2f}s"
+        }
+
+    async def _stream_openai(self, query: str) -> AsyncIterator[Dict[str, Any]]:
+        """Delta events from the direct answer, then {"type": "error"} if the stream failed."""
+        emitted = False
+        try:
+            async for chunk in self.llm.astream(self.direct_template.format(query=query)):
+                if chunk.content:
+                    emitted = True
+                    yield {"type": "delta", "text": chunk.content}
+        except Exception as e:
+            logger.error(f"OpenAI error: {str(e)}")
+            if not emitted:
+                yield {"type": "delta", "text": self.OPENAI_ERROR_TEXT}
+            yield {"type": "error"}
+
+    async def _stream_direct(self, query: str, source: str) -> AsyncIterator[Dict[str, Any]]:
+        error = False
+        async for event in self._stream_openai(query):
+            if event["type"] == "error":
+                error = True
+            else:
+                yield event
+        yield {"type": "source", "source": source, "error": error}
+
+    async def _stream_generate(self, query: str) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Same routing as _generate_response, token by token.
+        
+        The first STREAM_HOLDBACK_CHARS of a RAG answer are held back and checked
+        for fallback phrases; a hit switches to the direct OpenAI answer before
+        anything reaches the client. Fallback phrases after that point cannot
+        be retracted and the RAG answer is kept.
+        
+        RAG_HEDGE_POLICY is not applied here; the stream always tries RAG first
+        and switches to the direct answer only through the hold-back check.
+        """
+        routes = self.intent_matcher.match(query)
+        if "standard_response" in routes:
+            yield {"type": "delta", "text": routes["standard_response"]["value"]}
+            yield {"type": "source", "source": "Standard Response"}
+            return
+        
+        if "stats" in routes or "comparison" in routes:
+            async for event in self._stream_direct(query, "OpenAI (Direct)"):
+                yield event
+            return
+        
+        held = []
+        released = False
+        fallback_source = None
+        try:
+            if not self.vector_store:
+                await self.initialize_vector_store()
+            
+            docs = await self.qa_chain.retriever.ainvoke(query)
+            prompt = self.QA_CHAIN_PROMPT.format(
+                context="\n\n".join(doc.page_content for doc in docs),
+                question=query
+            )
+            
+            async for chunk in self.llm.astream(prompt):
+                token = chunk.content
+                if not token:
+                    continue
+                if released:
+                    yield {"type": "delta", "text": token}
+                    continue
+                held.append(token)
+                text = "".join(held)
+                if "rag_fallback" in self.intent_matcher.match(text):
+                    fallback_source = "OpenAI"
+                    break
+                if len(text) >= self.STREAM_HOLDBACK_CHARS:
+                    released = True
+                    yield {"type": "delta", "text": text}
+            
+            if not released and fallback_source is None:
+                text = "".join(held)
+                if "rag_fallback" in self.intent_matcher.match(text):
+                    fallback_source = "OpenAI"
+                else:
+                    yield {"type": "delta", "text": text}
+        
+        except Exception as e:
+            logger.error(f"Response error: {str(e)}")
+            if released:
+                # Răspuns RAG trunchiat: clientul îl are deja, dar nu intră în cache
+                yield {"type": "source", "source": "RAG", "error": True}
+                return
+            fallback_source = "OpenAI (Fallback)"
+        
+        if fallback_source:
+            logger.info("Using OpenAI for better response")
+            async for event in self._stream_direct(query, fallback_source):
+                yield event
+            return
+        
+        yield {"type": "source", "source": "RAG"}
+
+    def get_metrics(self) -> Dict[str, Any]:
+        return {
+            "corpus_version": self.corpus_version,
+            "answer_cache": self.answer_cache.get_stats() if self.answer_cache else None,
+            "semantic_cache": self.semantic_cache.get_stats() if self.semantic_cache else None,
+            "embedding_scheduler": self.embedding_scheduler.stats,
+            "hedging": {"policy": self.hedge_policy, **self.hedge_stats},
+        }
+
+    async def _answer_from_docs(self, qa_chain, docs: List[Any], query: str) -> str:
+        """Rulează doar partea "stuff" a lanțului QA, pe documente deja regăsite."""
+        result = await qa_chain.combine_documents_chain.ainvoke(
+            {"input_documents": docs, "question": query}
+        )
+        return result["output_text"]
+
+    async def _hedged_response(self, query: str, qa_chain, docs: List[Any], start_time: float) -> Dict[str, Any]:
+        """
+        Run the RAG answer and the direct OpenAI answer concurrently.
+        
+        The first acceptable answer wins and the other call is cancelled: a RAG
+        answer is acceptable unless it contains a fallback phrase, a direct
+        answer unless the OpenAI call failed.
+        """
+        self.hedge_stats["hedged"] += 1
+        
+        async def rag_candidate() -> Optional[str]:
+            answer = await self._answer_from_docs(qa_chain, docs, query)
+            return None if "rag_fallback" in self.intent_matcher.match(answer) else answer
+        
+        async def direct_candidate() -> Optional[str]:
+            answer = await self.get_openai_response(query)
+            return None if answer == self.OPENAI_ERROR_TEXT else answer
+        
+        tasks = {
+            asyncio.create_task(rag_candidate()): "RAG",
+            asyncio.create_task(direct_candidate()): "OpenAI",
+        }
+        pending = set(tasks)
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    try:
+                        answer = task.result()
+                    except Exception as e:
+                        logger.warning(f"Hedged {tasks[task]} call failed: {str(e)}")
+                        answer = None
+                    if answer is not None:
+                        source = tasks[task]
+                        self.hedge_stats["rag_wins" if source == "RAG" else "direct_wins"] += 1
+                        return {
+                            "text": answer,
+                            "source": source,
+                            "time": f"{time.time() - start_time:.2f}s"
+                        }
+        finally:
+            for task in pending:
+                task.cancel()
+        
+        self.hedge_stats["both_failed"] += 1
+        return {
+            "text": self.OPENAI_ERROR_TEXT,
+            "source": "OpenAI (Fallback)",
+            "time": f"{time.time() - start_time:.2f}s"
+        }
+
+    async def _generate_response(self, query: str) -> Dict[str, Any]:
         try:
             start_time = time.time()
             
-            # Standard response patterns (bilingual)
-            standard_responses = {
-                # Romanian patterns
-                "populatia globului": "According to World Population Review, the global population in 2024 is approximately 8.1 billion people.",
-                "cate tari": "There are 195 countries in the world, according to UN data. This includes 193 UN member states and 2 observer states: Vatican City and Palestine.",
-                "cati oameni": "According to World Population Review, the global population in 2024 is approximately 8.1 billion people.",
-                
-                # English patterns
-                "global population": "According to World Population Review, the global population in 2024 is approximately 8.1 billion people.",
-                "how many countries": "There are 195 countries in the world, according to UN data. This includes 193 UN member states and 2 observer states: Vatican City and Palestine.",
-                "world population": "According to World Population Review, the global population in 2024 is approximately 8.1 billion people."
-            }
+            # Intent table (bilingual, diacritic-insensitive), compiled once
+            routes = self.intent_matcher.match(query)
             
             # Check for standard responses
-            for key in standard_responses:
-                if key in query.lower():
-                    return {
-                        "text": standard_responses[key],
-                        "source": "Standard Response",
-                        "time": f"{time.time() - start_time:.2f}s"
-                    }
-            
-            # Keywords for different types of questions (bilingual)
-            stats_keywords = [
-                # Romanian
-                'cati', 'cate', 'numar', 'cifra', 'populatie', 'exacta',
-                # English
-                'how many', 'number', 'population', 'exact', 'total', 'count'
-            ]
-            
-            comparison_keywords = [
-                # Romanian
-                'compara', 'diferenta', 'versus', 'fata de',
-                # English
-                'compare', 'difference', 'versus', 'vs', 'between'
-            ]
-            
-            is_stats = any(keyword in query.lower() for keyword in stats_keywords)
-            is_comparison = any(keyword in query.lower() for keyword in comparison_keywords)
+            if "standard_response" in routes:
+                return {
+                    "text": routes["standard_response"]["value"],
+                    "source": "Standard Response",
+                    "time": f"{time.time() - start_time:.2f}s"
+                }
+            
+            is_stats = "stats" in routes
+            is_comparison = "comparison" in routes
             
             if is_stats or is_comparison:
                 answer = await self.get_openai_response(query)
@@ -212,30 +638,30 @@ class RAGService:
             if not self.vector_store:
                 await self.initialize_vector_store()
             
-            qa_chain = RetrievalQA.from_chain_type(
-                llm=self.llm,
-                chain_type="stuff",
-                retriever=self.vector_store.as_retriever(
-                    search_kwargs={"k": 2}
-                ),
-                chain_type_kwargs={
-                    "prompt": self.QA_CHAIN_PROMPT
-                },
-                return_source_documents=True
-            )
-            
-            response = await qa_chain.acall({"query": query})
-            answer = response["result"]
+            # Chain built once per corpus version (see load_corpus)
+            qa_chain = self.qa_chain
+            
+            if self.hedge_policy == "never":
+                self.hedge_stats["sequential"] += 1
+                response = await qa_chain.acall({"query": query})
+                answer = response["result"]
+            else:
+                # Retrieval first: the scores tell us whether the corpus covers the question
+                docs_and_scores = await qa_chain.retriever.vectorstore.asimilarity_search_with_relevance_scores(
+                    query, **qa_chain.retriever.search_kwargs
+                )
+                docs = [doc for doc, _ in docs_and_scores]
+                top_score = max((score for _, score in docs_and_scores), default=0.0)
+                
+                if self.hedge_policy == "always" or top_score < self.hedge_min_relevance:
+                    return await self._hedged_response(query, qa_chain, docs, start_time)
+                
+                self.hedge_stats["sequential"] += 1
+                answer = await self._answer_from_docs(qa_chain, docs, query)
             
             # Check for RAG fallback conditions (bilingual)
-            fallback_phrases = [
-                # Romanian
-                "nu pot", "nu am", "nu știu",
-                # English
-                "cannot", "don't know", "unknown"
-            ]
-            
-            if any(phrase in answer.lower() for phrase in fallback_phrases):
+            if "rag_fallback" in self.intent_matcher.match(answer):
+                self.hedge_stats["sequential_fallbacks"] += 1
                 logger.info("Using OpenAI for better response")
                 openai_answer = await self.get_openai_response(query)
                 return {
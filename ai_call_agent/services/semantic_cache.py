@@ -0,0 +1,120 @@
+from typing import Dict, Any, List, Optional
+from collections import OrderedDict
+import time
+import logging
+import numpy as np
+import faiss
+
+logger = logging.getLogger(__name__)
+
+
+class SemanticCache:
+    """
+    Answer cache matched by query similarity instead of exact text.
+
+    Normalized queries are embedded and kept in a small inner-product FAISS index
+    (vectors are L2-normalized, so scores are cosine similarities). A lookup
+    returns the stored answer when the nearest cached query scores at least
+    `threshold`. Entries expire after `ttl` seconds, the least recently used
+    entry is evicted beyond `max_entries`, and everything is dropped when the
+    corpus version changes.
+    """
+
+    def __init__(self, threshold: float = 0.95, max_entries: int = 1000, ttl: float = 3600.0):
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.index = None
+        self.entries: "OrderedDict[int, Dict[str, Any]]" = OrderedDict()
+        self._next_id = 0
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0, "invalidations": 0}
+
+    @staticmethod
+    def _as_vector(embedding: List[float]) -> np.ndarray:
+        vector = np.asarray([embedding], dtype=np.float32)
+        faiss.normalize_L2(vector)
+        return vector
+
+    def _remove(self, entry_id: int) -> None:
+        self.entries.pop(entry_id, None)
+        self.index.remove_ids(np.asarray([entry_id], dtype=np.int64))
+
+    def _is_stale(self, entry: Dict[str, Any], corpus_version: Optional[str]) -> bool:
+        return time.time() - entry["created"] > self.ttl or entry["corpus_version"] != corpus_version
+
+    def lookup(
+        self,
+        embedding: List[float],
+        corpus_version: Optional[str] = None,
+        candidates: int = 8
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Cel mai apropiat răspuns valid peste `threshold`.
+
+        Candidații expirați întâlniți pe drum sunt eliminați și căutarea continuă,
+        astfel încât un vecin expirat nu ascunde unul valid și nici nu rămâne în
+        index pentru căutările următoare.
+        """
+        if self.index is None or not self.entries:
+            self.stats["misses"] += 1
+            return None
+
+        vector = self._as_vector(embedding)
+        while self.entries:
+            scores, ids = self.index.search(vector, min(candidates, len(self.entries)))
+            for entry_id, score in zip(ids[0].tolist(), scores[0].tolist()):
+                if entry_id < 0 or score < self.threshold:
+                    self.stats["misses"] += 1
+                    return None
+                entry = self.entries.get(entry_id)
+                if entry is None or self._is_stale(entry, corpus_version):
+                    self._remove(entry_id)
+                    continue
+                self.entries.move_to_end(entry_id)
+                self.stats["hits"] += 1
+                logger.debug(f"Semantic cache hit ({score:.3f}) for: {entry['query']}")
+                return {**entry["response"], "similarity": round(score, 4)}
+            # Toți candidații erau expirați și eliminați; căutăm din nou
+
+        self.stats["misses"] += 1
+        return None
+
+    def store(
+        self,
+        query: str,
+        embedding: List[float],
+        response: Dict[str, Any],
+        corpus_version: Optional[str] = None
+    ) -> None:
+        vector = self._as_vector(embedding)
+        if self.index is None:
+            self.index = faiss.IndexIDMap2(faiss.IndexFlatIP(vector.shape[1]))
+
+        entry_id = self._next_id
+        self._next_id += 1
+        self.index.add_with_ids(vector, np.asarray([entry_id], dtype=np.int64))
+        self.entries[entry_id] = {
+            "query": query,
+            "response": response,
+            "corpus_version": corpus_version,
+            "created": time.time(),
+        }
+
+        while len(self.entries) > self.max_entries:
+            oldest_id = next(iter(self.entries))
+            self._remove(oldest_id)
+            self.stats["evictions"] += 1
+
+    def invalidate(self) -> None:
+        """Golește cache-ul, de ex. după schimbarea corpusului."""
+        self.entries.clear()
+        self.index = None
+        self.stats["invalidations"] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        lookups = self.stats["hits"] + self.stats["misses"]
+        return {
+            **self.stats,
+            "entries": len(self.entries),
+            "hit_rate": round(self.stats["hits"] / lookups, 4) if lookups else 0.0,
+        }
@@ -0,0 +1,113 @@
+from typing import Dict, Any, List, Optional, Callable, Awaitable
+import re
+import time
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Sfârșit de propoziție urmat de spațiu (ghilimelele/parantezele de închidere rămân în propoziție)
+SENTENCE_END = re.compile(r'[.!?…]+["”»\')\]]*\s+')
+
+
+class SentenceSplitter:
+    """
+    Cuts a token stream into sentences as soon as each one is complete.
+
+    Sentences shorter than `min_chars` are merged with the next one (this avoids
+    one synthesis call for "Da." or for abbreviations like "Dr."). Text with
+    no punctuation is cut at the last comma or space before `max_chars`, so a
+    run-on answer still starts playing early.
+    """
+
+    def __init__(self, min_chars: int = 24, max_chars: int = 240):
+        self.min_chars = min_chars
+        self.max_chars = max_chars
+        self.buffer = ""
+
+    def feed(self, delta: str) -> List[str]:
+        self.buffer += delta
+        sentences = []
+        while True:
+            cut = None
+            for match in SENTENCE_END.finditer(self.buffer):
+                if match.end() >= self.min_chars:
+                    cut = match.end()
+                    break
+            if cut is None and len(self.buffer) > self.max_chars:
+                window = self.buffer[:self.max_chars]
+                cut = max(window.rfind(", "), window.rfind(" "))
+                cut = cut + 1 if cut > 0 else self.max_chars
+            if cut is None:
+                return sentences
+            sentence, self.buffer = self.buffer[:cut].strip(), self.buffer[cut:]
+            if sentence:
+                sentences.append(sentence)
+
+    def flush(self) -> List[str]:
+        sentence, self.buffer = self.buffer.strip(), ""
+        return [sentence] if sentence else []
+
+
+class SpeechStreamer:
+    """
+    Synthesizes sentences concurrently and delivers the audio in order.
+
+    `add` starts synthesis right away (up to `max_concurrency` at a time), while
+    a single sender awaits the results in submission order and passes each one
+    to `send`. The first sentence plays while the rest of the answer is still
+    being generated and synthesized.
+    """
+
+    def __init__(
+        self,
+        synthesize: Callable[[str], Awaitable[str]],
+        send: Callable[[Dict[str, Any]], Awaitable[None]],
+        max_concurrency: int = 3
+    ):
+        self.synthesize = synthesize
+        self.send = send
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._pending: asyncio.Queue = asyncio.Queue()
+        self._index = 0
+        self._started = time.monotonic()
+        self.first_audio_seconds: Optional[float] = None
+        self._sender = asyncio.create_task(self._send_in_order())
+
+    async def _synthesize(self, text: str) -> str:
+        async with self._semaphore:
+            return await self.synthesize(text)
+
+    def add(self, sentence: str) -> None:
+        task = asyncio.create_task(self._synthesize(sentence))
+        self._pending.put_nowait((self._index, sentence, task))
+        self._index += 1
+
+    async def _send_in_order(self) -> None:
+        while True:
+            item = await self._pending.get()
+            if item is None:
+                return
+            index, sentence, task = item
+            try:
+                audio = await task
+            except Exception as e:
+                # O propoziție fără audio nu oprește restul răspunsului
+                logger.warning(f"Speech synthesis failed for sentence {index}: {str(e)}")
+                continue
+            if self.first_audio_seconds is None:
+                self.first_audio_seconds = time.monotonic() - self._started
+                logger.info(f"Time to first audio: {self.first_audio_seconds:.2f}s")
+            await self.send({"type": "audio", "enabled": True, "index": index, "text": sentence, "content": audio})
+
+    async def finish(self) -> None:
+        """Așteaptă trimiterea tuturor propozițiilor adăugate."""
+        self._pending.put_nowait(None)
+        await self._sender
+
+    async def cancel(self) -> None:
+        self._sender.cancel()
+        while not self._pending.empty():
+            item = self._pending.get_nowait()
+            if item is not None:
+                item[2].cancel()
@@ -0,0 +1,130 @@
+import io
+import os
+import json
+import wave
+import logging
+import numpy as np
+import speech_recognition as sr
+from .audio_decode import TARGET_SAMPLE_RATE, decode_wav, resample, to_int16
+
+logger = logging.getLogger(__name__)
+
+
+def encode_wav(samples: np.ndarray, sample_rate: int = TARGET_SAMPLE_RATE) -> bytes:
+    """Împachetează PCM mono int16 într-un WAV (pentru motoarele care cer fișier)."""
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+        wav.writeframes(samples.astype(np.int16).tobytes())
+    return buffer.getvalue()
+
+
+class STTEngine:
+    """Interfața comună pentru motoarele speech-to-text."""
+
+    name = "base"
+
+    def transcribe(self, audio_content: bytes) -> str:
+        raise NotImplementedError
+
+
+class GoogleSTTEngine(STTEngine):
+    """Google Web Speech API prin speech_recognition (necesită rețea)."""
+
+    name = "google"
+
+    def transcribe(self, audio_content: bytes) -> str:
+        with io.BytesIO(audio_content) as audio_bytes:
+            recognizer = sr.Recognizer()
+            with sr.AudioFile(audio_bytes) as source:
+                audio_data = recognizer.record(source)
+            try:
+                return recognizer.recognize_google(audio_data)
+            except sr.UnknownValueError:
+                # O bucată fără vorbire inteligibilă (respirație, click, zgomot),
+                # nu o eroare: transcribe_samples o sare la concatenare
+                return ""
+
+
+class WhisperSTTEngine(STTEngine):
+    """
+    Local Whisper transcription via faster-whisper (CTranslate2).
+
+    The model is loaded once per process, int8-quantized by default. Concurrent
+    requests from the STT pool share these weights: CTranslate2 runs up to
+    `num_workers` transcriptions in parallel, one request each. Requests are not
+    combined into a single batch.
+    """
+
+    name = "whisper"
+
+    def __init__(
+        self,
+        model_size: str = "base",
+        compute_type: str = "int8",
+        cpu_threads: int = 0,
+        num_workers: int = 1,
+        language: str = None
+    ):
+        from faster_whisper import WhisperModel
+        logger.info(f"Loading Whisper model '{model_size}' ({compute_type})...")
+        self.model = WhisperModel(
+            model_size,
+            device="cpu",
+            compute_type=compute_type,
+            cpu_threads=cpu_threads,
+            num_workers=num_workers
+        )
+        self.language = language
+
+    def transcribe(self, audio_content: bytes) -> str:
+        audio, sample_rate = decode_wav(audio_content)
+        segments, _ = self.model.transcribe(
+            resample(audio, sample_rate, TARGET_SAMPLE_RATE),
+            language=self.language,
+            beam_size=1,
+            vad_filter=False
+        )
+        return " ".join(segment.text.strip() for segment in segments).strip()
+
+
+class VoskSTTEngine(STTEngine):
+    """Transcriere locală cu Vosk (Kaldi); modelul se încarcă o singură dată."""
+
+    name = "vosk"
+
+    def __init__(self, model_path: str):
+        from vosk import Model, SetLogLevel
+        SetLogLevel(-1)
+        logger.info(f"Loading Vosk model from {model_path}...")
+        self.model = Model(model_path)
+
+    def transcribe(self, audio_content: bytes) -> str:
+        from vosk import KaldiRecognizer
+        audio, sample_rate = decode_wav(audio_content)
+        # Un recognizer per cerere; modelul este partajat între thread-uri
+        recognizer = KaldiRecognizer(self.model, sample_rate)
+        recognizer.AcceptWaveform(to_int16(audio).tobytes())
+        return json.loads(recognizer.FinalResult()).get("text", "")
+
+
+def create_stt_engine(engine: str = None, num_workers: int = 1) -> STTEngine:
+    """
+    Creează motorul STT selectat prin STT_ENGINE: "google" (default), "whisper" sau "vosk".
+    """
+    engine = engine or os.getenv("STT_ENGINE", "google")
+    if engine == "google":
+        return GoogleSTTEngine()
+    if engine == "whisper":
+        return WhisperSTTEngine(
+            model_size=os.getenv("STT_WHISPER_MODEL", "base"),
+            compute_type=os.getenv("STT_COMPUTE_TYPE", "int8"),
+            cpu_threads=int(os.getenv("STT_CPU_THREADS", "0")),
+            num_workers=num_workers,
+            language=os.getenv("STT_LANGUAGE") or None
+        )
+    if engine == "vosk":
+        return VoskSTTEngine(os.getenv("STT_VOSK_MODEL", "ai_call_agent/data/models/vosk"))
+    raise ValueError(f"Unknown STT engine: {engine}")
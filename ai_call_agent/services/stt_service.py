@@ -0,0 +1,221 @@
+from typing import Dict, Any, Callable, Optional, List, Sequence
+import os
+import time
+import asyncio
+import logging
+import threading
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from .stt_engines import STTEngine, encode_wav
+from .audio_decode import TARGET_SAMPLE_RATE, UnsupportedAudioFormat, decode_audio
+from .vad import split_utterances
+
+logger = logging.getLogger(__name__)
+
+
+class STTPoolSaturated(Exception):
+    """Toți workerii sunt ocupați și coada este plină."""
+
+
+class STTWorkerPool:
+    """
+    Bounded worker pool for blocking speech-to-text calls.
+
+    Transcriptions run on a dedicated thread pool so the event loop stays free.
+    At most `max_workers + max_queue` jobs are admitted; beyond that `submit`
+    raises STTPoolSaturated (mapped to HTTP 429). A job that exceeds `timeout`
+    is reported as timed out, but keeps its slot until the worker thread is
+    really done, so admission always reflects actual load.
+    """
+
+    def __init__(self, max_workers: int = 4, max_queue: int = 16, timeout: float = 30.0):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="stt")
+        self._lock = threading.Lock()
+        self._admitted = 0
+        self._running = 0
+        self.stats = {"completed": 0, "rejected": 0, "timeouts": 0, "errors": 0, "total_seconds": 0.0}
+
+    @classmethod
+    def from_env(cls) -> "STTWorkerPool":
+        return cls(
+            max_workers=int(os.getenv("STT_WORKERS", "4")),
+            max_queue=int(os.getenv("STT_QUEUE_SIZE", "16")),
+            timeout=float(os.getenv("STT_TIMEOUT", "30"))
+        )
+
+    def _run(self, fn: Callable, args: tuple) -> Any:
+        with self._lock:
+            self._running += 1
+        start = time.monotonic()
+        try:
+            return fn(*args)
+        finally:
+            with self._lock:
+                self._running -= 1
+                self._admitted -= 1
+                self.stats["total_seconds"] += time.monotonic() - start
+
+    async def submit(self, fn: Callable, *args, timeout: Optional[float] = None) -> Any:
+        """
+        Rulează fn(*args) pe un worker STT.
+
+        Raises:
+            STTPoolSaturated: When the pool and its queue are full
+            asyncio.TimeoutError: When the job does not finish within the timeout
+        """
+        with self._lock:
+            if self._admitted >= self.max_workers + self.max_queue:
+                self.stats["rejected"] += 1
+                raise STTPoolSaturated("Speech recognition is busy, please retry shortly")
+            self._admitted += 1
+
+        try:
+            future = self._executor.submit(self._run, fn, args)
+        except Exception:
+            with self._lock:
+                self._admitted -= 1
+            raise
+
+        try:
+            result = await asyncio.wait_for(asyncio.wrap_future(future), timeout or self.timeout)
+        except asyncio.TimeoutError:
+            # Dacă nu a pornit încă, îl scoatem din coadă
+            if future.cancel():
+                with self._lock:
+                    self._admitted -= 1
+            self.stats["timeouts"] += 1
+            raise
+        except Exception:
+            self.stats["errors"] += 1
+            raise
+        self.stats["completed"] += 1
+        return result
+
+    async def submit_many(self, fn: Callable, args_list: Sequence[tuple], timeout: Optional[float] = None) -> List[Any]:
+        """
+        Rulează fn(*args) pentru fiecare element, ca o singură cerere.
+
+        Admission is all-or-nothing: the request reserves
+        min(len(args_list), max_workers) slots at once and its jobs are spread
+        over those lanes, so one long clip cannot take the whole queue. One
+        deadline covers the whole request; when it expires or a job fails, the
+        jobs that have not started yet are skipped.
+
+        Raises:
+            STTPoolSaturated: When the slots cannot all be reserved
+            asyncio.TimeoutError: When the request does not finish within the timeout
+        """
+        if not args_list:
+            return []
+        lanes = min(len(args_list), self.max_workers)
+        with self._lock:
+            if self._admitted + lanes > self.max_workers + self.max_queue:
+                self.stats["rejected"] += 1
+                raise STTPoolSaturated("Speech recognition is busy, please retry shortly")
+            self._admitted += lanes
+
+        results: List[Any] = [None] * len(args_list)
+        abandoned = threading.Event()
+
+        def run_lane(indices: range) -> None:
+            for i in indices:
+                if abandoned.is_set():
+                    return
+                results[i] = fn(*args_list[i])
+
+        futures = []
+        try:
+            for lane in range(lanes):
+                futures.append(self._executor.submit(self._run, run_lane, (range(lane, len(args_list), lanes),)))
+        except Exception:
+            with self._lock:
+                self._admitted -= lanes - len(futures)
+            abandoned.set()
+            raise
+
+        try:
+            await asyncio.wait_for(
+                asyncio.gather(*(asyncio.wrap_future(future) for future in futures)),
+                timeout or self.timeout
+            )
+        except BaseException as e:
+            abandoned.set()
+            # Lane-urile care nu au pornit își eliberează locul aici
+            for future in futures:
+                if future.cancel():
+                    with self._lock:
+                        self._admitted -= 1
+            if isinstance(e, asyncio.TimeoutError):
+                self.stats["timeouts"] += 1
+            elif isinstance(e, Exception):
+                self.stats["errors"] += 1
+            raise
+        self.stats["completed"] += 1
+        return results
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            running = self._running
+            admitted = self._admitted
+        finished = self.stats["completed"] + self.stats["errors"]
+        return {
+            "workers": self.max_workers,
+            "running": running,
+            "queue_depth": max(0, admitted - running),
+            "queue_capacity": self.max_queue,
+            "completed": self.stats["completed"],
+            "rejected": self.stats["rejected"],
+            "timeouts": self.stats["timeouts"],
+            "errors": self.stats["errors"],
+            "avg_seconds": round(self.stats["total_seconds"] / finished, 3) if finished else 0.0,
+        }
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+async def transcribe_samples(
+    pool: STTWorkerPool,
+    engine: STTEngine,
+    samples: np.ndarray,
+    sample_rate: int,
+    vad=None,
+    max_utterance_s: float = 15.0
+) -> Dict[str, Any]:
+    """
+    Transcrie doar vorbirea: tăcerea este eliminată, iar frazele sunt trimise
+    în paralel pe pool, ca o singură cerere, și reunite în ordine.
+    """
+    utterances = split_utterances(samples, sample_rate, vad, max_utterance_s=max_utterance_s)
+    texts = await pool.submit_many(
+        engine.transcribe,
+        [(encode_wav(utterance, sample_rate),) for utterance in utterances]
+    )
+    return {
+        "text": " ".join(text.strip() for text in texts if text).strip(),
+        "segments": len(utterances),
+        "audio_seconds": round(len(samples) / sample_rate, 2),
+        "speech_seconds": round(sum(len(u) for u in utterances) / sample_rate, 2)
+    }
+
+
+async def transcribe_utterances(
+    pool: STTWorkerPool,
+    engine: STTEngine,
+    audio_content: bytes,
+    vad=None,
+    max_utterance_s: float = 15.0
+) -> Dict[str, Any]:
+    """
+    Ca transcribe_samples, pornind de la fișierul complet (orice format pe care
+    decode_audio îl suportă). Restul se transcrie întreg, ca înainte.
+    """
+    try:
+        samples = decode_audio(audio_content)
+    except UnsupportedAudioFormat as e:
+        logger.debug(f"VAD skipped, transcribing whole clip: {str(e)}")
+        return {"text": await pool.submit(engine.transcribe, audio_content), "segments": 1}
+    return await transcribe_samples(pool, engine, samples, TARGET_SAMPLE_RATE, vad, max_utterance_s)
@@ -0,0 +1,13 @@
+import re
+import unicodedata
+
+
+def strip_diacritics(text: str) -> str:
+    """Elimină diacriticele: "știu" -> "stiu", "Größe" -> "Große"."""
+    decomposed = unicodedata.normalize("NFKD", text)
+    return "".join(c for c in decomposed if not unicodedata.combining(c))
+
+
+def normalize_query(query: str) -> str:
+    """Normalizează întrebarea: litere mici, fără diacritice, spații compactate, fără punctuație de capăt."""
+    return re.sub(r"\s+", " ", strip_diacritics(query).lower()).strip(" ?!.")
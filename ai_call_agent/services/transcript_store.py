@@ -0,0 +1,300 @@
+from typing import Dict, Any, List, Optional, Callable, AsyncIterator, Tuple
+from datetime import datetime
+import os
+import json
+import time
+import base64
+import asyncio
+import logging
+from sqlalchemy import select, insert, func, tuple_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..database import ChatMessage, ChatSession
+
+logger = logging.getLogger(__name__)
+
+
+class TranscriptWriter:
+    """
+    Write-behind buffer for chat messages.
+
+    `append` only queues the row in memory. A background task inserts everything
+    queued in a single multi-row INSERT once `batch_size` messages are pending
+    or `flush_interval` seconds have passed. When the batch violates a
+    constraint (a deleted or unknown session), it is retried one session at a
+    time and only the offending session's rows are dropped, so one bad session
+    cannot block the others. Any other failure keeps the batch queued for the
+    next flush, up to `max_pending` rows; past that the oldest rows are dropped
+    and logged. A crash loses at most the last interval.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], AsyncSession],
+        batch_size: int = 20,
+        flush_interval: float = 0.5,
+        max_pending: int = 10000
+    ):
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self._pending: List[Dict[str, Any]] = []
+        # session_id -> următorul număr de ordine
+        self._next_seq: Dict[str, int] = {}
+        self._wakeup = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self.stats = {"written": 0, "batches": 0, "errors": 0, "dropped": 0, "flush_seconds": 0.0}
+
+    def append(self, session_id: str, sender: str, content: str, name: Optional[str] = None) -> Dict[str, Any]:
+        """Adaugă un mesaj în buffer și întoarce rândul (cu seq și created_at)."""
+        seq = self._next_seq.get(session_id, 0)
+        self._next_seq[session_id] = seq + 1
+        row = {
+            "session_id": session_id,
+            "seq": seq,
+            "sender": sender,
+            "name": name,
+            "content": content,
+            "created_at": datetime.utcnow(),
+        }
+        self._pending.append(row)
+        if len(self._pending) >= self.batch_size:
+            self._wakeup.set()
+        return row
+
+    def end_session(self, session_id: str) -> None:
+        """Sesiunea s-a încheiat; mesajele ei din buffer se scriu în continuare."""
+        self._next_seq.pop(session_id, None)
+
+    async def discard(self, session_id: str) -> None:
+        """
+        Renunță la mesajele nescrise ale unei sesiuni șterse.
+
+        Waits for a running flush first, so no row of the session is in flight
+        once this returns and a DELETE issued afterwards cannot be undone by it.
+        """
+        async with self._flush_lock:
+            self._next_seq.pop(session_id, None)
+            self._pending = [row for row in self._pending if row["session_id"] != session_id]
+
+    async def _insert(self, rows: List[Dict[str, Any]]) -> None:
+        async with self.session_factory() as db:
+            await db.execute(insert(ChatMessage), rows)
+            await db.commit()
+
+    def _requeue(self, rows: List[Dict[str, Any]]) -> None:
+        # Înapoi în față, păstrând ordinea; reîncercăm la următorul flush
+        self._pending = rows + self._pending
+        overflow = len(self._pending) - self.max_pending
+        if overflow > 0:
+            self._pending = self._pending[overflow:]
+            self.stats["dropped"] += overflow
+
+    async def _insert_per_session(self, batch: List[Dict[str, Any]]) -> int:
+        """Scrie lotul sesiune cu sesiune; renunță doar la sesiunile care încalcă o constrângere."""
+        by_session: Dict[str, List[Dict[str, Any]]] = {}
+        for row in batch:
+            by_session.setdefault(row["session_id"], []).append(row)
+        written = 0
+        retry: List[Dict[str, Any]] = []
+        for session_id, rows in by_session.items():
+            if retry:
+                # Baza de date nu răspunde; nu mai încercăm restul sesiunilor acum
+                retry.extend(rows)
+                continue
+            try:
+                await self._insert(rows)
+                written += len(rows)
+            except IntegrityError as e:
+                logger.error(f"Dropping {len(rows)} chat messages for session {session_id}: {str(e.orig)}")
+                # seq rămâne: mesajele adăugate între timp își păstrează ordinea
+                self.stats["dropped"] += len(rows)
+            except Exception as e:
+                logger.error(f"Error writing chat messages for session {session_id}: {str(e)}")
+                self.stats["errors"] += 1
+                retry.extend(rows)
+        if retry:
+            self._requeue(retry)
+        return written
+
+    async def flush(self) -> int:
+        async with self._flush_lock:
+            if not self._pending:
+                return 0
+            batch, self._pending = self._pending, []
+            start = time.monotonic()
+            try:
+                await self._insert(batch)
+                written = len(batch)
+            except IntegrityError as e:
+                logger.warning(f"Batch of {len(batch)} chat messages rejected, retrying per session: {str(e.orig)}")
+                self.stats["errors"] += 1
+                written = await self._insert_per_session(batch)
+            except Exception as e:
+                logger.error(f"Error writing {len(batch)} chat messages: {str(e)}")
+                self.stats["errors"] += 1
+                self._requeue(batch)
+                return 0
+            finally:
+                self.stats["flush_seconds"] += time.monotonic() - start
+            self.stats["written"] += written
+            self.stats["batches"] += 1
+            return written
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "flush_seconds": round(self.stats["flush_seconds"], 3),
+            "pending": len(self._pending),
+            "open_sessions": len(self._next_seq),
+        }
+
+
+async def fetch_messages(db: AsyncSession, session_id: str, after: int = -1, limit: int = 100) -> List[Dict[str, Any]]:
+    """O pagină de mesaje, în ordine, cu seq > `after` (paginare după cheie, nu OFFSET)."""
+    result = await db.execute(
+        select(ChatMessage.seq, ChatMessage.sender, ChatMessage.name, ChatMessage.content, ChatMessage.created_at)
+        .where(ChatMessage.session_id == session_id, ChatMessage.seq > after)
+        .order_by(ChatMessage.seq)
+        .limit(limit)
+    )
+    return [
+        {
+            "seq": row.seq,
+            "sender": row.sender,
+            **({"name": row.name} if row.name else {}),
+            "content": row.content,
+            "timestamp": row.created_at.isoformat(),
+        }
+        for row in result
+    ]
+
+
+def encode_cursor(start_time: datetime, session_id: str) -> str:
+    raw = f"{start_time.isoformat()}|{session_id}".encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    """Inversul lui encode_cursor; ValueError dacă cursorul nu e valid."""
+    try:
+        start_time, _, session_id = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8").partition("|")
+        return datetime.fromisoformat(start_time), session_id
+    except (UnicodeError, ValueError, TypeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor!r}") from e
+
+
+async def list_sessions(
+    db: AsyncSession,
+    user_id: str,
+    cursor: Optional[str] = None,
+    limit: int = 20
+) -> Dict[str, Any]:
+    """
+    Sesiunile unui utilizator, cele mai noi primele, paginate după cheie.
+
+    Doar coloanele mici (fără transcript), plus numărul de mesaje; interogarea
+    parcurge indexul (user_id, start_time), deci costul nu depinde de câte
+    sesiuni sau mesaje are utilizatorul în total.
+    """
+    message_count = (
+        select(func.count())
+        .where(ChatMessage.session_id == ChatSession.id)
+        .correlate(ChatSession)
+        .scalar_subquery()
+    )
+    query = (
+        select(
+            ChatSession.id,
+            ChatSession.start_time,
+            ChatSession.end_time,
+            ChatSession.voice_enabled,
+            ChatSession.video_enabled,
+            message_count.label("message_count")
+        )
+        .where(ChatSession.user_id == user_id)
+        .order_by(ChatSession.start_time.desc(), ChatSession.id.desc())
+        .limit(limit + 1)
+    )
+    if cursor:
+        query = query.where(tuple_(ChatSession.start_time, ChatSession.id) < tuple_(*decode_cursor(cursor)))
+
+    rows = (await db.execute(query)).all()
+    page = rows[:limit]
+    return {
+        "sessions": [
+            {
+                "id": row.id,
+                "start_time": row.start_time.isoformat() if row.start_time else None,
+                "end_time": row.end_time.isoformat() if row.end_time else None,
+                "message_count": row.message_count,
+                "voice_enabled": row.voice_enabled,
+                "video_enabled": row.video_enabled,
+                "active": row.end_time is None,
+            }
+            for row in page
+        ],
+        "next_cursor": encode_cursor(page[-1].start_time, page[-1].id) if len(rows) > limit else None,
+    }
+
+
+async def stream_transcript(
+    session_factory: Callable[[], AsyncSession],
+    session_id: str,
+    page_size: int = 200
+) -> AsyncIterator[str]:
+    """
+    Transcrierea ca NDJSON (un mesaj pe linie), citită pagină cu pagină.
+
+    Fiecare pagină folosește o sesiune DB scurtă, astfel încât un client lent
+    nu ține o conexiune din pool ocupată. Sesiunile de dinaintea tabelului
+    chat_messages sunt citite din coloana transcript.
+    """
+    after = -1
+    while True:
+        async with session_factory() as db:
+            messages = await fetch_messages(db, session_id, after, page_size)
+            if after < 0 and not messages:
+                legacy = await db.scalar(select(ChatSession.transcript).where(ChatSession.id == session_id))
+                for message in json.loads(legacy or "[]"):
+                    yield json.dumps(message, ensure_ascii=False) + "\n"
+                return
+        for message in messages:
+            yield json.dumps(message, ensure_ascii=False) + "\n"
+        if len(messages) < page_size:
+            return
+        after = messages[-1]["seq"]
+
+
+def create_transcript_writer(session_factory: Callable[[], AsyncSession]) -> TranscriptWriter:
+    """TRANSCRIPT_BATCH_SIZE mesaje sau TRANSCRIPT_FLUSH_MS milisecunde, oricare vine primul."""
+    return TranscriptWriter(
+        session_factory,
+        batch_size=int(os.getenv("TRANSCRIPT_BATCH_SIZE", "20")),
+        flush_interval=float(os.getenv("TRANSCRIPT_FLUSH_MS", "500")) / 1000
+    )
@@ -0,0 +1,139 @@
+from typing import Dict, Any, Optional, Callable, Tuple
+from collections import OrderedDict
+from pathlib import Path
+import os
+import json
+import hashlib
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+class TTSCache:
+    """
+    Content-addressed cache of synthesized speech, stored as audio files.
+
+    The file name is the SHA-256 of (text, voice, model, settings), so the same
+    phrase with the same voice is synthesized once and then served as a static
+    file from `url_prefix`. Total size is bounded by `max_bytes`; the least
+    recently used files are deleted first. Recency survives restarts through
+    the file mtimes.
+    """
+
+    def __init__(self, directory: str, max_bytes: int, url_prefix: str, extension: str = "mp3"):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.url_prefix = url_prefix.rstrip("/")
+        self.extension = extension
+        self._lock = threading.Lock()
+        # cheie -> (dimensiune, extensie); providerii pot produce mp3 sau wav
+        self._entries: "OrderedDict[str, Tuple[int, str]]" = OrderedDict()
+        self._size = 0
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0}
+
+        # Fișierele existente, de la cel mai vechi la cel mai recent folosit
+        files = sorted(
+            (p for p in self.directory.iterdir() if p.suffix in (".mp3", ".wav", ".ogg")),
+            key=lambda p: p.stat().st_mtime
+        )
+        for path in files:
+            size = path.stat().st_size
+            self._entries[path.stem] = (size, path.suffix[1:])
+            self._size += size
+        self._evict()
+
+    @staticmethod
+    def make_key(text: str, voice: str, model: str, settings: Optional[Dict[str, Any]] = None) -> str:
+        payload = json.dumps([text, voice, model, settings or {}], sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _extension(self, key: str) -> str:
+        entry = self._entries.get(key)
+        return entry[1] if entry else self.extension
+
+    def path_for(self, key: str, extension: str = None) -> Path:
+        return self.directory / f"{key}.{extension or self._extension(key)}"
+
+    def url_for(self, key: str) -> str:
+        return f"{self.url_prefix}/{key}.{self._extension(key)}"
+
+    def get(self, key: str) -> Optional[Path]:
+        with self._lock:
+            if key not in self._entries:
+                self.stats["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self.stats["hits"] += 1
+        path = self.path_for(key)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            # Șters din afară; îl tratăm ca miss
+            with self._lock:
+                self._size -= self._entries.pop(key, (0, ""))[0]
+                self.stats["hits"] -= 1
+                self.stats["misses"] += 1
+            return None
+        return path
+
+    def put(self, key: str, audio: bytes, extension: str = None) -> Path:
+        extension = extension or self.extension
+        path = self.path_for(key, extension)
+        tmp_path = path.with_suffix(f".{threading.get_ident()}.tmp")
+        tmp_path.write_bytes(audio)
+        os.replace(tmp_path, path)
+        with self._lock:
+            size, old_extension = self._entries.pop(key, (0, extension))
+            self._size += len(audio) - size
+            self._entries[key] = (len(audio), extension)
+            self._evict()
+        if old_extension != extension:
+            self.path_for(key, old_extension).unlink(missing_ok=True)
+        return path
+
+    def _evict(self) -> None:
+        while self._size > self.max_bytes and len(self._entries) > 1:
+            key, (size, extension) = self._entries.popitem(last=False)
+            self._size -= size
+            self.stats["evictions"] += 1
+            try:
+                self.path_for(key, extension).unlink()
+            except FileNotFoundError:
+                pass
+
+    def get_or_create(self, key: str, synthesize: Callable[[], bytes]) -> Path:
+        """Întoarce fișierul din cache sau îl sintetizează și îl salvează."""
+        path = self.get(key)
+        if path is not None:
+            return path
+        return self.put(key, synthesize())
+
+    def get_stats(self) -> Dict[str, Any]:
+        lookups = self.stats["hits"] + self.stats["misses"]
+        with self._lock:
+            entries, size = len(self._entries), self._size
+        return {
+            **self.stats,
+            "hit_rate": round(self.stats["hits"] / lookups, 3) if lookups else 0.0,
+            "entries": entries,
+            "size_bytes": size,
+            "max_bytes": self.max_bytes,
+        }
+
+
+_cache: Optional[TTSCache] = None
+
+
+def get_tts_cache() -> TTSCache:
+    """Cache-ul TTS partajat (TTS_CACHE_DIR, TTS_CACHE_MAX_MB), servit din /static."""
+    global _cache
+    if _cache is None:
+        directory = os.getenv("TTS_CACHE_DIR", "static/audio/tts")
+        _cache = TTSCache(
+            directory,
+            max_bytes=int(float(os.getenv("TTS_CACHE_MAX_MB", "200")) * 1024 * 1024),
+            url_prefix="/" + Path(directory).as_posix().strip("/")
+        )
+    return _cache
@@ -0,0 +1,283 @@
+from typing import Dict, Any, Optional, List
+from dataclasses import dataclass
+import io
+import os
+import time
+import wave
+import asyncio
+import logging
+import httpx
+
+logger = logging.getLogger(__name__)
+
+
+class TTSUnavailable(Exception):
+    """Niciun provider TTS nu a putut sintetiza textul."""
+
+
+@dataclass
+class SynthesisResult:
+    audio: bytes
+    extension: str
+    provider: str
+    voice: str
+    model: str
+
+
+class CircuitBreaker:
+    """
+    Closed -> open after `failure_threshold` consecutive failures; after
+    `reset_timeout` seconds one trial request is let through (half-open), and
+    its outcome closes or re-opens the circuit.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._trial_in_flight = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half-open"
+        return "open"
+
+    def allow(self) -> bool:
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "half-open" and not self._trial_in_flight:
+            self._trial_in_flight = True
+            return True
+        return False
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self.opened_at = None
+        self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        self._trial_in_flight = False
+        if self.opened_at is not None or self.failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
+
+
+class TTSProvider:
+    """
+    Base class for async TTS backends.
+
+    Each provider has its own concurrency limit, timeout and circuit breaker.
+    Subclasses implement `_synthesize`.
+    """
+
+    name = "base"
+    extension = "mp3"
+
+    def __init__(self, max_concurrency: int = 4, timeout: float = 10.0, breaker: CircuitBreaker = None):
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.breaker = breaker or CircuitBreaker()
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self.stats = {"requests": 0, "failures": 0, "rejected": 0, "total_seconds": 0.0}
+
+    @property
+    def available(self) -> bool:
+        return self.breaker.state != "open"
+
+    def model_for(self, voice: str) -> str:
+        return self.name
+
+    async def _synthesize(self, text: str, voice: str) -> bytes:
+        raise NotImplementedError
+
+    async def synthesize(self, text: str, voice: str) -> SynthesisResult:
+        if not self.breaker.allow():
+            self.stats["rejected"] += 1
+            raise TTSUnavailable(f"{self.name}: circuit open")
+        self.stats["requests"] += 1
+        start = time.monotonic()
+        try:
+            async with self._semaphore:
+                audio = await asyncio.wait_for(self._synthesize(text, voice), self.timeout)
+        except asyncio.CancelledError:
+            # Pierdut la hedging: nu este o eroare a providerului
+            self.breaker._trial_in_flight = False
+            raise
+        except Exception as e:
+            self.stats["failures"] += 1
+            self.breaker.record_failure()
+            raise TTSUnavailable(f"{self.name}: {str(e) or type(e).__name__}") from e
+        finally:
+            self.stats["total_seconds"] += time.monotonic() - start
+        self.breaker.record_success()
+        return SynthesisResult(audio, self.extension, self.name, voice, self.model_for(voice))
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {**self.stats, "state": self.breaker.state, "total_seconds": round(self.stats["total_seconds"], 3)}
+
+    async def aclose(self) -> None:
+        pass
+
+
+class ElevenLabsProvider(TTSProvider):
+    """
+    ElevenLabs REST API over a shared httpx.AsyncClient (keep-alive pool).
+
+    `base_url` can point at a local stand-in server for tests.
+    """
+
+    name = "elevenlabs"
+    extension = "mp3"
+
+    def __init__(
+        self,
+        api_key: str,
+        model: str = "eleven_multilingual_v2",
+        settings: Dict[str, Any] = None,
+        base_url: str = "https://api.elevenlabs.io",
+        voice_ids: Dict[str, str] = None,
+        **options
+    ):
+        super().__init__(**options)
+        self.model = model
+        self.settings = settings or {"stability": 0.5, "similarity_boost": 0.75}
+        # Numele vocilor premade -> ID-uri (API-ul REST cere ID-ul)
+        self.voice_ids = {"Rachel": "21m00Tcm4TlvDq8ikWAM", **(voice_ids or {})}
+        self.client = httpx.AsyncClient(
+            base_url=base_url,
+            headers={"xi-api-key": api_key or ""},
+            limits=httpx.Limits(max_connections=self.max_concurrency, max_keepalive_connections=self.max_concurrency),
+            timeout=httpx.Timeout(self.timeout, connect=min(self.timeout, 3.0))
+        )
+
+    def model_for(self, voice: str) -> str:
+        return self.model
+
+    async def _synthesize(self, text: str, voice: str) -> bytes:
+        response = await self.client.post(
+            f"/v1/text-to-speech/{self.voice_ids.get(voice, voice)}",
+            json={"text": text, "model_id": self.model, "voice_settings": self.settings},
+            headers={"Accept": "audio/mpeg"}
+        )
+        response.raise_for_status()
+        return response.content
+
+    async def aclose(self) -> None:
+        await self.client.aclose()
+
+
+class PiperProvider(TTSProvider):
+    """Sinteză locală, offline, cu Piper (model ONNX încărcat o dată); produce WAV."""
+
+    name = "piper"
+    extension = "wav"
+
+    def __init__(self, model_path: str, **options):
+        super().__init__(**options)
+        from piper import PiperVoice
+        logger.info(f"Loading Piper voice from {model_path}...")
+        self.voice = PiperVoice.load(model_path)
+        self.model = os.path.basename(model_path)
+
+    def model_for(self, voice: str) -> str:
+        return self.model
+
+    def _render(self, text: str) -> bytes:
+        buffer = io.BytesIO()
+        with wave.open(buffer, "wb") as wav:
+            self.voice.synthesize(text, wav)
+        return buffer.getvalue()
+
+    async def _synthesize(self, text: str, voice: str) -> bytes:
+        return await asyncio.to_thread(self._render, text)
+
+
+class TTSRouter:
+    """
+    Routes synthesis to a primary provider, with a local fallback.
+
+    If the primary has not answered within `hedge_delay` seconds, the same text
+    is also sent to the fallback, and whichever finishes first wins (the other
+    is cancelled). When the primary fails, or its circuit is open, the fallback
+    is used directly. If the caller is cancelled, every pending synthesis is
+    cancelled and awaited before the cancellation propagates.
+    """
+
+    def __init__(self, primary: TTSProvider, fallback: Optional[TTSProvider] = None, hedge_delay: float = 1.5):
+        self.primary = primary
+        self.fallback = fallback
+        self.hedge_delay = hedge_delay
+        self.stats = {"hedged": 0, "fallback_wins": 0}
+
+    @property
+    def providers(self) -> List[TTSProvider]:
+        return [p for p in (self.primary, self.fallback) if p is not None]
+
+    async def synthesize(self, text: str, voice: str) -> SynthesisResult:
+        if self.fallback is None:
+            return await self.primary.synthesize(text, voice)
+        if not self.primary.available:
+            self.stats["fallback_wins"] += 1
+            return await self.fallback.synthesize(text, voice)
+
+        primary = asyncio.create_task(self.primary.synthesize(text, voice))
+        tasks, errors = {primary}, []
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=self.hedge_delay)
+            if done and not primary.exception():
+                return primary.result()
+            if done:
+                tasks, errors = set(), [primary.exception()]
+            else:
+                self.stats["hedged"] += 1
+            tasks.add(asyncio.create_task(self.fallback.synthesize(text, voice)))
+            # Primul rezultat reușit câștigă
+            while tasks:
+                done, tasks = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        result = task.result()
+                        if result.provider != self.primary.name:
+                            self.stats["fallback_wins"] += 1
+                        return result
+                    errors.append(task.exception())
+        finally:
+            # Și când apelantul este anulat: nicio sinteză nu rămâne orfană
+            for task in tasks:
+                task.cancel()
+            if tasks:
+                await asyncio.gather(*tasks, return_exceptions=True)
+        raise TTSUnavailable("; ".join(str(e) for e in errors))
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {**self.stats, "providers": {p.name: p.get_stats() for p in self.providers}}
+
+    async def aclose(self) -> None:
+        for provider in self.providers:
+            await provider.aclose()
+
+
+def create_tts_router(api_key: str) -> TTSRouter:
+    """
+    Providerii din env: ElevenLabs (ELEVENLABS_BASE_URL, TTS_CONCURRENCY, TTS_TIMEOUT)
+    și, dacă TTS_PIPER_MODEL este setat, Piper local ca fallback (TTS_HEDGE_DELAY).
+    """
+    primary = ElevenLabsProvider(
+        api_key,
+        base_url=os.getenv("ELEVENLABS_BASE_URL", "https://api.elevenlabs.io"),
+        max_concurrency=int(os.getenv("TTS_CONCURRENCY", "4")),
+        timeout=float(os.getenv("TTS_TIMEOUT", "10"))
+    )
+    fallback = None
+    piper_model = os.getenv("TTS_PIPER_MODEL")
+    if piper_model:
+        try:
+            fallback = PiperProvider(piper_model, max_concurrency=int(os.getenv("TTS_LOCAL_CONCURRENCY", "2")))
+        except Exception as e:
+            logger.warning(f"Local TTS fallback unavailable: {str(e)}")
+    return TTSRouter(primary, fallback, hedge_delay=float(os.getenv("TTS_HEDGE_DELAY", "1.5")))
@@ -0,0 +1,167 @@
+from typing import List, Tuple
+from collections import deque
+import os
+import numpy as np
+
+
+def frame_energy_db(frame: np.ndarray) -> float:
+    """Energia RMS a unui cadru int16, în dBFS."""
+    if not len(frame):
+        return -120.0
+    rms = np.sqrt(np.mean(np.square(frame.astype(np.float32) / 32768.0)))
+    return float(20 * np.log10(max(rms, 1e-6)))
+
+
+def frames_energy_db(frames: np.ndarray) -> np.ndarray:
+    """Energia (dBFS) pentru o matrice de cadre (n_frames, frame_len), vectorizat."""
+    rms = np.sqrt(np.mean(np.square(frames.astype(np.float32) / 32768.0), axis=1))
+    return 20 * np.log10(np.maximum(rms, 1e-6))
+
+
+class EnergyVAD:
+    """
+    Frame-level voice activity detector based on RMS energy.
+
+    A frame is speech when its energy is `margin_db` above the tracked noise
+    floor and above `min_speech_db`. The noise floor follows quiet frames
+    quickly and loud frames slowly, so it adapts to the room without locking
+    onto the speaker. It is also never below the `floor_percentile` of the
+    last `history_frames` energies: steady noise louder than the initial floor
+    is otherwise classified as one endless speech run, because the slow rate
+    never catches up with it.
+    """
+
+    name = "energy"
+
+    def __init__(
+        self,
+        margin_db: float = 12.0,
+        min_speech_db: float = -45.0,
+        initial_noise_db: float = -60.0,
+        history_frames: int = 100,
+        floor_percentile: float = 10.0,
+        min_history_frames: int = 25
+    ):
+        self.margin_db = margin_db
+        self.min_speech_db = min_speech_db
+        self.noise_db = initial_noise_db
+        self.floor_percentile = floor_percentile
+        self.min_history_frames = min_history_frames
+        self._history = deque(maxlen=history_frames)
+
+    def _update(self, energy: float) -> bool:
+        self._history.append(energy)
+        if len(self._history) >= self.min_history_frames:
+            # Chiar și vorbirea continuă are pauze între silabe; dacă nici
+            # cele mai liniștite cadre recente nu coboară sub prag, e zgomot
+            self.noise_db = max(self.noise_db, float(np.percentile(self._history, self.floor_percentile)))
+        speech = energy > self.noise_db + self.margin_db and energy > self.min_speech_db
+        # Adaptare asimetrică a pragului de zgomot
+        rate = 0.001 if speech else 0.1
+        self.noise_db += rate * (min(energy, self.noise_db + self.margin_db) - self.noise_db)
+        return speech
+
+    def is_speech(self, frame: np.ndarray) -> bool:
+        return self._update(frame_energy_db(frame))
+
+    def classify(self, frames: np.ndarray, sample_rate: int) -> np.ndarray:
+        """Clasifică toate cadrele deodată; energia se calculează vectorizat."""
+        return np.array([self._update(float(energy)) for energy in frames_energy_db(frames)], dtype=bool)
+
+
+class WebRTCVAD:
+    """VAD-ul din WebRTC (pachetul webrtcvad); cere cadre de 10/20/30 ms la 8/16/32/48 kHz."""
+
+    name = "webrtc"
+
+    def __init__(self, aggressiveness: int = 2):
+        import webrtcvad
+        self.vad = webrtcvad.Vad(aggressiveness)
+
+    def classify(self, frames: np.ndarray, sample_rate: int) -> np.ndarray:
+        return np.array([self.vad.is_speech(frame.tobytes(), sample_rate) for frame in frames], dtype=bool)
+
+
+def create_vad(backend: str = None):
+    """VAD selectat prin VAD_BACKEND: "energy" (default) sau "webrtc"."""
+    backend = backend or os.getenv("VAD_BACKEND", "energy")
+    if backend == "energy":
+        return EnergyVAD()
+    if backend == "webrtc":
+        return WebRTCVAD(int(os.getenv("VAD_AGGRESSIVENESS", "2")))
+    raise ValueError(f"Unknown VAD backend: {backend}")
+
+
+def speech_regions(
+    samples: np.ndarray,
+    sample_rate: int,
+    vad=None,
+    frame_ms: int = 30,
+    min_silence_ms: int = 400,
+    min_speech_ms: int = 150,
+    padding_ms: int = 150
+) -> List[Tuple[int, int]]:
+    """
+    Find speech regions in a mono int16 signal.
+
+    Returns (start, end) sample offsets. Pauses shorter than `min_silence_ms`
+    are bridged, bursts shorter than `min_speech_ms` are dropped, and each
+    region is padded by `padding_ms` so word onsets and tails are kept.
+    """
+    frame_len = sample_rate * frame_ms // 1000
+    n_frames = len(samples) // frame_len
+    if not n_frames:
+        return []
+
+    frames = samples[:n_frames * frame_len].reshape(n_frames, frame_len)
+    flags = (vad or EnergyVAD()).classify(frames, sample_rate)
+
+    # Tranziții tăcere <-> vorbire
+    edges = np.diff(np.concatenate(([0], flags.astype(np.int8), [0])))
+    starts = np.flatnonzero(edges == 1)
+    ends = np.flatnonzero(edges == -1)
+
+    max_gap = min_silence_ms // frame_ms
+    merged: List[List[int]] = []
+    for start, end in zip(starts, ends):
+        if merged and start - merged[-1][1] < max_gap:
+            merged[-1][1] = end
+        else:
+            merged.append([start, end])
+
+    min_frames = max(1, min_speech_ms // frame_ms)
+    padding = sample_rate * padding_ms // 1000
+    regions = []
+    for start, end in merged:
+        if end - start < min_frames:
+            continue
+        regions.append((max(0, start * frame_len - padding), min(len(samples), end * frame_len + padding)))
+    return regions
+
+
+def split_utterances(
+    samples: np.ndarray,
+    sample_rate: int,
+    vad=None,
+    max_utterance_s: float = 15.0,
+    **options
+) -> List[np.ndarray]:
+    """
+    Cut a recording into speech-only utterances (views, no copies).
+
+    Regions longer than `max_utterance_s` are split at the quietest 30 ms frame
+    in the last fifth of the window, so cuts land in pauses rather than words.
+    """
+    max_len = int(max_utterance_s * sample_rate)
+    frame_len = sample_rate * 30 // 1000
+    utterances = []
+    for start, end in speech_regions(samples, sample_rate, vad, **options):
+        while end - start > max_len:
+            window_start = start + max_len * 4 // 5
+            n_frames = (start + max_len - window_start) // frame_len
+            window = samples[window_start:window_start + n_frames * frame_len].reshape(n_frames, frame_len)
+            cut = window_start + int(np.argmin(frames_energy_db(window))) * frame_len + frame_len // 2
+            utterances.append(samples[start:cut])
+            start = cut
+        utterances.append(samples[start:end])
+    return utterances
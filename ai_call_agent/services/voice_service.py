@@ -1,20 +1,64 @@
 from elevenlabs import generate, VoiceSettings
+from .tts_cache import TTSCache, get_tts_cache
+from .tts_providers import TTSRouter, create_tts_router
 
 class VoiceService:
-    def __init__(self, api_key: str):
+    MODEL = "eleven_multilingual_v2"
+    SETTINGS = {"stability": 0.5, "similarity_boost": 0.75}
+
+    def __init__(self, api_key: str, cache: TTSCache = None, router: TTSRouter = None):
         self.api_key = api_key
-        
-    def generate_voice(self, text: str, voice_id: str = "Rachel"):
+        self.cache = cache or get_tts_cache()
+        self.router = router or create_tts_router(api_key)
+
+    def cache_key(self, text: str, voice_id: str = "Rachel", model: str = None) -> str:
+        settings = self.SETTINGS if model in (None, self.MODEL) else None
+        return self.cache.make_key(text, voice_id, model or self.MODEL, settings)
+
+    async def synthesize_file(self, text: str, voice_id: str = "Rachel"):
+        """
+        Fișierul audio din cache; la miss se sintetizează prin router (pool HTTP,
+        circuit breaker, fallback local). Rezultatele fallback-ului se salvează
+        sub cheia lor, așa că vocea principală le înlocuiește la următorul miss.
+        """
+        key = self.cache_key(text, voice_id)
+        path = self.cache.get(key)
+        if path is not None:
+            return path
+        result = await self.router.synthesize(text, voice_id)
+        if result.provider != self.router.primary.name:
+            key = self.cache_key(text, result.voice, result.model)
+        return self.cache.put(key, result.audio, result.extension)
+
+    async def synthesize_url(self, text: str, voice_id: str = "Rachel") -> str:
+        """URL-ul /static al fișierului audio, pentru client."""
+        path = await self.synthesize_file(text, voice_id)
+        return self.cache.url_for(path.stem)
+
+    async def aclose(self) -> None:
+        await self.router.aclose()
+
+    def _synthesize(self, text: str, voice_id: str) -> bytes:
+        audio = generate(
+            text=text,
+            voice=voice_id,
+            model=self.MODEL,
+            voice_settings=VoiceSettings(**self.SETTINGS)
+        )
+        return audio if isinstance(audio, bytes) else b"".join(audio)
+
+    def generate_voice_file(self, text: str, voice_id: str = "Rachel"):
+        """Variantă sincronă (SDK ElevenLabs), pentru codul care nu rulează pe event loop."""
         try:
-            audio = generate(
-                text=text,
-                voice=voice_id,
-                model="eleven_multilingual_v2",
-                voice_settings=VoiceSettings(
-                    stability=0.5,
-                    similarity_boost=0.75
-                )
+            return self.cache.get_or_create(
+                self.cache_key(text, voice_id),
+                lambda: self._synthesize(text, voice_id)
             )
-            return audio
         except Exception as e:
-            raise Exception(f"Error generating voice: {str(e)}") 
\ No newline at end of file
+            raise Exception(f"Error generating voice: {str(e)}")
+
+    def generate_voice_url(self, text: str, voice_id: str = "Rachel") -> str:
+        return self.cache.url_for(self.generate_voice_file(text, voice_id).stem)
+
+    def generate_voice(self, text: str, voice_id: str = "Rachel"):
+        return self.generate_voice_file(text, voice_id).read_bytes()
@@ -0,0 +1,193 @@
+from typing import Dict, Any, List, Optional, Callable, Awaitable
+from collections import deque
+import asyncio
+import logging
+import numpy as np
+from .stt_engines import STTEngine, encode_wav
+from .stt_service import STTWorkerPool, STTPoolSaturated
+from .vad import EnergyVAD
+
+logger = logging.getLogger(__name__)
+
+EventCallback = Callable[[Dict[str, Any]], Awaitable[None]]
+
+
+class OpusFrameDecoder:
+    """Decodor Opus per cadru (opuslib, opțional)."""
+
+    def __init__(self, sample_rate: int, frame_ms: int):
+        import opuslib
+        self.decoder = opuslib.Decoder(sample_rate, 1)
+        self.frame_size = sample_rate * frame_ms // 1000
+
+    def decode(self, packet: bytes) -> bytes:
+        return self.decoder.decode(packet, self.frame_size)
+
+
+class StreamingTranscriber:
+    """
+    Turns a stream of short PCM frames into partial and final transcripts.
+
+    Each 16-bit mono frame (20 ms by default) is classified by the VAD. Speech
+    frames, plus a short pre-roll, are appended to the current utterance.
+    While the user speaks, the utterance so far is re-transcribed every
+    `partial_interval_ms` (one partial in flight at a time). After
+    `end_silence_ms` of silence the utterance is closed and transcribed once
+    more as final. Finals are delivered in order through `on_event`.
+    """
+
+    def __init__(
+        self,
+        engine: STTEngine,
+        pool: STTWorkerPool,
+        on_event: EventCallback,
+        sample_rate: int = 16000,
+        frame_ms: int = 20,
+        end_silence_ms: int = 300,
+        partial_interval_ms: int = 600,
+        pre_roll_ms: int = 200,
+        min_speech_ms: int = 200,
+        max_utterance_ms: int = 30000,
+        partials: bool = True
+    ):
+        self.engine = engine
+        self.pool = pool
+        self.on_event = on_event
+        self.end_silence_ms = end_silence_ms
+        self.partial_interval_ms = partial_interval_ms
+        self.min_speech_ms = min_speech_ms
+        self.max_utterance_ms = max_utterance_ms
+        self.partials = partials
+        self.pre_roll_ms = pre_roll_ms
+        self.configure(sample_rate, frame_ms)
+        self._frames: List[np.ndarray] = []
+        self._speech_ms = 0
+        self._silence_ms = 0
+        self._since_partial_ms = 0
+        self._utterance_id = 0
+        self._partial_task: Optional[asyncio.Task] = None
+        self._final_lock = asyncio.Lock()
+        self._tasks = set()
+
+    def configure(self, sample_rate: int, frame_ms: int) -> None:
+        """Setează formatul cadrelor; pre-roll-ul și VAD-ul se refac pentru noua durată a cadrului."""
+        self.sample_rate = sample_rate
+        self.frame_ms = frame_ms
+        self.vad = EnergyVAD()
+        self._pre_roll = deque(maxlen=max(1, self.pre_roll_ms // frame_ms))
+
+    @property
+    def in_utterance(self) -> bool:
+        return bool(self._frames)
+
+    def _spawn(self, coro) -> asyncio.Task:
+        task = asyncio.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    async def _transcribe(self, samples: np.ndarray) -> str:
+        return await self.pool.submit(self.engine.transcribe, encode_wav(samples, self.sample_rate))
+
+    def feed(self, pcm: bytes) -> None:
+        """Procesează un cadru PCM int16; nu blochează (transcrierile rulează în fundal)."""
+        if len(pcm) % 2:
+            # Cadrele vin ca mesaje separate: octetul în plus se aruncă, fără să
+            # decaleze eșantioanele cadrelor următoare
+            self._spawn(self.on_event({"type": "error", "code": 400, "message": "PCM frame has an odd number of bytes"}))
+            pcm = pcm[:-1]
+            if not pcm:
+                return
+        frame = np.frombuffer(pcm, dtype=np.int16)
+        speech = self.vad.is_speech(frame)
+
+        if not self.in_utterance:
+            if speech:
+                self._frames = list(self._pre_roll) + [frame]
+                self._speech_ms = self.frame_ms
+                self._silence_ms = 0
+                self._since_partial_ms = 0
+                self._utterance_id += 1
+                self._pre_roll.clear()
+            else:
+                self._pre_roll.append(frame)
+            return
+
+        self._frames.append(frame)
+        if speech:
+            self._speech_ms += self.frame_ms
+            self._silence_ms = 0
+        else:
+            self._silence_ms += self.frame_ms
+        self._since_partial_ms += self.frame_ms
+
+        utterance_ms = len(self._frames) * self.frame_ms
+        if self._silence_ms >= self.end_silence_ms or utterance_ms >= self.max_utterance_ms:
+            self._end_utterance()
+        elif (
+            self.partials
+            and self._since_partial_ms >= self.partial_interval_ms
+            and (self._partial_task is None or self._partial_task.done())
+        ):
+            self._since_partial_ms = 0
+            self._partial_task = self._spawn(
+                self._emit_partial(self._utterance_id, np.concatenate(self._frames))
+            )
+
+    def _end_utterance(self) -> None:
+        frames, speech_ms = self._frames, self._speech_ms
+        self._frames = []
+        self._speech_ms = 0
+        if self._partial_task and not self._partial_task.done():
+            self._partial_task.cancel()
+        if speech_ms < self.min_speech_ms:
+            # Zgomot scurt (click, tuse), nu o frază
+            return
+        self._spawn(self._emit_final(self._utterance_id, np.concatenate(frames)))
+
+    async def _emit_partial(self, utterance_id: int, samples: np.ndarray) -> None:
+        try:
+            text = await self._transcribe(samples)
+        except (STTPoolSaturated, asyncio.TimeoutError):
+            return  # partialele sunt opționale
+        except Exception as e:
+            logger.warning(f"Partial transcription failed: {str(e)}")
+            return
+        if text and utterance_id == self._utterance_id and self.in_utterance:
+            await self.on_event({"type": "transcript", "final": False, "utterance": utterance_id, "content": text})
+
+    async def _emit_final(self, utterance_id: int, samples: np.ndarray) -> None:
+        # Lock-ul asyncio e FIFO, deci finalele ajung în ordinea frazelor
+        async with self._final_lock:
+            try:
+                text = await self._transcribe(samples)
+            except STTPoolSaturated as e:
+                await self.on_event({"type": "error", "code": 429, "utterance": utterance_id, "message": str(e)})
+                return
+            except asyncio.TimeoutError:
+                await self.on_event({"type": "error", "code": 504, "utterance": utterance_id, "message": "Speech recognition timed out"})
+                return
+            except Exception as e:
+                logger.error(f"Final transcription failed: {str(e)}")
+                await self.on_event({"type": "error", "code": 500, "utterance": utterance_id, "message": str(e)})
+                return
+            await self.on_event({
+                "type": "transcript",
+                "final": True,
+                "utterance": utterance_id,
+                "content": text,
+                "duration": round(len(samples) / self.sample_rate, 2)
+            })
+
+    async def flush(self) -> None:
+        """Închide fraza în curs și așteaptă toate transcrierile."""
+        if self.in_utterance:
+            self._end_utterance()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    async def close(self) -> None:
+        for task in list(self._tasks):
+            task.cancel()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
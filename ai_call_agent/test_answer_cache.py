@@ -0,0 +1,36 @@
+import asyncio
+import os
+import tempfile
+from ai_call_agent.services.answer_cache import AnswerCache, MemoryCacheBackend, SQLiteCacheBackend
+
+
+async def check_backend(backend):
+    cache = AnswerCache(backend, local_size=2)
+    key = AnswerCache.make_key("rag", "Ce documente îmi trebuie?", "corpus-1", "prompt-1")
+
+    assert await cache.get(key) is None
+    await cache.set(key, {"text": "Pașaport și diplomă.", "source": "RAG"})
+
+    # Aceeași întrebare, altă formă: fără diacritice, majuscule, spații
+    same_key = AnswerCache.make_key("rag", "  ce DOCUMENTE imi trebuie ", "corpus-1", "prompt-1")
+    assert same_key == key
+    assert (await cache.get(same_key))["text"] == "Pașaport și diplomă."
+
+    # Un alt worker (LRU local gol) găsește răspunsul în backend-ul partajat
+    other_worker = AnswerCache(backend)
+    assert (await other_worker.get(key))["source"] == "RAG"
+    assert other_worker.stats["shared_hits"] == 1
+
+    # Schimbarea corpusului schimbă cheia
+    assert AnswerCache.make_key("rag", "ce documente imi trebuie", "corpus-2", "prompt-1") != key
+    print(f"{type(backend).__name__}: {cache.get_stats()}")
+
+
+def test_answer_cache():
+    asyncio.run(check_backend(MemoryCacheBackend()))
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        asyncio.run(check_backend(SQLiteCacheBackend(os.path.join(tmp_dir, "cache.sqlite3"))))
+
+
+if __name__ == "__main__":
+    test_answer_cache()
@@ -0,0 +1,102 @@
+import io
+import struct
+import asyncio
+import numpy as np
+from ai_call_agent.services.audio_decode import UnsupportedAudioFormat, decode_audio
+from ai_call_agent.services.audio_ingest import AudioTooLarge, NotWavError, read_wav_upload
+
+
+def make_wav(pcm: bytes, channels: int = 1, sample_rate: int = 16000, bits: int = 16, audio_format: int = 1) -> bytes:
+    block_align = channels * bits // 8
+    fmt = struct.pack("<HHIIHH", audio_format, channels, sample_rate, sample_rate * block_align, block_align, bits)
+    body = b"WAVE" + b"fmt " + struct.pack("<I", len(fmt)) + fmt + b"data" + struct.pack("<I", len(pcm)) + pcm
+    return b"RIFF" + struct.pack("<I", len(body)) + body
+
+
+def read(data: bytes, max_seconds: float = 10.0):
+    return asyncio.run(read_wav_upload(io.BytesIO(data), memoryview(bytearray(1024 * 1024)), max_seconds))
+
+
+def expect(exception, data: bytes):
+    try:
+        read(data)
+    except exception:
+        return
+    raise AssertionError(f"expected {exception.__name__}")
+
+
+def test_pcm16():
+    pcm = np.arange(-800, 800, dtype=np.int16)
+    samples, rate = read(make_wav(pcm.tobytes()))
+    assert rate == 16000 and np.array_equal(samples, pcm)
+
+    stereo = np.repeat(pcm, 2)
+    samples, _ = read(make_wav(stereo.tobytes(), channels=2))
+    assert np.array_equal(samples, pcm)
+
+
+def test_rejected_headers():
+    pcm = np.zeros(1600, dtype=np.int16).tobytes()
+    # 0 canale ar da bytes_per_second = 0 (ZeroDivisionError, deci 500)
+    expect(UnsupportedAudioFormat, make_wav(pcm, channels=0))
+    expect(UnsupportedAudioFormat, make_wav(pcm, sample_rate=0))
+
+    # WAV float: nici calea rapidă, nici modulul wave nu îl pot citi
+    floats = np.zeros(1600, dtype=np.float32).tobytes()
+    expect(UnsupportedAudioFormat, make_wav(floats, bits=32, audio_format=3))
+    try:
+        decode_audio(make_wav(floats, bits=32, audio_format=3))
+        raise AssertionError("expected UnsupportedAudioFormat")
+    except UnsupportedAudioFormat:
+        pass
+
+    # PCM pe 8 biți e un WAV valid, decodat pe calea generală
+    expect(NotWavError, make_wav(b"\x80" * 1600, bits=8))
+    assert len(decode_audio(make_wav(b"\x80" * 1600, bits=8))) == 1600
+
+
+def encode_av(fmt: str, video: bool = False) -> bytes:
+    import av
+    output = io.BytesIO()
+    with av.open(output, "w", format=fmt) as container:
+        if video:
+            stream = container.add_stream("libvpx", rate=10)
+            stream.width, stream.height, stream.pix_fmt = 32, 32, "yuv420p"
+            frame = av.VideoFrame.from_ndarray(np.zeros((32, 32, 3), dtype=np.uint8), format="rgb24")
+        else:
+            stream = container.add_stream("libopus", rate=48000)
+            stream.layout = "mono"
+            tone = (np.sin(np.arange(48000) / 10) * 8000).astype(np.int16).reshape(1, -1)
+            frame = av.AudioFrame.from_ndarray(tone, format="s16", layout="mono")
+            frame.sample_rate = 48000
+        for packet in stream.encode(frame):
+            container.mux(packet)
+        for packet in stream.encode(None):
+            container.mux(packet)
+    return output.getvalue()
+
+
+def test_compressed_uploads():
+    # Ce trimite MediaRecorder: ogg/opus (și webm/opus) trece prin PyAV
+    samples = decode_audio(encode_av("ogg"))
+    assert abs(len(samples) - 16000) < 1600, len(samples)
+
+    # Corupt sau fără pistă audio: 415, nu 500
+    for data in (b"\x1a\x45\xdf\xa3" + b"\x00" * 200, b"OggS" + b"\xff" * 200, encode_av("webm", video=True)):
+        try:
+            decode_audio(data)
+            raise AssertionError("expected UnsupportedAudioFormat")
+        except UnsupportedAudioFormat:
+            pass
+
+
+def test_too_long():
+    expect(AudioTooLarge, make_wav(np.zeros(16000 * 11, dtype=np.int16).tobytes()))
+
+
+if __name__ == "__main__":
+    test_pcm16()
+    test_rejected_headers()
+    test_compressed_uploads()
+    test_too_long()
+    print("OK")
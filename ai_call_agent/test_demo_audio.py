@@ -0,0 +1,80 @@
+import asyncio
+import tempfile
+from pathlib import Path
+from starlette.requests import Request
+from ai_call_agent.services.demo_audio import DemoAudio, parse_range
+
+
+class FakeVoiceService:
+    def __init__(self, directory):
+        self.directory = Path(directory)
+        self.calls = 0
+
+    async def synthesize_file(self, text):
+        self.calls += 1
+        path = self.directory / f"{abs(hash(text))}.mp3"
+        path.write_bytes(b"ID3" + text.encode("utf-8") * 50)
+        return path
+
+
+def request(headers=None):
+    raw = [(k.lower().encode(), v.encode()) for k, v in (headers or {}).items()]
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": raw})
+
+
+def test_demo_audio():
+    assert parse_range("bytes=0-9", 100) == (0, 9)
+    assert parse_range("bytes=90-", 100) == (90, 99)
+    assert parse_range("bytes=-10", 100) == (90, 99)
+    assert parse_range("bytes=100-", 100) is None
+
+    translations = {"en": {"greeting": "Hello!", "info_request": "Tell me more.", "service_info": "Of course!"}}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        voice = FakeVoiceService(tmp_dir)
+        demo = DemoAudio(voice, directory=f"{tmp_dir}/demo")
+        asyncio.run(demo.render(translations))
+        assert voice.calls == 3
+
+        # A doua pornire reîncarcă din manifest, fără sinteză
+        reloaded = DemoAudio(voice, directory=f"{tmp_dir}/demo")
+        asyncio.run(reloaded.render(translations))
+        assert voice.calls == 3
+
+        variant = reloaded.audio_for("en")["greeting"][0]
+        name = variant["url"].split("/demo-audio/", 1)[1]
+        full = reloaded.response(name, request())
+        assert full.status_code == 200 and len(full.body) == variant["size"]
+        etag = full.headers["etag"]
+
+        assert reloaded.response(name, request({"If-None-Match": etag})).status_code == 304
+        partial = reloaded.response(name, request({"Range": "bytes=0-9"}))
+        assert partial.status_code == 206 and partial.body == full.body[:10]
+        assert partial.headers["content-range"] == f"bytes 0-9/{variant['size']}"
+        # If-Range cu alt ETag: fișierul întreg
+        assert reloaded.response(name, request({"Range": "bytes=0-9", "If-Range": '"old"'})).status_code == 200
+        assert reloaded.response("en/missing.ogg", request()).status_code == 404
+
+
+class SlowVoiceService(FakeVoiceService):
+    async def synthesize_file(self, text):
+        await asyncio.sleep(10)
+
+
+async def check_stop_rendering(directory):
+    demo = DemoAudio(SlowVoiceService(directory), directory=f"{directory}/demo")
+    demo.start_rendering({"en": {"greeting": "Hi", "info_request": "More", "service_info": "Sure"}})
+    await asyncio.sleep(0.05)
+    # La oprire, generarea din fundal este anulată și așteptată
+    task = demo._render_task
+    await demo.stop_rendering()
+    assert task.cancelled() and demo._render_task is None
+
+
+def test_stop_rendering():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        asyncio.run(check_stop_rendering(tmp_dir))
+
+
+if __name__ == "__main__":
+    test_demo_audio()
+    test_stop_rendering()
@@ -0,0 +1,41 @@
+import asyncio
+import os
+import time
+from ai_call_agent.services.dialogflow_fake import FakeSessionsServer
+
+
+async def check_async_client():
+    server = FakeSessionsServer(intents={"hello": "greeting"}, delay=0.2, fail_first=1)
+    os.environ["DIALOGFLOW_ENDPOINT"] = await server.start()
+    os.environ.setdefault("GOOGLE_CLOUD_PROJECT", "test-project")
+    os.environ.setdefault("DIALOGFLOW_LOCATION", "global")
+    os.environ.setdefault("DIALOGFLOW_AGENT_ID", "test-agent")
+    from ai_call_agent.services.dialogflow_service import DialogflowService
+    service = DialogflowService()
+    try:
+        # Prima cerere eșuează cu UNAVAILABLE și este reîncercată
+        response = await service.get_response_async("hello", "session-0")
+        assert response["intent"] == "greeting", response
+        assert service.stats["retries"] == 1
+
+        # 20 de cereri concurente pe 2 canale: durează cât una, nu de 20 de ori mai mult
+        start = time.monotonic()
+        responses = await asyncio.gather(*(
+            service.get_response_async("hello", f"session-{i}") for i in range(20)
+        ))
+        elapsed = time.monotonic() - start
+        assert all(r["intent"] == "greeting" for r in responses)
+        assert server.max_active == 20, server.max_active
+        assert elapsed < 0.2 * 5, elapsed
+        print(f"20 concurrent calls in {elapsed:.2f}s; {service.get_stats()}")
+    finally:
+        await service.close()
+        await server.stop()
+
+
+def test_dialogflow_async():
+    asyncio.run(check_async_client())
+
+
+if __name__ == "__main__":
+    test_dialogflow_async()
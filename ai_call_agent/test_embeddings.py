@@ -0,0 +1,43 @@
+import asyncio
+from langchain_core.embeddings import DeterministicFakeEmbedding
+from ai_call_agent.services.embedding_service import EmbeddingScheduler
+
+
+class FlakyEmbeddings(DeterministicFakeEmbedding):
+    """Stub embedder care răspunde cu 429 la primele apeluri."""
+    failures: int = 2
+
+    async def aembed_documents(self, texts):
+        if self.failures > 0:
+            self.failures -= 1
+            raise RuntimeError("Error code: 429 - rate limit exceeded")
+        return self.embed_documents(texts)
+
+
+def test_embedding_scheduler():
+    embeddings = FlakyEmbeddings(size=16)
+    scheduler = EmbeddingScheduler(embeddings, max_concurrency=4, base_delay=0.01)
+    texts = [f"chunk {i}" for i in range(50)]
+
+    saved = {}
+    vectors = asyncio.run(scheduler.embed_documents(
+        texts,
+        batch_size=8,
+        on_batch=lambda index, batch: saved.__setitem__(index, batch)
+    ))
+
+    print(f"Embedded {len(vectors)} texts, stats: {scheduler.stats}")
+    assert len(vectors) == len(texts)
+    assert vectors == embeddings.embed_documents(texts)
+    assert scheduler.stats["rate_limited"] == 2
+
+    # Reluare: loturile deja salvate nu mai sunt trimise
+    resumed = EmbeddingScheduler(DeterministicFakeEmbedding(size=16))
+    asyncio.run(resumed.embed_documents(texts, batch_size=8, completed=saved))
+    print(f"Resumed run stats: {resumed.stats}")
+    assert resumed.stats["resumed"] == len(saved)
+    assert resumed.stats["batches"] == 0
+
+
+if __name__ == "__main__":
+    test_embedding_scheduler()
@@ -0,0 +1,38 @@
+from ai_call_agent.services.intent_matcher import AhoCorasick, IntentMatcher
+
+
+def test_aho_corasick():
+    automaton = AhoCorasick([("he", 1), ("she", 2), ("his", 3), ("hers", 4)])
+    matches = sorted((start, end, payload) for start, end, payload in automaton.iter_matches("ushers"))
+    print(f"Matches: {matches}")
+    assert matches == [(1, 4, 2), (2, 4, 1), (2, 6, 4)]
+
+
+def test_intent_matcher():
+    matcher = IntentMatcher()
+
+    routes = matcher.match("Care este POPULAȚIA globului?")
+    assert routes["standard_response"]["value"].startswith("According to World Population Review")
+
+    assert "stats" in matcher.match("How many students study in Hamburg?")
+    assert "comparison" in matcher.match("Compare Hamburg vs Berlin")
+    assert "rag_fallback" in matcher.match("Nu știu răspunsul.")
+    assert "rag_fallback" in matcher.match("nu stiu")
+
+    # whole_word: "pa" nu se potrivește în "pașaport"
+    assert "basic_intent" not in matcher.match("Am nevoie de pașaport")
+    assert matcher.match("Pa, mulțumesc!")["basic_intent"]["value"] == "farewell"
+    assert matcher.match("Bună ziua")["basic_intent"]["value"] == "greeting"
+    assert matcher.match("Hey there")["basic_intent"]["value"] == "greeting"
+    # whole_word și pentru salut: "hey" în "they"/"whey", "salut" în "salutar"
+    assert "basic_intent" not in matcher.match("what did they say")
+    assert "basic_intent" not in matcher.match("whey protein price")
+    assert "basic_intent" not in matcher.match("un efect salutar")
+    assert matcher.match("Salutare!")["basic_intent"]["value"] == "greeting"
+    assert "demo_intent" not in matcher.match("this is it")
+    print("Intent matcher OK")
+
+
+if __name__ == "__main__":
+    test_aho_corasick()
+    test_intent_matcher()
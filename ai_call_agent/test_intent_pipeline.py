@@ -0,0 +1,75 @@
+import asyncio
+import os
+from ai_call_agent.services.dialogflow_fake import FakeSessionsServer
+from ai_call_agent.services.answer_cache import AnswerCache
+from ai_call_agent.services.intent_matcher import get_intent_matcher
+from ai_call_agent.services.intent_pipeline import IntentPipeline, LocalIntentClassifier
+
+TRAINING_PHRASES = {
+    "check_balance": ["what is my balance", "how much money do I have", "show my account balance", "balance please"],
+    "opening_hours": ["when are you open", "what are your opening hours", "are you open on sunday", "opening times"],
+    "book_appointment": ["I want to book an appointment", "schedule a meeting", "book a visit", "make an appointment"],
+}
+RESPONSES = {
+    "en": {"greeting": "Hello!", "check_balance": "Your balance is in the app.", "opening_hours": "We are open 9 to 5."},
+}
+
+
+def test_classifier():
+    classifier = LocalIntentClassifier.train(TRAINING_PHRASES)
+    intent, confidence, margin = classifier.classify("what are the opening hours?")
+    assert intent == "opening_hours", (intent, confidence, margin)
+    intent, _, _ = classifier.classify("how much mony do i have")  # greșeală de tastare
+    assert intent == "check_balance"
+
+
+async def check_pipeline():
+    server = FakeSessionsServer(intents={"refund": "request_refund", "yes": "confirm"}, delay=0.05)
+    os.environ["DIALOGFLOW_ENDPOINT"] = await server.start()
+    os.environ.setdefault("GOOGLE_CLOUD_PROJECT", "test-project")
+    os.environ.setdefault("DIALOGFLOW_LOCATION", "global")
+    os.environ.setdefault("DIALOGFLOW_AGENT_ID", "test-agent")
+    from ai_call_agent.services.dialogflow_service import DialogflowService
+    dialogflow = DialogflowService()
+    pipeline = IntentPipeline(
+        dialogflow,
+        matcher=get_intent_matcher(),
+        classifier=LocalIntentClassifier.train(TRAINING_PHRASES),
+        responses=RESPONSES,
+        cache=AnswerCache(),
+        cacheable_intents=["request_refund"]
+    )
+    try:
+        assert (await pipeline.get_response("salut", "s1"))["source"] == "keywords"
+        response = await pipeline.get_response("when are you open?", "s1")
+        assert response["source"] == "classifier" and response["intent"] == "opening_hours", response
+        # Cuvântul-cheie dintr-o frază lungă nu decide intenția
+        response = await pipeline.get_response("hey I need a refund for my order", "s1")
+        assert response["source"] == "dialogflow", response
+
+        response = await pipeline.get_response("refund", "s1")
+        assert response["source"] == "dialogflow" and response["intent"] == "request_refund"
+        # Același text, în altă sesiune: din cache
+        response = await pipeline.get_response("Refund!", "s2")
+        assert response["source"] == "cache" and response["session_id"] == "s2", response
+        # Altă limbă: altă cheie
+        assert (await pipeline.get_response("refund", "s3", "ro"))["source"] == "dialogflow"
+        # "yes" depinde de pagina la care a ajuns fiecare sesiune: nu se pune în cache
+        assert (await pipeline.get_response("yes", "s1"))["source"] == "dialogflow"
+        assert (await pipeline.get_response("yes", "s2"))["source"] == "dialogflow"
+
+        stats = pipeline.get_stats()
+        assert stats["offload_ratio"] == 0.375, stats
+        print(stats)
+    finally:
+        await dialogflow.close()
+        await server.stop()
+
+
+def test_intent_pipeline():
+    asyncio.run(check_pipeline())
+
+
+if __name__ == "__main__":
+    test_classifier()
+    test_intent_pipeline()
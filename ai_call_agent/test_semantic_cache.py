@@ -0,0 +1,28 @@
+import time
+from ai_call_agent.services.semantic_cache import SemanticCache
+
+
+def test_stale_neighbours():
+    cache = SemanticCache(threshold=0.9, ttl=60)
+    # 20 întrebări aproape identice, expirate, și una validă puțin mai departe
+    for i in range(20):
+        cache.store(f"old {i}", [1.0, 0.001 * i, 0.0], {"text": f"old {i}"}, corpus_version="v1")
+    for entry in cache.entries.values():
+        entry["created"] = time.time() - 120
+    cache.store("fresh", [1.0, 0.2, 0.0], {"text": "fresh"}, corpus_version="v1")
+
+    result = cache.lookup([1.0, 0.0, 0.0], corpus_version="v1", candidates=4)
+    assert result and result["text"] == "fresh", result
+    # Toți vecinii expirați peste prag au fost eliminați, nu doar cel mai apropiat
+    assert [entry["query"] for entry in cache.entries.values()] == ["fresh"]
+    assert cache.index.ntotal == 1
+
+    # Altă versiune de corpus: intrarea e eliminată, rezultatul e un miss
+    assert cache.lookup([1.0, 0.0, 0.0], corpus_version="v2") is None
+    assert not cache.entries and cache.index.ntotal == 0
+    assert cache.lookup([1.0, 0.0, 0.0], corpus_version="v2") is None
+    print(cache.get_stats())
+
+
+if __name__ == "__main__":
+    test_stale_neighbours()
@@ -0,0 +1,95 @@
+import asyncio
+import time
+import numpy as np
+import speech_recognition as sr
+from ai_call_agent.services.stt_engines import GoogleSTTEngine
+from ai_call_agent.services.stt_service import STTWorkerPool, STTPoolSaturated, transcribe_samples
+
+
+async def check_submit_many():
+    pool = STTWorkerPool(max_workers=2, max_queue=1, timeout=5)
+    try:
+        # 6 segmente ocupă doar 2 locuri (câte un lane per worker), în ordine
+        results = await pool.submit_many(lambda i: (time.sleep(0.01), i)[1], [(i,) for i in range(6)])
+        assert results == list(range(6))
+        assert pool.get_stats()["running"] == 0
+
+        # Toate cele 3 locuri (2 workeri + 1 în coadă) sunt ocupate: cererea următoare e refuzată
+        slow = asyncio.create_task(pool.submit(time.sleep, 0.3))
+        await asyncio.sleep(0.01)
+        busy = asyncio.create_task(pool.submit_many(time.sleep, [(0.3,), (0.3,)]))
+        await asyncio.sleep(0.01)
+        try:
+            await pool.submit_many(time.sleep, [(0.01,)])
+            raise AssertionError("expected STTPoolSaturated")
+        except STTPoolSaturated:
+            pass
+        await asyncio.gather(slow, busy)
+
+        # O eroare oprește segmentele care nu au pornit încă
+        calls = []
+
+        def transcribe(i):
+            calls.append(i)
+            if i == 0:
+                raise RuntimeError("engine failed")
+            time.sleep(0.05)
+
+        try:
+            await pool.submit_many(transcribe, [(i,) for i in range(10)])
+            raise AssertionError("expected RuntimeError")
+        except RuntimeError:
+            pass
+        await asyncio.sleep(0.2)
+        assert len(calls) < 10, calls
+
+        # Un singur termen pentru toată cererea
+        start = time.monotonic()
+        try:
+            await pool.submit_many(time.sleep, [(0.1,)] * 10, timeout=0.15)
+            raise AssertionError("expected timeout")
+        except asyncio.TimeoutError:
+            pass
+        assert time.monotonic() - start < 0.3
+        await asyncio.sleep(0.3)
+        assert pool._admitted == 0, pool.get_stats()
+        print(pool.get_stats())
+    finally:
+        pool.shutdown()
+
+
+def test_submit_many():
+    asyncio.run(check_submit_many())
+
+
+async def check_unrecognizable_segment():
+    rate = 16000
+    tone = lambda seconds: (np.sin(np.arange(int(seconds * rate)) / 3) * 8000).astype(np.int16)
+    silence = np.zeros(rate, dtype=np.int16)
+    # O frază de 1.5 s și un zgomot scurt (0.3 s), separate de tăcere
+    samples = np.concatenate([silence, tone(1.5), silence, tone(0.3), silence])
+
+    def recognize_google(recognizer, audio_data, *args, **kwargs):
+        if len(audio_data.frame_data) < rate * 2:
+            raise sr.UnknownValueError()
+        return "hello there"
+
+    original = sr.Recognizer.recognize_google
+    sr.Recognizer.recognize_google = recognize_google
+    pool = STTWorkerPool(max_workers=2, max_queue=2, timeout=5)
+    try:
+        result = await transcribe_samples(pool, GoogleSTTEngine(), samples, rate)
+    finally:
+        sr.Recognizer.recognize_google = original
+        pool.shutdown()
+    # Bucata nerecunoscută nu transformă toată cererea într-o eroare
+    assert result["segments"] == 2 and result["text"] == "hello there", result
+
+
+def test_unrecognizable_segment():
+    asyncio.run(check_unrecognizable_segment())
+
+
+if __name__ == "__main__":
+    test_submit_many()
+    test_unrecognizable_segment()
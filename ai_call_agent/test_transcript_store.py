@@ -0,0 +1,179 @@
+import asyncio
+import json
+import os
+import tempfile
+from datetime import datetime, timedelta
+
+os.environ.setdefault("DATABASE_URL", "sqlite+aiosqlite:///" + os.path.join(tempfile.mkdtemp(), "test.db"))
+
+from sqlalchemy import delete, func, select
+from ai_call_agent.database import SessionLocal, ChatSession, ChatMessage, engine, init_db
+from ai_call_agent.services.transcript_store import (
+    TranscriptWriter, fetch_messages, list_sessions, stream_transcript
+)
+
+
+async def check_writer():
+    await init_db()
+    async with SessionLocal() as db:
+        session = ChatSession(user_id="user-1")
+        db.add(session)
+        await db.commit()
+
+    writer = TranscriptWriter(SessionLocal, batch_size=10, flush_interval=0.05)
+    writer.start()
+    try:
+        for i in range(25):
+            writer.append(session.id, "user" if i % 2 == 0 else "ai", f"message {i}")
+        # Două loturi pline pleacă imediat, restul de 5 la expirarea intervalului
+        await asyncio.sleep(0.2)
+        assert writer.stats["written"] == 25, writer.get_stats()
+        assert writer.stats["batches"] <= 3, writer.get_stats()
+
+        async with SessionLocal() as db:
+            first = await fetch_messages(db, session.id, limit=10)
+            second = await fetch_messages(db, session.id, after=first[-1]["seq"], limit=10)
+        assert [m["content"] for m in first] == [f"message {i}" for i in range(10)]
+        assert second[0]["seq"] == 10
+
+        await writer.discard(session.id)
+        writer.append(session.id, "user", "never written")
+        await writer.discard(session.id)
+    finally:
+        await writer.stop()
+
+    async with SessionLocal() as db:
+        count = await db.scalar(select(func.count()).where(ChatMessage.session_id == session.id))
+    assert count == 25, count
+
+    transcript = [json.loads(line) async for line in stream_transcript(SessionLocal, session.id, page_size=7)]
+    assert [m["seq"] for m in transcript] == list(range(25))
+    async with SessionLocal() as db:
+        assert (await list_sessions(db, "user-1"))["sessions"][0]["message_count"] == 25
+    await engine.dispose()
+
+
+class SlowWriter(TranscriptWriter):
+    """INSERT-ul așteaptă un semnal: flush-ul rămâne în zbor cât vrea testul."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.inserting = asyncio.Event()
+        self.release = asyncio.Event()
+
+    async def _insert(self, rows):
+        self.inserting.set()
+        await self.release.wait()
+        await super()._insert(rows)
+
+
+async def check_delete_during_flush():
+    await init_db()
+    async with SessionLocal() as db:
+        session = ChatSession(user_id="user-4")
+        db.add(session)
+        await db.commit()
+
+    writer = SlowWriter(SessionLocal, batch_size=100)
+    for i in range(3):
+        writer.append(session.id, "user", f"message {i}")
+    flush = asyncio.create_task(writer.flush())
+    await writer.inserting.wait()
+
+    # Ca DELETE /api/sessions/{id}: discard, apoi ștergerea rândurilor
+    async def delete_session():
+        await writer.discard(session.id)
+        async with SessionLocal() as db:
+            await db.execute(delete(ChatMessage).where(ChatMessage.session_id == session.id))
+            await db.execute(delete(ChatSession).where(ChatSession.id == session.id))
+            await db.commit()
+
+    deletion = asyncio.create_task(delete_session())
+    await asyncio.sleep(0.05)
+    assert not deletion.done()
+    writer.release.set()
+    await asyncio.gather(flush, deletion)
+
+    # Flush-ul a scris înainte de DELETE, nu după
+    async with SessionLocal() as db:
+        count = await db.scalar(select(func.count()).where(ChatMessage.session_id == session.id))
+    assert count == 0, count
+    await engine.dispose()
+
+
+async def check_rejected_session():
+    await init_db()
+    async with SessionLocal() as db:
+        good, bad = ChatSession(user_id="user-3"), ChatSession(user_id="user-3")
+        db.add_all([good, bad])
+        await db.commit()
+        # Rândul cu seq 0 există deja: lotul de mai jos încalcă indexul unic (ca un FK lipsă pe Postgres)
+        db.add(ChatMessage(session_id=bad.id, seq=0, sender="user", content="already there"))
+        await db.commit()
+
+    writer = TranscriptWriter(SessionLocal, batch_size=100)
+    for i in range(3):
+        writer.append(good.id, "user", f"good {i}")
+        writer.append(bad.id, "user", f"bad {i}")
+    # Doar sesiunea invalidă pierde mesajele; lotul nu rămâne blocat în coadă
+    assert await writer.flush() == 3
+    assert writer.get_stats()["pending"] == 0 and writer.stats["dropped"] == 3, writer.get_stats()
+
+    writer.append(good.id, "ai", "good 3")
+    assert await writer.flush() == 1
+    async with SessionLocal() as db:
+        assert [m["content"] for m in await fetch_messages(db, good.id)] == [f"good {i}" for i in range(4)]
+        assert [m["content"] for m in await fetch_messages(db, bad.id)] == ["already there"]
+    await engine.dispose()
+
+
+async def check_listing():
+    await init_db()
+    start = datetime(2024, 1, 1)
+    async with SessionLocal() as db:
+        db.add_all(
+            ChatSession(user_id="user-2", start_time=start + timedelta(minutes=i // 2)) for i in range(45)
+        )
+        db.add(ChatSession(user_id="user-2", transcript=json.dumps([{"sender": "user", "content": "old"}])))
+        await db.commit()
+
+    seen, cursor = [], None
+    async with SessionLocal() as db:
+        while True:
+            page = await list_sessions(db, "user-2", cursor, limit=10)
+            seen.extend(page["sessions"])
+            cursor = page["next_cursor"]
+            if cursor is None:
+                break
+    # Fiecare sesiune o singură dată, chiar și cu start_time egal, cele mai noi primele
+    assert len(seen) == len({s["id"] for s in seen}) == 46
+    assert [s["start_time"] for s in seen] == sorted((s["start_time"] for s in seen), reverse=True)
+    assert "transcript" not in seen[0]
+
+    legacy = seen[0]["id"]
+    transcript = [json.loads(line) async for line in stream_transcript(SessionLocal, legacy)]
+    assert transcript == [{"sender": "user", "content": "old"}]
+    await engine.dispose()
+
+
+def test_transcript_writer():
+    asyncio.run(check_writer())
+
+
+def test_rejected_session():
+    asyncio.run(check_rejected_session())
+
+
+def test_delete_during_flush():
+    asyncio.run(check_delete_during_flush())
+
+
+def test_session_listing():
+    asyncio.run(check_listing())
+
+
+if __name__ == "__main__":
+    test_transcript_writer()
+    test_rejected_session()
+    test_delete_during_flush()
+    test_session_listing()
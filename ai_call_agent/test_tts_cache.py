@@ -0,0 +1,35 @@
+import tempfile
+from ai_call_agent.services.tts_cache import TTSCache
+
+
+def test_tts_cache():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        cache = TTSCache(tmp_dir, max_bytes=250, url_prefix="/static/audio/tts")
+        synthesized = []
+
+        def speak(text):
+            key = TTSCache.make_key(text, "Rachel", "eleven_multilingual_v2", {"stability": 0.5})
+            return cache.get_or_create(key, lambda: synthesized.append(text) or b"\xff" * 100)
+
+        for text in ["Bună ziua!", "La revedere!", "Bună ziua!"]:
+            speak(text)
+        assert synthesized == ["Bună ziua!", "La revedere!"]
+
+        # A treia frază depășește limita: iese cea mai veche nefolosită ("La revedere!")
+        speak("Cu ce vă pot ajuta?")
+        speak("Bună ziua!")
+        assert synthesized == ["Bună ziua!", "La revedere!", "Cu ce vă pot ajuta?"]
+        assert cache.get_stats()["evictions"] == 1
+
+        # Altă voce sau alte setări înseamnă altă cheie
+        assert TTSCache.make_key("Bună ziua!", "Adam", "eleven_multilingual_v2") != \
+            TTSCache.make_key("Bună ziua!", "Rachel", "eleven_multilingual_v2")
+
+        # La repornire, indexul se reconstruiește din fișiere
+        reopened = TTSCache(tmp_dir, max_bytes=250, url_prefix="/static/audio/tts")
+        assert reopened.get_stats()["entries"] == 2
+        print(cache.get_stats())
+
+
+if __name__ == "__main__":
+    test_tts_cache()
@@ -0,0 +1,147 @@
+import asyncio
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from ai_call_agent.services.tts_providers import (
+    CircuitBreaker, ElevenLabsProvider, TTSProvider, TTSRouter, TTSUnavailable
+)
+
+
+class StandInServer:
+    """Server HTTP local care imită endpoint-ul text-to-speech al ElevenLabs."""
+
+    def __init__(self):
+        self.delay = 0.0
+        self.status = 200
+        self.requests = 0
+        self.active = 0
+        self.max_active = 0
+        self.client_ports = set()
+        self._lock = threading.Lock()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self):
+                self.rfile.read(int(self.headers["Content-Length"]))
+                with server._lock:
+                    server.requests += 1
+                    server.active += 1
+                    server.max_active = max(server.max_active, server.active)
+                    server.client_ports.add(self.client_address[1])
+                time.sleep(server.delay)
+                with server._lock:
+                    server.active -= 1
+                body = b"ID3fake-mp3" if server.status == 200 else b"error"
+                self.send_response(server.status)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}"
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.httpd.shutdown()
+
+
+class InstantLocalProvider(TTSProvider):
+    name = "local"
+    extension = "wav"
+
+    async def _synthesize(self, text, voice):
+        return b"RIFF-local"
+
+
+class SlowProvider(TTSProvider):
+    """Provider care nu termină niciodată singur; numără anulările."""
+
+    def __init__(self, name, **options):
+        super().__init__(**options)
+        self.name = name
+        self.running = 0
+        self.cancelled = 0
+
+    async def _synthesize(self, text, voice):
+        self.running += 1
+        try:
+            await asyncio.sleep(60)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        finally:
+            self.running -= 1
+
+
+async def check_caller_cancelled():
+    primary, fallback = SlowProvider("remote"), SlowProvider("local")
+    router = TTSRouter(primary, fallback, hedge_delay=0.1)
+
+    # Anulat înainte de hedging, apoi în timpul lui
+    for delay, hedged in ((0.05, 0), (0.2, 1)):
+        call = asyncio.create_task(router.synthesize("Bună ziua!", "Rachel"))
+        await asyncio.sleep(delay)
+        call.cancel()
+        try:
+            await call
+        except asyncio.CancelledError:
+            pass
+        assert router.stats["hedged"] == hedged
+        # Sintezele sunt deja anulate când apelantul primește anularea
+        assert primary.running == 0 and fallback.running == 0
+    assert primary.cancelled == 2 and fallback.cancelled == 1
+    assert primary.breaker.state == "closed"
+
+
+async def check_providers(server: StandInServer):
+    remote = ElevenLabsProvider("test-key", base_url=server.url, max_concurrency=2, timeout=2.0,
+                                breaker=CircuitBreaker(failure_threshold=2, reset_timeout=60))
+
+    # Pool: cel mult 2 cereri simultane, conexiuni refolosite
+    server.delay = 0.05
+    results = await asyncio.gather(*(remote.synthesize(f"Fraza {i}", "Rachel") for i in range(8)))
+    assert all(r.audio == b"ID3fake-mp3" for r in results)
+    assert server.max_active <= 2
+    assert len(server.client_ports) <= 2
+
+    # Hedging: providerul remote e lent, cel local răspunde primul
+    server.delay = 0.5
+    router = TTSRouter(remote, InstantLocalProvider(), hedge_delay=0.1)
+    result = await router.synthesize("Bună ziua!", "Rachel")
+    assert result.provider == "local" and router.stats["hedged"] == 1
+
+    # Circuit breaker: după 2 erori consecutive, remote-ul nu mai este apelat
+    server.delay, server.status = 0.0, 500
+    for _ in range(2):
+        try:
+            await remote.synthesize("Eroare", "Rachel")
+        except TTSUnavailable:
+            pass
+    assert remote.breaker.state == "open"
+    before = server.requests
+    result = await router.synthesize("Bună ziua!", "Rachel")
+    assert result.provider == "local" and server.requests == before
+    print(router.get_stats())
+    await router.aclose()
+
+
+def test_tts_providers():
+    server = StandInServer()
+    try:
+        asyncio.run(check_providers(server))
+    finally:
+        server.close()
+
+
+def test_caller_cancelled():
+    asyncio.run(check_caller_cancelled())
+
+
+if __name__ == "__main__":
+    test_tts_providers()
+    test_caller_cancelled()
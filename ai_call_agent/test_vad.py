@@ -0,0 +1,48 @@
+import numpy as np
+from ai_call_agent.services.vad import EnergyVAD, speech_regions
+
+RATE = 16000
+rng = np.random.default_rng(0)
+
+
+def noise(seconds: float, dbfs: float) -> np.ndarray:
+    return rng.standard_normal(int(seconds * RATE)) * 10 ** (dbfs / 20) * 32768
+
+
+def tone(seconds: float, dbfs: float) -> np.ndarray:
+    t = np.arange(int(seconds * RATE)) / RATE
+    return np.sin(2 * np.pi * 220 * t) * np.sqrt(2) * 10 ** (dbfs / 20) * 32768
+
+
+def test_steady_noise_is_not_speech():
+    # 10 s de zgomot la -40 dBFS (peste pragul inițial de -60) și o frază de 1 s la secunda 5
+    samples = noise(10, -40)
+    samples[5 * RATE:6 * RATE] += tone(1, -15)
+    regions = speech_regions(samples.astype(np.int16), RATE)
+    print(regions)
+    # Pragul se adaptează în prima secundă; fraza se termină la ~6 s, nu la capătul clipului
+    assert all(end - start < 1.5 * RATE for start, end in regions)
+    assert any(start <= 5 * RATE <= end for start, end in regions)
+    assert regions[-1][1] < 6.5 * RATE
+
+
+def test_speech_from_first_frame():
+    # Silabe de 200 ms cu pauze de 100 ms, fără liniște înainte
+    syllable = np.concatenate([tone(0.2, -20), np.zeros(int(0.1 * RATE))])
+    samples = (np.tile(syllable, 10) + noise(3, -70)).astype(np.int16)
+    assert speech_regions(samples, RATE) == [(0, len(samples))]
+
+
+def test_streaming_frames():
+    vad = EnergyVAD()
+    frames = noise(10, -40).astype(np.int16).reshape(-1, RATE // 50)
+    flags = [vad.is_speech(frame) for frame in frames]
+    # Doar primele cadre, până se umple istoricul, pot trece drept vorbire
+    assert sum(flags) < 30, sum(flags)
+
+
+if __name__ == "__main__":
+    test_steady_noise_is_not_speech()
+    test_speech_from_first_frame()
+    test_streaming_frames()
+    print("OK")
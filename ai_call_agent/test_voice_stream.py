@@ -0,0 +1,48 @@
+import asyncio
+import numpy as np
+from ai_call_agent.services.stt_service import STTWorkerPool
+from ai_call_agent.services.voice_stream import StreamingTranscriber
+
+
+class FakeEngine:
+    name = "fake"
+
+    def transcribe(self, audio_content):
+        return "hello"
+
+
+async def check_odd_frames():
+    events = []
+
+    async def on_event(event):
+        events.append(event)
+
+    pool = STTWorkerPool(max_workers=1, max_queue=1, timeout=5)
+    transcriber = StreamingTranscriber(FakeEngine(), pool, on_event, partials=False)
+    try:
+        silence = np.zeros(320, dtype=np.int16).tobytes()
+        transcriber.feed(silence + b"\x00")
+        transcriber.feed(b"\x01")
+        transcriber.feed(silence)
+        await asyncio.sleep(0)
+        # Fiecare cadru impar primește un mesaj de eroare; apelul continuă
+        assert [e["code"] for e in events] == [400, 400], events
+
+        tone = (np.sin(np.arange(320) / 3) * 8000).astype(np.int16).tobytes()
+        for _ in range(30):
+            transcriber.feed(tone)
+        for _ in range(20):
+            transcriber.feed(silence)
+        await transcriber.flush()
+        assert events[-1]["type"] == "transcript" and events[-1]["content"] == "hello", events
+    finally:
+        await transcriber.close()
+        pool.shutdown()
+
+
+def test_odd_frames():
+    asyncio.run(check_odd_frames())
+
+
+if __name__ == "__main__":
+    test_odd_frames()
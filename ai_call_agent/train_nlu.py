@@ -0,0 +1,64 @@
+"""
+Antrenează clasificatorul local de intenții din frazele de antrenament Dialogflow.
+
+    python -m ai_call_agent.train_nlu exported-agent/ --language ro
+    python -m ai_call_agent.train_nlu phrases.json --output ai_call_agent/data/nlu_model.npz
+
+Sursa este un export de agent Dialogflow CX (directorul dezarhivat) sau un JSON
+{intent: [fraze]}. Raportează acuratețea leave-one-out și cât din trafic ar fi
+rezolvat local la pragul dat (--threshold, --margin).
+"""
+import argparse
+import json
+import sys
+from ai_call_agent.services.intent_pipeline import (
+    DEFAULT_MODEL_PATH, LocalIntentClassifier, load_training_phrases
+)
+
+
+def evaluate(examples, threshold: float, margin: float):
+    """Leave-one-out: fiecare frază e clasificată de un model antrenat fără ea."""
+    accepted = correct = total = 0
+    for intent, phrases in examples.items():
+        for i, phrase in enumerate(phrases):
+            held_out = {**examples, intent: phrases[:i] + phrases[i + 1:]}
+            if not any(held_out.values()):
+                continue
+            predicted, confidence, gap = LocalIntentClassifier.train(held_out).classify(phrase)
+            total += 1
+            if confidence >= threshold and gap >= margin:
+                accepted += 1
+                correct += predicted == intent
+    return {
+        "phrases": total,
+        "offload_ratio": round(accepted / total, 3) if total else 0.0,
+        "precision": round(correct / accepted, 3) if accepted else 0.0
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Train the local intent classifier")
+    parser.add_argument("source", help="Dialogflow CX agent export directory or {intent: [phrases]} JSON")
+    parser.add_argument("--language", default="en")
+    parser.add_argument("--output", default=str(DEFAULT_MODEL_PATH))
+    parser.add_argument("--threshold", type=float, default=0.6)
+    parser.add_argument("--margin", type=float, default=0.1)
+    parser.add_argument("--no-eval", action="store_true", help="skip the leave-one-out evaluation")
+    args = parser.parse_args()
+
+    examples = load_training_phrases(args.source, args.language)
+    if not examples:
+        print(f"Error: no training phrases found in {args.source}", file=sys.stderr)
+        return 1
+
+    classifier = LocalIntentClassifier.train(examples)
+    classifier.save(args.output)
+    report = {"intents": len(classifier.labels), "output": args.output}
+    if not args.no_eval:
+        report.update(evaluate(examples, args.threshold, args.margin))
+    print(json.dumps(report, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
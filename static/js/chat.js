@@ -92,11 +92,29 @@ document.addEventListener('DOMContentLoaded', function() {
             
             switch(data.type) {
                 case 'text':
+                    if (data.delta !== undefined) {
+                        appendDelta(data.delta, data.sender, data.name);
+                        break;
+                    }
+                    // fall through: complete (non-streamed) message
                 case 'transcript':
+                    if (data.final !== undefined) {
+                        updateLiveTranscript(data);
+                        break;
+                    }
                     playTypingSound();
                     await simulateTyping(data.content, data.sender, data.name);
                     playMessageSound();
                     break;
+
+                case 'done':
+                    if (streamingMessage) {
+                        streamingMessage = null;
+                    } else {
+                        await simulateTyping(data.content, data.sender, data.name);
+                    }
+                    playMessageSound();
+                    break;
                     
                 case 'audio':
                     if (data.enabled) {
@@ -107,6 +125,10 @@ document.addEventListener('DOMContentLoaded', function() {
                 case 'video':
                     updateRemoteVideo(data.frame);
                     break;
+
+                case 'error':
+                    addSystemMessage(data.message);
+                    break;
             }
         };
     }
@@ -122,6 +144,114 @@ document.addEventListener('DOMContentLoaded', function() {
         messageSound.play();
     }
 
+    // Streamed message currently being received (token deltas)
+    let streamingMessage = null;
+
+    function createMessage(sender, name) {
+        const messageDiv = document.createElement('div');
+        messageDiv.classList.add('message', `${sender}-message`);
+
+        const nameSpan = document.createElement('span');
+        nameSpan.classList.add('message-name');
+        nameSpan.textContent = name;
+        messageDiv.appendChild(nameSpan);
+
+        const contentSpan = document.createElement('span');
+        messageDiv.appendChild(contentSpan);
+        chatMessages.appendChild(messageDiv);
+        return contentSpan;
+    }
+
+    function appendDelta(delta, sender, name) {
+        if (!streamingMessage) {
+            playTypingSound();
+            streamingMessage = createMessage(sender, name);
+        }
+        streamingMessage.textContent += delta;
+        chatMessages.scrollTop = chatMessages.scrollHeight;
+    }
+
+    // Live user transcript: partials overwrite the same message until the final arrives
+    let liveTranscript = null;
+
+    function updateLiveTranscript(data) {
+        if (!liveTranscript) {
+            liveTranscript = createMessage('user', userName || 'You');
+            liveTranscript.parentElement.classList.add('partial');
+        }
+        liveTranscript.textContent = data.content;
+        if (data.final) {
+            liveTranscript.parentElement.classList.remove('partial');
+            liveTranscript = null;
+            playMessageSound();
+        }
+        chatMessages.scrollTop = chatMessages.scrollHeight;
+    }
+
+    function addSystemMessage(text) {
+        const messageDiv = document.createElement('div');
+        messageDiv.classList.add('message', 'system-message');
+        messageDiv.textContent = text;
+        chatMessages.appendChild(messageDiv);
+        chatMessages.scrollTop = chatMessages.scrollHeight;
+    }
+
+    // AI speech arrives sentence by sentence (audio URLs, in order); play them back to back
+    const audioQueue = [];
+    let audioPlaying = false;
+
+    function playAudioResponse(url) {
+        audioQueue.push(url);
+        if (!audioPlaying) playNextAudio();
+    }
+
+    function playNextAudio() {
+        const url = audioQueue.shift();
+        if (!url) {
+            audioPlaying = false;
+            return;
+        }
+        audioPlaying = true;
+        const audio = new Audio(url);
+        audio.onended = playNextAudio;
+        audio.onerror = playNextAudio;
+        audio.play().catch(playNextAudio);
+    }
+
+    // Microphone -> 20 ms frames of 16 kHz mono PCM int16, sent as binary WebSocket messages
+    const SAMPLE_RATE = 16000;
+    const FRAME_SAMPLES = SAMPLE_RATE / 50;
+
+    function setupAudioProcessing(stream) {
+        audioContext = new AudioContext({ sampleRate: SAMPLE_RATE });
+        const source = audioContext.createMediaStreamSource(stream);
+        const processor = audioContext.createScriptProcessor(1024, 1, 1);
+        let pending = new Int16Array(0);
+
+        ws.addEventListener('open', () => {
+            ws.send(JSON.stringify({ type: 'start', format: 'pcm16', sample_rate: SAMPLE_RATE, frame_ms: 20 }));
+        });
+
+        processor.onaudioprocess = (event) => {
+            if (!ws || ws.readyState !== WebSocket.OPEN) return;
+            const input = event.inputBuffer.getChannelData(0);
+            const samples = new Int16Array(pending.length + input.length);
+            samples.set(pending);
+            for (let i = 0; i < input.length; i++) {
+                const s = Math.max(-1, Math.min(1, input[i]));
+                samples[pending.length + i] = s < 0 ? s * 0x8000 : s * 0x7fff;
+            }
+            let offset = 0;
+            for (; offset + FRAME_SAMPLES <= samples.length; offset += FRAME_SAMPLES) {
+                ws.send(samples.slice(offset, offset + FRAME_SAMPLES).buffer);
+            }
+            pending = samples.slice(offset);
+        };
+
+        source.connect(processor);
+        processor.connect(audioContext.destination);
+    }
+
     async function simulateTyping(text, sender, name) {
         const messageDiv = document.createElement('div');
         messageDiv.classList.add('message', `${sender}-message`);
@@ -184,6 +314,8 @@ document.addEventListener('DOMContentLoaded', function() {
     }
 
     function endCall() {
+        if (ws && ws.readyState === WebSocket.OPEN) ws.send(JSON.stringify({ type: 'stop' }));
+        if (audioContext) audioContext.close();
         if (ws) ws.close();
         if (audioStream) audioStream.getTracks().forEach(track => track.stop());
         if (videoStream) videoStream.getTracks().forEach(track => track.stop());
@@ -211,23 +343,30 @@ document.addEventListener('DOMContentLoaded', function() {
     endCall.addEventListener('click', endCall);
 
     // Session management
-    async function loadUserSessions() {
+    let sessionsCursor = null;
+
+    async function loadUserSessions(more = false) {
         try {
-            const response = await fetch(`/api/sessions/${userId}`);
-            const sessions = await response.json();
+            const params = new URLSearchParams({ limit: 20 });
+            if (more && sessionsCursor) params.set('cursor', sessionsCursor);
+            const response = await fetch(`/api/sessions/${userId}?${params}`);
+            const page = await response.json();
+            sessionsCursor = page.next_cursor;
             // Update UI with sessions
-            updateSessionsList(sessions);
+            updateSessionsList(page.sessions, more);
         } catch (error) {
             console.error('Error loading sessions:', error);
         }
     }
 
-    function updateSessionsList(sessions) {
+    function updateSessionsList(sessions, append = false) {
         const sessionsList = document.getElementById('sessionsList');
-        sessionsList.innerHTML = sessions.map(session => `
+        sessionsList.querySelector('.load-more')?.remove();
+        const items = sessions.map(session => `
             <div class="session-item">
                 <div class="session-info">
                     <span>${new Date(session.start_time).toLocaleString()}</span>
+                    <span class="session-count">${session.message_count}</span>
                     <div class="session-actions">
                         <button onclick="downloadSession('${session.id}')">
                             <i class="fas fa-download"></i>
@@ -239,8 +378,28 @@ document.addEventListener('DOMContentLoaded', function() {
                 </div>
             </div>
         `).join('');
+        if (append) {
+            sessionsList.insertAdjacentHTML('beforeend', items);
+        } else {
+            sessionsList.innerHTML = items;
+        }
+        if (sessionsCursor) {
+            const button = document.createElement('button');
+            button.className = 'load-more';
+            button.textContent = '...';
+            button.addEventListener('click', () => loadUserSessions(true));
+            sessionsList.appendChild(button);
+        }
     }
 
+    // Transcrierea se descarcă direct din stream, fără a o încărca în pagină
+    window.downloadSession = (sessionId) => {
+        const link = document.createElement('a');
+        link.href = `/api/sessions/${sessionId}/transcript`;
+        link.download = `session-${sessionId}.ndjson`;
+        link.click();
+    };
+
     // Initialize the chat interface
     async function initializeChat() {
         if (!localStorage.getItem('chatToken')) {